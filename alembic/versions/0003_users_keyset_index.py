@@ -0,0 +1,27 @@
+"""users_keyset_index
+
+Revision ID: 0003_users_keyset_index
+Revises: 0002_swap_divisions_domains
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_users_keyset_index'
+down_revision: Union[str, None] = '0002_swap_divisions_domains'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite sort key for cursor pagination on GET /users
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
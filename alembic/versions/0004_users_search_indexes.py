@@ -0,0 +1,69 @@
+"""users_search_indexes
+
+Revision ID: 0004_users_search_indexes
+Revises: 0003_users_keyset_index
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_users_search_indexes'
+down_revision: Union[str, None] = '0003_users_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        # Trigram GIN indexes serve `ILIKE '%q%'` for the generic user search
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_users_name_trgm', 'users', ['name'], unique=False,
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+        )
+        op.create_index(
+            'ix_users_email_trgm', 'users', ['email'], unique=False,
+            postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'},
+        )
+
+    elif bind.dialect.name == 'sqlite':
+        # FTS5 shadow table, kept in sync by triggers, backfilled via 'rebuild'
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+            "name, email, content='users', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+            "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+            "INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, email ON users BEGIN "
+            "INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); "
+            "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END"
+        )
+        op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('ix_users_email_trgm', table_name='users')
+        op.drop_index('ix_users_name_trgm', table_name='users')
+
+    elif bind.dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS users_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS users_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS users_fts_ai')
+        op.execute('DROP TABLE IF EXISTS users_fts')
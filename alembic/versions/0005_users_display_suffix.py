@@ -0,0 +1,40 @@
+"""users_display_suffix
+
+Revision ID: 0005_users_display_suffix
+Revises: 0004_users_search_indexes
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_users_display_suffix'
+down_revision: Union[str, None] = '0004_users_search_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. Add the column nullable so existing rows can be backfilled
+    op.add_column('users', sa.Column('display_suffix', sa.String(length=10), nullable=True))
+
+    # 2. Backfill from the immutable ULID (characters 17-26)
+    op.execute("UPDATE users SET display_suffix = UPPER(SUBSTR(ulid, 17, 10))")
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('display_suffix', existing_type=sa.String(length=10), nullable=False)
+
+    # 3. Replace the plain ULID index, which could not serve LIKE '%suffix'
+    op.drop_index('ix_users_ulid_suffix', table_name='users')
+    op.create_index('ix_users_display_suffix', 'users', ['display_suffix'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_display_suffix', table_name='users')
+    op.create_index('ix_users_ulid_suffix', 'users', ['ulid'], unique=False)
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('display_suffix')
@@ -0,0 +1,29 @@
+"""api_key_usage
+
+Revision ID: 0006_api_key_usage
+Revises: 0005_users_display_suffix
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_api_key_usage'
+down_revision: Union[str, None] = '0005_users_display_suffix'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('api_keys', sa.Column('request_count', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('api_keys', sa.Column('last_used_ip', sa.String(length=45), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.drop_column('last_used_ip')
+        batch_op.drop_column('request_count')
@@ -0,0 +1,42 @@
+"""jwt_signing_keys
+
+private_key_pem holds the signing keys' private halves. It is encrypted
+(PKCS#8) only when JWT_KEY_ENCRYPTION_PASSPHRASE is set; otherwise anyone
+who can read this table or its backups can sign admin tokens.
+
+Revision ID: 0007_jwt_signing_keys
+Revises: 0006_api_key_usage
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_jwt_signing_keys'
+down_revision: Union[str, None] = '0006_api_key_usage'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jwt_signing_keys',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('kid', sa.String(length=64), nullable=False),
+        sa.Column('algorithm', sa.String(length=16), nullable=False),
+        sa.Column('private_key_pem', sa.Text(), nullable=False),
+        sa.Column('public_jwk', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('activates_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kid'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('jwt_signing_keys')
@@ -0,0 +1,27 @@
+"""api_key_rate_limit
+
+Revision ID: 0008_api_key_rate_limit
+Revises: 0007_jwt_signing_keys
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_api_key_rate_limit'
+down_revision: Union[str, None] = '0007_jwt_signing_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('api_keys', sa.Column('rate_limit', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('api_keys') as batch_op:
+        batch_op.drop_column('rate_limit')
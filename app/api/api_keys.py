@@ -4,14 +4,15 @@ from datetime import datetime
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.admin import AdminAccount
 from app.models.api_key import ApiKey
-from app.models.audit import AuditLog
-from app.api.deps import require_admin, get_current_admin
+from app.core.audit_sink import record_audit
+from app.api.deps import require_admin, require_superadmin, get_current_admin, get_read_db
+from app.core.rate_limiter import parse_rate
 from app.core.security import generate_api_key, hash_api_key, get_api_key_prefix
 
 
@@ -34,6 +35,20 @@ class CreateApiKeyRequest(BaseModel):
     )
 
 
+class UpdateApiKeyRateLimitRequest(BaseModel):
+    rate_limit: Optional[str] = Field(
+        default=None,
+        description="Quota for this key, e.g. '1000/minute'. Null = the default quota.",
+    )
+
+    @field_validator("rate_limit")
+    @classmethod
+    def valid_rate(cls, v):
+        if v is not None:
+            parse_rate(v)
+        return v
+
+
 class ApiKeyResponse(BaseModel):
     id: int
     name: str
@@ -43,6 +58,9 @@ class ApiKeyResponse(BaseModel):
     created_at: datetime
     expires_at: Optional[datetime]
     last_used_at: Optional[datetime]
+    last_used_ip: Optional[str] = None
+    request_count: int = 0  # Updated periodically, not per request
+    rate_limit: Optional[str] = None  # None = the default quota
     owner_username: str
 
     class Config:
@@ -85,18 +103,19 @@ def create_api_key(
         expires_at=expires_at,
     )
     db.add(api_key)
-    db.commit()
-    db.refresh(api_key)
+    db.flush()
 
     # Audit
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="API_KEY_CREATED",
         entity_type="API_KEY",
         entity_id=str(api_key.id),
         changed_by=current_admin.id,
         description=f"API key '{req.name}' created (scopes: {req.scopes})",
-    ))
+    )
     db.commit()
+    db.refresh(api_key)
 
     return ApiKeyCreatedResponse(
         id=api_key.id,
@@ -107,6 +126,8 @@ def create_api_key(
         created_at=api_key.created_at,
         expires_at=api_key.expires_at,
         last_used_at=api_key.last_used_at,
+        last_used_ip=api_key.last_used_ip,
+        request_count=api_key.request_count or 0,
         owner_username=current_admin.username,
         plain_key=plain_key,
     )
@@ -114,7 +135,7 @@ def create_api_key(
 
 @router.get("", response_model=List[ApiKeyResponse])
 def list_api_keys(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_admin),
 ):
     """List all API keys (admin sees all, non-superadmin sees own)."""
@@ -135,6 +156,9 @@ def list_api_keys(
             created_at=k.created_at,
             expires_at=k.expires_at,
             last_used_at=k.last_used_at,
+            last_used_ip=k.last_used_ip,
+            request_count=k.request_count,
+            rate_limit=k.rate_limit,
             owner_username=k.owner.username,
         )
         for k in keys
@@ -161,16 +185,58 @@ def revoke_api_key(
         raise HTTPException(status_code=403, detail="Cannot revoke another admin's key")
 
     api_key.is_active = False
-    db.commit()
 
     # Audit
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="API_KEY_REVOKED",
         entity_type="API_KEY",
         entity_id=str(api_key.id),
         changed_by=current_admin.id,
         description=f"API key '{api_key.name}' revoked",
-    ))
+    )
     db.commit()
 
     return {"message": f"API key '{api_key.name}' revoked successfully"}
+
+
+@router.put("/{key_id}/rate-limit", response_model=ApiKeyResponse)
+def set_api_key_rate_limit(
+    key_id: int,
+    req: UpdateApiKeyRateLimitRequest,
+    db: Session = Depends(get_db),
+    current_admin: AdminAccount = Depends(require_superadmin),
+):
+    """Set or clear an API key's own rate limit (Superadmin only)."""
+    api_key = db.query(ApiKey).filter(ApiKey.id == key_id).first()
+    if not api_key:
+        raise HTTPException(status_code=404, detail="API key not found")
+
+    previous = api_key.rate_limit
+    api_key.rate_limit = req.rate_limit
+    record_audit(
+        db,
+        action="API_KEY_RATE_LIMIT_CHANGED",
+        entity_type="API_KEY",
+        entity_id=str(api_key.id),
+        changed_by=current_admin.id,
+        previous_value={"rate_limit": previous},
+        new_value={"rate_limit": req.rate_limit},
+    )
+    db.commit()
+    db.refresh(api_key)
+
+    return ApiKeyResponse(
+        id=api_key.id,
+        name=api_key.name,
+        key_prefix=api_key.key_prefix,
+        scopes=api_key.scopes,
+        is_active=api_key.is_active,
+        created_at=api_key.created_at,
+        expires_at=api_key.expires_at,
+        last_used_at=api_key.last_used_at,
+        last_used_ip=api_key.last_used_ip,
+        request_count=api_key.request_count,
+        rate_limit=api_key.rate_limit,
+        owner_username=api_key.owner.username,
+    )
@@ -7,10 +7,9 @@ from typing import Optional, List
 from pydantic import BaseModel
 import math
 
-from app.database import get_db
 from app.models.audit import AuditLog
 from app.models.admin import AdminAccount
-from app.api.deps import require_admin
+from app.api.deps import require_admin, get_read_db
 
 router = APIRouter(prefix="/audit", tags=["Audit Logs"])
 
@@ -47,7 +46,7 @@ def list_audit_logs(
     date_to: Optional[date] = Query(None),
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_admin),
 ):
     """List audit logs with filtering (Admin+ access)."""
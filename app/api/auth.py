@@ -2,19 +2,19 @@
 
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
 from app.database import get_db
 from app.models.admin import AdminAccount, AccessLevel
-from app.models.audit import AuditLog
+from app.core.audit_sink import enqueue_audit, record_audit
 from app.core.security import (
-    verify_password, hash_password,
+    hash_password, verify_password_async, hash_password_async, password_needs_update,
     create_access_token, create_refresh_token,
     decode_token, revoke_token,
 )
 from app.api.deps import require_superadmin, get_current_admin
-from app.core.rate_limiter import limiter
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -50,67 +50,59 @@ class PasswordResetRequest(BaseModel):
 
 # --- Helpers ---
 
-def _log_auth_event(db: Session, action: str, admin: AdminAccount = None, ip: str = None, description: str = None):
-    """Log authentication events to audit trail."""
-    log = AuditLog(
-        action=action,
-        entity_type="ADMIN",
+def _log_auth_event(action: str, admin: AdminAccount = None, ip: str = None, description: str = None):
+    """Queue an authentication event that changes nothing else for the audit trail."""
+    enqueue_audit(
+        action,
+        "ADMIN",
         entity_id=str(admin.id) if admin else None,
         changed_by=admin.id if admin else None,
         description=description,
         ip_address=ip,
     )
-    db.add(log)
-    db.commit()
 
 
 # --- Endpoints ---
 
-@router.post("/login", response_model=TokenResponse)
-@limiter.limit("5/minute")
-def login(request: Request, login_req: LoginRequest, db: Session = Depends(get_db)):
-    """Authenticate admin and return JWT tokens."""
-    client_ip = request.client.host if request.client else None
-
-    admin = db.query(AdminAccount).filter(
-        AdminAccount.username == login_req.username,
+def _find_active_admin(db: Session, username: str):
+    return db.query(AdminAccount).filter(
+        AdminAccount.username == username,
         AdminAccount.is_active == True,
     ).first()
 
-    if not admin or not verify_password(login_req.password, admin.password_hash):
-        # Log failed login attempt
-        if admin:
-            _log_auth_event(db, "LOGIN_FAILED", admin, client_ip, f"Failed login attempt for {login_req.username}")
-        else:
-            # Log without admin reference for unknown usernames
-            log = AuditLog(
-                action="LOGIN_FAILED",
-                entity_type="ADMIN",
-                description=f"Failed login attempt for unknown user: {login_req.username}",
-                ip_address=client_ip,
-            )
-            db.add(log)
-            db.commit()
 
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid username or password",
-        )
+def _record_failed_login(admin, username: str, client_ip: str):
+    if admin:
+        _log_auth_event("LOGIN_FAILED", admin, client_ip, f"Failed login attempt for {username}")
+    else:
+        # Log without admin reference for unknown usernames
+        _log_auth_event("LOGIN_FAILED", None, client_ip, f"Failed login attempt for unknown user: {username}")
+
 
-    # Update last login
+def _record_successful_login(db: Session, admin: AdminAccount, client_ip: str, upgraded_hash: str = None):
+    # Update last login, and the hash if it was made with an outdated work factor
     admin.last_login = datetime.utcnow()
+    if upgraded_hash:
+        admin.password_hash = upgraded_hash
+    record_audit(
+        db, "LOGIN_SUCCESS", "ADMIN",
+        entity_id=str(admin.id), changed_by=admin.id,
+        description=f"Admin {admin.username} logged in", ip_address=client_ip,
+    )
     db.commit()
 
-    # Generate tokens
+
+def _issue_tokens(admin: AdminAccount) -> TokenResponse:
+    """
+    Sign a new access/refresh token pair. May reload (or bootstrap) the
+    signing key set from the database, so async handlers run it in the threadpool.
+    """
     token_data = {
         "sub": str(admin.id),
         "level": admin.access_level.value,
         "username": admin.username,
     }
 
-    # Log successful login
-    _log_auth_event(db, "LOGIN_SUCCESS", admin, client_ip, f"Admin {admin.username} logged in")
-
     return TokenResponse(
         access_token=create_access_token(token_data),
         refresh_token=create_refresh_token(token_data),
@@ -119,6 +111,34 @@ def login(request: Request, login_req: LoginRequest, db: Session = Depends(get_d
     )
 
 
+@router.post("/login", response_model=TokenResponse)  # Also limited per IP, see ROUTE_LIMITS
+async def login(request: Request, login_req: LoginRequest, db: Session = Depends(get_db)):
+    """
+    Authenticate admin and return JWT tokens.
+
+    Async so that bcrypt runs on the dedicated password executor without
+    holding a request threadpool worker; the short DB steps and token
+    signing (which may reload the signing keys) use the threadpool.
+    """
+    client_ip = request.client.host if request.client else None
+
+    admin = await run_in_threadpool(_find_active_admin, db, login_req.username)
+
+    if not admin or not await verify_password_async(login_req.password, admin.password_hash):
+        await run_in_threadpool(_record_failed_login, admin, login_req.username, client_ip)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid username or password",
+        )
+
+    upgraded_hash = None
+    if password_needs_update(admin.password_hash):
+        upgraded_hash = await hash_password_async(login_req.password)
+    await run_in_threadpool(_record_successful_login, db, admin, client_ip, upgraded_hash)
+
+    return await run_in_threadpool(_issue_tokens, admin)
+
+
 @router.post("/refresh", response_model=TokenResponse)
 def refresh_token(req: RefreshRequest, db: Session = Depends(get_db)):
     """Refresh an access token using a valid refresh token."""
@@ -144,20 +164,9 @@ def refresh_token(req: RefreshRequest, db: Session = Depends(get_db)):
     # Revoke old refresh token
     old_jti = payload.get("jti")
     if old_jti:
-        revoke_token(old_jti)
+        revoke_token(old_jti, exp=payload.get("exp"))
 
-    token_data = {
-        "sub": str(admin.id),
-        "level": admin.access_level.value,
-        "username": admin.username,
-    }
-
-    return TokenResponse(
-        access_token=create_access_token(token_data),
-        refresh_token=create_refresh_token(token_data),
-        access_level=admin.access_level,
-        username=admin.username,
-    )
+    return _issue_tokens(admin)
 
 
 @router.post("/logout")
@@ -170,10 +179,10 @@ def logout(request: Request, current_admin: AdminAccount = Depends(get_current_a
         token = auth_header.split(" ", 1)[1]
         payload = decode_token(token)
         if payload and payload.get("jti"):
-            revoke_token(payload["jti"])
+            revoke_token(payload["jti"], exp=payload.get("exp"))
 
     client_ip = request.client.host if request.client else None
-    _log_auth_event(db, "LOGOUT", current_admin, client_ip, f"Admin {current_admin.username} logged out")
+    _log_auth_event("LOGOUT", current_admin, client_ip, f"Admin {current_admin.username} logged out")
 
     return {"message": "Logged out successfully"}
 
@@ -198,19 +207,16 @@ def register_admin(
         access_level=req.access_level,
     )
     db.add(admin)
-    db.commit()
-    db.refresh(admin)
+    db.flush()
 
-    # Audit log
-    log = AuditLog(
-        action="ADMIN_CREATED",
-        entity_type="ADMIN",
+    record_audit(
+        db, "ADMIN_CREATED", "ADMIN",
         entity_id=str(admin.id),
         changed_by=current_admin.id,
         description=f"Admin {req.username} created with {req.access_level.value} access",
     )
-    db.add(log)
     db.commit()
+    db.refresh(admin)
 
     return {"id": admin.id, "username": admin.username, "access_level": admin.access_level}
 
@@ -228,13 +234,13 @@ def reset_password(
         raise HTTPException(status_code=404, detail="Admin not found")
 
     target_admin.password_hash = hash_password(req.new_password)
-    db.commit()
-
     client_ip = request.client.host if request.client else None
-    _log_auth_event(
-        db, "PASSWORD_RESET", current_admin, client_ip,
-        f"Password reset for {target_admin.username} by {current_admin.username}",
+    record_audit(
+        db, "PASSWORD_RESET", "ADMIN",
+        entity_id=str(current_admin.id), changed_by=current_admin.id, ip_address=client_ip,
+        description=f"Password reset for {target_admin.username} by {current_admin.username}",
     )
+    db.commit()
 
     return {"message": f"Password reset for {target_admin.username}"}
     return {"message": f"Password reset for {target_admin.username}"}
@@ -263,20 +269,30 @@ class ChangePasswordRequest(BaseModel):
     new_password: str = Field(..., min_length=8)
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     req: ChangePasswordRequest,
     request: Request,
     db: Session = Depends(get_db),
     current_admin: AdminAccount = Depends(get_current_admin),
 ):
     """Change current admin's password."""
-    if not verify_password(req.current_password, current_admin.password_hash):
-        _log_auth_event(db, "PASSWORD_CHANGE_FAILED", current_admin, request.client.host, "Incorrect current password")
+    # current_admin may be a cached, detached principal — load the row to update
+    admin = await run_in_threadpool(
+        lambda: db.query(AdminAccount).filter(AdminAccount.id == current_admin.id).first()
+    )
+    client_ip = request.client.host if request.client else None
+    if not await verify_password_async(req.current_password, admin.password_hash):
+        await run_in_threadpool(
+            _log_auth_event, "PASSWORD_CHANGE_FAILED", current_admin, client_ip, "Incorrect current password",
+        )
         raise HTTPException(status_code=400, detail="Incorrect current password")
 
-    current_admin.password_hash = hash_password(req.new_password)
-    db.commit()
+    admin.password_hash = await hash_password_async(req.new_password)
+    record_audit(
+        db, "PASSWORD_CHANGED", "ADMIN",
+        entity_id=str(admin.id), changed_by=admin.id,
+        description="User changed their own password", ip_address=client_ip,
+    )
+    await run_in_threadpool(db.commit)
 
-    _log_auth_event(db, "PASSWORD_CHANGED", current_admin, request.client.host, "User changed their own password")
-    
     return {"message": "Password changed successfully"}
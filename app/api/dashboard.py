@@ -8,35 +8,46 @@ from datetime import datetime, date, timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 
-from app.database import get_db
 from app.models.user import User, UserCategory, UserStatus
 from app.models.role import Role
 from app.models.audit import AuditLog
 from app.models.admin import AdminAccount
-from app.api.deps import require_viewer, require_admin
-from app.config import settings
+from app.api.deps import require_viewer, require_admin, get_read_db, get_async_read_db
+from app.core.redis_client import get_redis
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
 @router.get("/stats")
-def get_dashboard_stats(db: Session = Depends(get_db), current_admin: AdminAccount = Depends(require_viewer)):
-    """Get dashboard statistics with proper DI."""
-    total_users = db.query(User).filter(User.deleted_at == None).count()
-    active_users = db.query(User).filter(User.status == UserStatus.ACTIVE, User.deleted_at == None).count()
-    total_interns = db.query(User).filter(User.category == UserCategory.INTERN, User.deleted_at == None).count()
-    total_employees = db.query(User).filter(User.category == UserCategory.EMPLOYEE, User.deleted_at == None).count()
-    total_roles = db.query(Role).filter(Role.is_active == True).count()
-    recent_actions = db.query(AuditLog).order_by(AuditLog.timestamp.desc()).limit(5).all()
+async def get_dashboard_stats(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: AdminAccount = Depends(require_viewer),
+):
+    """Get dashboard statistics (async; the four user counts share one scan)."""
+    user_counts = (await db.execute(
+        select(
+            func.count().label("total_users"),
+            func.count().filter(User.status == UserStatus.ACTIVE).label("active_users"),
+            func.count().filter(User.category == UserCategory.INTERN).label("total_interns"),
+            func.count().filter(User.category == UserCategory.EMPLOYEE).label("total_employees"),
+        ).where(User.deleted_at == None)
+    )).one()
+    total_roles = (await db.execute(
+        select(func.count()).select_from(Role).where(Role.is_active == True)
+    )).scalar_one()
+    recent_actions = (await db.execute(
+        select(AuditLog).order_by(AuditLog.timestamp.desc()).limit(5)
+    )).scalars().all()
 
     return {
-        "total_users": total_users,
-        "active_users": active_users,
-        "total_interns": total_interns,
-        "total_employees": total_employees,
+        "total_users": user_counts.total_users,
+        "active_users": user_counts.active_users,
+        "total_interns": user_counts.total_interns,
+        "total_employees": user_counts.total_employees,
         "total_roles": total_roles,
         "recent_actions": [
             {
@@ -54,9 +65,7 @@ def get_dashboard_stats(db: Session = Depends(get_db), current_admin: AdminAccou
 def get_intern_warnings():
     """Get cached intern expiry warnings from Redis."""
     try:
-        import redis
-        r = redis.from_url(settings.REDIS_URL)
-        data = r.get("prismid:intern_warnings")
+        data = get_redis().get("prismid:intern_warnings")
         if data:
             return {"warnings": json.loads(data)}
         return {"warnings": []}
@@ -67,7 +76,7 @@ def get_intern_warnings():
 @router.get("/stats/trend")
 def get_user_trend(
     days: int = Query(30, ge=7, le=90),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_viewer),
 ):
     """Get user creation trend data for the last N days."""
@@ -100,7 +109,7 @@ def export_audit_csv(
     action: Optional[str] = Query(None),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_admin),
 ):
     """Export audit logs as CSV download."""
@@ -1,5 +1,14 @@
 """
 FastAPI dependency injection — authentication (JWT + API Key) and database session.
+
+The auth dependencies are async: the common case (claims, principal cache,
+API key cache) does no I/O, and a cache miss is one query on the
+AsyncSession, so authentication never occupies a threadpool worker.
+Nothing on this path blocks the event loop: revocation falls back to the
+async Redis client and signing key reloads run in the threadpool.
+They always read from the primary, so a revoked key or deactivated admin
+is refused at once; read-only endpoints take `get_read_db` /
+`get_async_read_db`, which may be served by a read replica.
 """
 
 from datetime import datetime
@@ -7,28 +16,47 @@ from typing import Optional, Union
 
 from fastapi import Depends, HTTPException, Header, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.core.security import decode_token, hash_api_key
+from app.database import get_db, get_async_db
+from app.core.security import decode_token_async, hash_api_key
 from app.models.admin import AdminAccount, AccessLevel
 from app.models.api_key import ApiKey
 from app.core.permissions import check_access_level
+from app.config import settings
+from app.core.principal_cache import principal_cache, admin_from_snapshot, snapshot_admin
+from app.core.security_epochs import admin_from_claims
+from app.core.api_key_cache import VerifiedApiKey, get_verified_key, cache_verified_key
+from app.core.api_key_usage import record_api_key_use
+from app.core.replicas import current_admin_id
 
 
 security_scheme = HTTPBearer(auto_error=False)
 
+# Requests that may be authorized from token claims alone (see app.core.security_epochs)
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
 
-def _resolve_admin_from_jwt(
+async def _resolve_admin_from_jwt(
     credentials: HTTPAuthorizationCredentials,
-    db: Session,
+    db: AsyncSession,
+    claims_only: bool = False,
 ) -> AdminAccount:
-    """Validate JWT and return the owning AdminAccount."""
-    payload = decode_token(credentials.credentials)
+    """
+    Validate JWT and return the owning AdminAccount.
+
+    With `claims_only` (read-only requests), a token whose security epoch is
+    still current is trusted as-is and no admin lookup happens at all.
+    Otherwise active admins are served from the per-worker principal cache.
+    Every path returns a transient AdminAccount that is not attached to `db`.
+    """
+    payload = await decode_token_async(credentials.credentials)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,36 +71,62 @@ def _resolve_admin_from_jwt(
             detail="Invalid token payload",
         )
 
-    admin = db.query(AdminAccount).filter(
+    if claims_only and settings.AUTH_CLAIMS_FAST_PATH:
+        admin = admin_from_claims(payload)
+        if admin is not None:
+            return admin
+
+    admin = principal_cache.get(int(admin_id))
+    if admin is not None:
+        return admin
+
+    result = await db.execute(select(AdminAccount).where(
         AdminAccount.id == int(admin_id),
         AdminAccount.is_active == True,
-    ).first()
+    ))
+    admin = result.scalars().first()
+    snapshot = snapshot_admin(admin) if admin is not None else None
+    # End the read transaction so the connection goes back to the pool before the endpoint runs
+    await db.rollback()
 
-    if admin is None:
+    if snapshot is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Admin account not found or inactive",
         )
 
-    return admin
+    principal_cache.put_snapshot(snapshot)
+    return admin_from_snapshot(snapshot)
 
 
-def _resolve_api_key(
+async def _resolve_api_key(
     raw_key: str,
-    db: Session,
-) -> ApiKey:
-    """Validate an API key string and return the ApiKey row."""
-    hashed = hash_api_key(raw_key)
-    api_key = db.query(ApiKey).filter(
-        ApiKey.key_hash == hashed,
-        ApiKey.is_active == True,
-    ).first()
+    db: AsyncSession,
+    client_ip: Optional[str] = None,
+) -> VerifiedApiKey:
+    """
+    Validate an API key string and return its verified, cached view.
 
+    Active keys are served from the per-worker API key cache, and usage is
+    recorded write-behind, so repeat calls do no database work at all.
+    """
+    hashed = hash_api_key(raw_key)
+    api_key = get_verified_key(hashed)
     if api_key is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid API key",
-        )
+        result = await db.execute(select(ApiKey).where(
+            ApiKey.key_hash == hashed,
+            ApiKey.is_active == True,
+        ))  # owner is joined-loaded
+        row = result.scalars().first()
+        if row is not None:
+            api_key = cache_verified_key(row)
+        await db.rollback()
+
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key",
+            )
 
     # Check expiry
     if api_key.expires_at and api_key.expires_at < datetime.utcnow():
@@ -81,24 +135,51 @@ def _resolve_api_key(
             detail="API key has expired",
         )
 
-    # Touch last_used_at (fire-and-forget, don't fail the request)
-    try:
-        api_key.last_used_at = datetime.utcnow()
-        db.commit()
-    except Exception:
-        db.rollback()
+    # Buffered; flushed to last_used_at / request_count / last_used_ip in the background
+    record_api_key_use(api_key.id, client_ip)
 
     return api_key
 
 
+def _client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+def _is_read_only(request: Request) -> bool:
+    return request.method in READ_ONLY_METHODS
+
+
+def _authenticated(admin: AdminAccount) -> AdminAccount:
+    # Lets the replica router keep this admin's reads on the primary after their writes
+    current_admin_id.set(admin.id)
+    return admin
+
+
+# ---------------------------------------------------------------------------
+# Database sessions for read-only endpoints
+# ---------------------------------------------------------------------------
+
+async def get_read_db(db: Session = Depends(get_db)) -> Session:
+    """The request's session, marked read-only: its SELECTs may go to a read replica."""
+    db.info["read_only"] = True
+    return db
+
+
+async def get_async_read_db(db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
+    """get_read_db for async endpoints."""
+    db.info["read_only"] = True
+    return db
+
+
 # ---------------------------------------------------------------------------
 # Public dependencies
 # ---------------------------------------------------------------------------
 
-def get_current_admin(
+async def get_current_admin(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_scheme),
     x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> AdminAccount:
     """
     Resolve the caller's identity.
@@ -108,12 +189,12 @@ def get_current_admin(
     """
     # 1. Try JWT first
     if credentials is not None:
-        return _resolve_admin_from_jwt(credentials, db)
+        return _authenticated(await _resolve_admin_from_jwt(credentials, db, claims_only=_is_read_only(request)))
 
     # 2. Fall back to API key
     if x_api_key is not None:
-        api_key = _resolve_api_key(x_api_key, db)
-        return api_key.owner
+        api_key = await _resolve_api_key(x_api_key, db, _client_ip(request))
+        return _authenticated(api_key.owner)
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -122,12 +203,15 @@ def get_current_admin(
     )
 
 
-def get_current_api_key(
+async def get_current_api_key(
+    request: Request,
     x_api_key: str = Header(..., alias="X-API-Key"),
-    db: Session = Depends(get_db),
-) -> ApiKey:
+    db: AsyncSession = Depends(get_async_db),
+) -> VerifiedApiKey:
     """Dependency that *requires* an API key (not JWT)."""
-    return _resolve_api_key(x_api_key, db)
+    api_key = await _resolve_api_key(x_api_key, db, _client_ip(request))
+    current_admin_id.set(api_key.owner_id)
+    return api_key
 
 
 # ---------------------------------------------------------------------------
@@ -140,23 +224,24 @@ def require_scope(scope: str):
     Works for both JWT (admin always has all scopes) and API key callers.
     """
 
-    def _checker(
+    async def _checker(
+        request: Request,
         credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_scheme),
         x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
     ) -> AdminAccount:
         # JWT callers are trusted with all scopes
         if credentials is not None:
-            return _resolve_admin_from_jwt(credentials, db)
+            return _authenticated(await _resolve_admin_from_jwt(credentials, db, claims_only=_is_read_only(request)))
 
         if x_api_key is not None:
-            api_key = _resolve_api_key(x_api_key, db)
+            api_key = await _resolve_api_key(x_api_key, db, _client_ip(request))
             if not api_key.has_scope(scope):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail=f"API key does not have the required scope: {scope}",
                 )
-            return api_key.owner
+            return _authenticated(api_key.owner)
 
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -171,21 +256,21 @@ def require_scope(scope: str):
 # Access-level gates (unchanged API, now also works with API keys)
 # ---------------------------------------------------------------------------
 
-def require_viewer(current_admin: AdminAccount = Depends(get_current_admin)) -> AdminAccount:
+async def require_viewer(current_admin: AdminAccount = Depends(get_current_admin)) -> AdminAccount:
     """Require at least VIEWER access level."""
     if not check_access_level(AccessLevel.VIEWER, current_admin.access_level):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     return current_admin
 
 
-def require_admin(current_admin: AdminAccount = Depends(get_current_admin)) -> AdminAccount:
+async def require_admin(current_admin: AdminAccount = Depends(get_current_admin)) -> AdminAccount:
     """Require at least ADMIN access level."""
     if not check_access_level(AccessLevel.ADMIN, current_admin.access_level):
         raise HTTPException(status_code=403, detail="Requires ADMIN access or higher")
     return current_admin
 
 
-def require_superadmin(current_admin: AdminAccount = Depends(get_current_admin)) -> AdminAccount:
+async def require_superadmin(current_admin: AdminAccount = Depends(get_current_admin)) -> AdminAccount:
     """Require SUPERADMIN access level."""
     if not check_access_level(AccessLevel.SUPERADMIN, current_admin.access_level):
         raise HTTPException(status_code=403, detail="Requires SUPERADMIN access")
@@ -9,7 +9,7 @@ from pydantic import BaseModel, Field
 from app.database import get_db
 from app.models.domain import Domain
 from app.models.admin import AdminAccount
-from app.api.deps import require_viewer, require_superadmin
+from app.api.deps import require_viewer, require_superadmin, get_read_db
 
 router = APIRouter(prefix="/domains", tags=["Domains"])
 
@@ -33,7 +33,7 @@ class DomainResponse(BaseModel):
 def list_domains(
     include_deleted: bool = Query(False),
     deleted_only: bool = Query(False),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_viewer),
 ):
     """List all active domains."""
@@ -1,7 +1,8 @@
 """Role management API endpoints."""
 
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import or_, insert, update, func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 
@@ -9,19 +10,33 @@ from app.database import get_db
 from app.models.role import Role, UserRole
 from app.models.user import User
 from app.models.admin import AdminAccount
-from app.models.audit import AuditLog
-from app.schemas.role import RoleCreate, RoleUpdate, RoleResponse, RoleListResponse
-from app.api.deps import require_viewer, require_superadmin
+from app.schemas.role import (
+    RoleCreate, RoleUpdate, RoleResponse, RoleListResponse,
+    RoleBulkAssignmentRequest, RoleBulkAssignmentResponse,
+)
+from app.api.deps import require_viewer, require_admin, require_superadmin, get_read_db
+from app.core.audit_sink import audit_row, record_audit, record_audit_batch
+from app.core.counts import mark_user_counts_stale
+from app.core.etags import compute_etag, not_modified
+from app.services.search_service import apply_user_search_filters, uid_lookup
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 
+# Users handled per statement, keeping IN lists well under driver bind-parameter limits
+BULK_ASSIGNMENT_CHUNK_SIZE = 1000
 
-def _build_role_response(role: Role, db: Session) -> RoleResponse:
-    """Build a RoleResponse with assigned user count."""
-    count = db.query(UserRole).filter(
+
+def _assigned_users_count(role: Role, db: Session) -> int:
+    return db.query(UserRole).filter(
         UserRole.role_id == role.id,
         UserRole.removed_at == None,
     ).count()
+
+
+def _build_role_response(role: Role, db: Session, count: Optional[int] = None) -> RoleResponse:
+    """Build a RoleResponse with assigned user count."""
+    if count is None:
+        count = _assigned_users_count(role, db)
     return RoleResponse(
         id=role.id,
         name=role.name,
@@ -35,12 +50,20 @@ def _build_role_response(role: Role, db: Session) -> RoleResponse:
 
 @router.get("", response_model=RoleListResponse)
 def list_roles(
+    request: Request,
+    response: Response,
     include_inactive: bool = Query(False),
     deleted_only: bool = Query(False),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_viewer),
 ):
-    """List all roles (Viewer+ access)."""
+    """
+    List all roles (Viewer+ access).
+
+    The strong ETag fingerprints the matching roles (count, max updated_at)
+    and the assignments behind assigned_users_count, so a matching
+    If-None-Match gets 304 before any role is loaded.
+    """
     query = db.query(Role)
     if deleted_only:
         query = query.filter(Role.deleted_at != None)
@@ -65,6 +88,16 @@ def list_roles(
     if not deleted_only and not include_inactive:
          query = query.filter(Role.is_active == True)
 
+    assignments = (func.count(UserRole.id), func.max(UserRole.assigned_at), func.max(UserRole.removed_at))
+    state = query.with_entities(
+        func.count(Role.id),
+        func.max(Role.updated_at),
+        *(select(marker).correlate(None).scalar_subquery() for marker in assignments),
+    ).one()
+    unchanged = not_modified(request, response, compute_etag(*state, include_inactive, deleted_only))
+    if unchanged is not None:
+        return unchanged
+
     roles = query.order_by(Role.clearance_level.desc(), Role.name).all()
     return RoleListResponse(
         roles=[_build_role_response(r, db) for r in roles],
@@ -75,14 +108,21 @@ def list_roles(
 @router.get("/{role_id}", response_model=RoleResponse)
 def get_role(
     role_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_viewer),
 ):
     """Get a single role by ID (Viewer+ access)."""
     role = db.query(Role).filter(Role.id == role_id).first()
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
-    return _build_role_response(role, db)
+
+    count = _assigned_users_count(role, db)
+    unchanged = not_modified(request, response, compute_etag(role.id, role.updated_at, count, version=role.version))
+    if unchanged is not None:
+        return unchanged
+    return _build_role_response(role, db, count)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=RoleResponse)
@@ -103,13 +143,14 @@ def create_role(
     )
     db.add(role)
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="ROLE_CREATED",
         entity_type="role",
         entity_id=request.name,
         changed_by=current_admin.id,
         new_value={"name": request.name, "clearance_level": request.clearance_level},
-    ))
+    )
 
     db.commit()
     db.refresh(role)
@@ -157,7 +198,8 @@ def update_role(
     role.updated_at = datetime.utcnow()
     role.version = (role.version or 1) + 1
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="ROLE_UPDATED",
         entity_type="role",
         entity_id=str(role_id),
@@ -169,7 +211,7 @@ def update_role(
             "clearance_level": role.clearance_level,
             "is_active": role.is_active,
         },
-    ))
+    )
 
     db.commit()
     db.refresh(role)
@@ -205,14 +247,15 @@ def delete_role(
     role.is_active = False
     role.updated_at = datetime.utcnow()
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="ROLE_DELETED",
         entity_type="role",
         entity_id=str(role_id),
         changed_by=current_admin.id,
         previous_value={"name": role.name, "is_active": True},
         new_value={"is_active": False, "deleted_at": str(role.deleted_at)},
-    ))
+    )
 
     db.commit()
     return {"message": f"Role '{role.name}' soft-deleted"}
@@ -233,13 +276,14 @@ def restore_role(
     role.is_active = True
     role.updated_at = datetime.utcnow()
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="ROLE_RESTORED",
         entity_type="role",
         entity_id=str(role_id),
         changed_by=current_admin.id,
         description=f"Role {role.name} restored",
-    ))
+    )
 
     db.commit()
     return {"message": f"Role '{role.name}' restored"}
@@ -276,13 +320,150 @@ def permanent_delete_role(
     name = role.name
     db.delete(role)
     
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="ROLE_PERMANENTLY_DELETED",
         entity_type="role",
         entity_id=name, # Name as ID since ID is gone
         changed_by=current_admin.id,
         description=f"Role {name} permanently deleted",
-    ))
+    )
 
     db.commit()
     return {"message": f"Role permanently deleted"}
+
+
+def _bulk_assignment_targets(db: Session, request: RoleBulkAssignmentRequest) -> tuple[dict, list]:
+    """
+    Resolve a bulk assignment request to ({user.id: user.ulid}, unresolved user_ids).
+
+    Filters go through the same filter builder as search_users; explicit IDs
+    use the single-user resolution rules (ULID or display ID). Soft-deleted
+    users are never targeted.
+    """
+    query = db.query(User.id, User.ulid, User.display_suffix)
+
+    if request.filters is not None:
+        f = request.filters
+        query, _ = apply_user_search_filters(
+            query, db,
+            q=f.q, name=f.name, ulid=f.ulid, role=f.role, category=f.category,
+            status_filter=f.status, domain_id=f.domain_id, division_id=f.division_id,
+        )
+        return {row.id: row.ulid for row in query}, []
+
+    lookups = {uid: uid_lookup(uid) for uid in request.user_ids}
+    ulids = {v for kind, v in filter(None, lookups.values()) if kind == "ulid"}
+    suffixes = {v for kind, v in filter(None, lookups.values()) if kind == "suffix"}
+
+    by_ulid, by_suffix = {}, {}
+    if ulids or suffixes:
+        conditions = []
+        if ulids:
+            conditions.append(User.ulid.in_(ulids))
+        if suffixes:
+            conditions.append(User.display_suffix.in_(suffixes))
+        for row in query.filter(User.deleted_at == None, or_(*conditions)).order_by(User.id):
+            by_ulid[row.ulid] = row
+            by_suffix.setdefault(row.display_suffix, row)
+
+    targets, not_found = {}, []
+    for uid, lookup in lookups.items():
+        row = None
+        if lookup is not None:
+            kind, value = lookup
+            row = (by_suffix if kind == "suffix" else by_ulid).get(value)
+        if row is None:
+            not_found.append(uid)
+        else:
+            targets[row.id] = row.ulid
+    return targets, not_found
+
+
+@router.post("/{role_id}/assignments/bulk", response_model=RoleBulkAssignmentResponse)
+def bulk_role_assignments(
+    role_id: int,
+    request: RoleBulkAssignmentRequest,
+    db: Session = Depends(get_db),
+    current_admin: AdminAccount = Depends(require_admin),
+):
+    """
+    Assign or remove a role for many users at once (Admin+ access).
+
+    Targets are either explicit user_ids or search_users-style filters.
+    Users already in the requested state are skipped; previously removed
+    assignments are reactivated rather than duplicated. Changes and their
+    audit rows are written with set-based statements in one transaction.
+    """
+    role_query = db.query(Role).filter(Role.id == role_id, Role.deleted_at == None)
+    if request.action == "assign":
+        role_query = role_query.filter(Role.is_active == True)
+    role = role_query.first()
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found or inactive")
+
+    targets, not_found = _bulk_assignment_targets(db, request)
+    assigning = request.action == "assign"
+    now = datetime.utcnow()
+    no_sync = {"synchronize_session": False}
+
+    changed = []
+    user_ids = list(targets)
+    for start in range(0, len(user_ids), BULK_ASSIGNMENT_CHUNK_SIZE):
+        chunk = user_ids[start:start + BULK_ASSIGNMENT_CHUNK_SIZE]
+        # (user_id, role_id) is unique, so each user has at most one row for this role
+        current = dict(db.query(UserRole.user_id, UserRole.removed_at).filter(
+            UserRole.role_id == role_id,
+            UserRole.user_id.in_(chunk),
+        ).all())
+
+        if assigning:
+            reactivate = [uid for uid, removed_at in current.items() if removed_at is not None]
+            new = [uid for uid in chunk if uid not in current]
+            if reactivate:
+                db.execute(
+                    update(UserRole)
+                    .where(UserRole.role_id == role_id, UserRole.user_id.in_(reactivate))
+                    .values(removed_at=None, assigned_at=now, assigned_by=current_admin.id),
+                    execution_options=no_sync,
+                )
+            if new:
+                db.execute(insert(UserRole), [
+                    {"user_id": uid, "role_id": role_id, "assigned_at": now, "assigned_by": current_admin.id}
+                    for uid in new
+                ])
+            changed.extend(reactivate + new)
+        else:
+            active = [uid for uid, removed_at in current.items() if removed_at is None]
+            if active:
+                db.execute(
+                    update(UserRole)
+                    .where(UserRole.role_id == role_id, UserRole.user_id.in_(active), UserRole.removed_at == None)
+                    .values(removed_at=now),
+                    execution_options=no_sync,
+                )
+            changed.extend(active)
+
+    if changed:
+        value_key = "new_value" if assigning else "previous_value"
+        record_audit_batch(db, [
+            audit_row(
+                "ROLE_ASSIGNED" if assigning else "ROLE_REMOVED", "user",
+                entity_id=targets[uid],
+                changed_by=current_admin.id,
+                description="Bulk role assignment",
+                **{value_key: {"role": role.name}},
+            )
+            for uid in changed
+        ])
+        mark_user_counts_stale(db)
+
+    db.commit()
+    return RoleBulkAssignmentResponse(
+        role_id=role_id,
+        action=request.action,
+        matched=len(targets),
+        changed=len(changed),
+        skipped=len(targets) - len(changed),
+        not_found=not_found,
+    )
@@ -12,7 +12,7 @@ from app.database import get_db
 from app.models.admin import AdminAccount
 from app.models.sync import SheetSyncLog, SyncType, SyncTarget, SyncStatus
 from app.schemas.sync import SyncLogResponse, SyncLogListResponse, ExcelExportResponse
-from app.api.deps import require_admin
+from app.api.deps import require_admin, get_read_db
 from app.services.excel_service import ExcelService
 from app.config import settings
 
@@ -153,7 +153,7 @@ def trigger_google_sync(
 def list_sync_logs(
     page: int = 1,
     per_page: int = 50,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_admin),
 ):
     """List spreadsheet sync logs (Admin+ access)."""
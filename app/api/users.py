@@ -1,28 +1,57 @@
 """User management API endpoints."""
 
+import csv
+import io
+import json
 import math
+import zlib
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
+from sqlalchemy import or_, and_, func, select, insert
+from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 
 from app.database import get_db
 from app.models.user import User, UserCategory, UserStatus, InternshipTracking, InternshipStatus
 from app.models.role import Role, UserRole
 from app.models.admin import AdminAccount, AccessLevel
-from app.models.audit import AuditLog, ConversionHistory
+from app.models.audit import ConversionHistory
 from app.models.division import Division
 from app.models.domain import Domain
-from app.core.id_generator import generate_ulid, ulid_to_display_id, display_id_to_ulid_suffix, is_display_id_format
+from app.core.id_generator import (
+    generate_ulid, generate_batch_ulids, ulid_to_display_id,
+    is_ulid_collision, ULID_INSERT_ATTEMPTS,
+)
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.audit_sink import audit_row, record_audit, record_audit_batch
+from app.services.search_service import apply_user_search_filters, uid_lookup, uid_filter
+from app.core.counts import (
+    filters_fingerprint, get_cached_listing, set_cached_listing, set_cached_count,
+    estimate_row_count, mark_user_counts_stale,
+)
+from app.core.etags import compute_etag, not_modified
+from app.core.replicas import served_by_replica
 from app.schemas.user import (
     UserCreate, UserUpdate, UserResponse, UserSearchResponse,
+    UserBatchGetRequest, UserBatchGetResponse,
+    UserBulkCreateRequest, UserBulkCreateResponse, UserBulkCreatedItem, UserBulkError,
     InternConvertRequest, InternExtendRequest,
 )
-from app.api.deps import require_viewer, require_admin, require_superadmin, get_current_admin
+from app.api.deps import require_viewer, require_admin, require_superadmin, get_current_admin, get_read_db, get_async_read_db
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# Relationships needed by _build_user_response
+USER_LOAD_OPTIONS = (
+    joinedload(User.domain),
+    joinedload(User.division),
+    joinedload(User.user_roles).joinedload(UserRole.role),
+    joinedload(User.internship),
+)
+
 
 def _build_user_response(user: User) -> UserResponse:
     """Build a UserResponse from a User model instance."""
@@ -47,6 +76,19 @@ def _build_user_response(user: User) -> UserResponse:
     )
 
 
+def _user_etag(user: User) -> str:
+    """Strong ETag over every row _build_user_response reads (loaded with USER_LOAD_OPTIONS)."""
+    return compute_etag(
+        user.id,
+        user.updated_at,
+        sorted((ur.id, ur.removed_at, ur.role.id, ur.role.version, ur.role.updated_at) for ur in user.user_roles),
+        (user.domain.id, user.domain.updated_at) if user.domain else None,
+        (user.division.id, user.division.updated_at) if user.division else None,
+        (user.internship.id, user.internship.updated_at) if user.internship else None,
+        version=user.version,
+    )
+
+
 def _resolve_user_by_uid(db: Session, uid: str) -> User:
     """
     Resolve a user by ULID or display ID.
@@ -55,27 +97,123 @@ def _resolve_user_by_uid(db: Session, uid: str) -> User:
     If uid matches display ID format, extract suffix and search.
     Otherwise, try exact ULID match.
     """
-    query = db.query(User).options(
-        joinedload(User.domain),
-        joinedload(User.division),
-        joinedload(User.user_roles).joinedload(UserRole.role),
-        joinedload(User.internship),
-    ).filter(User.deleted_at == None)
+    lookup = uid_lookup(uid)
+    if lookup is None:
+        return None
+    return db.query(User).options(*USER_LOAD_OPTIONS).filter(
+        User.deleted_at == None,
+        uid_filter(lookup),
+    ).first()
 
-    # Full ULID (26 chars)
-    if len(uid) == 26:
-        return query.filter(User.ulid == uid.upper()).first()
 
-    # Display ID format (e.g., INT-T6V4-B1C9-D0 or T6V4-B1C9-D0)
-    if is_display_id_format(uid):
-        try:
-            suffix = display_id_to_ulid_suffix(uid)
-            return query.filter(User.ulid.endswith(suffix)).first()
-        except ValueError:
-            return None
+# --- Lean (Core) projection for listings ---
+
+USER_RESPONSE_FIELDS = set(UserResponse.model_fields)
+
+
+def _parse_fields(fields: str) -> set:
+    """Parse a `fields=` sparse fieldset ('*' selects every field)."""
+    if fields.strip() == "*":
+        return USER_RESPONSE_FIELDS
+    selected = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = selected - USER_RESPONSE_FIELDS
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown)) or '(none given)'}. "
+                   f"Allowed: {', '.join(sorted(USER_RESPONSE_FIELDS))}",
+        )
+    return selected
+
 
-    # Try as-is (could be partial or old format)
-    return query.filter(User.ulid == uid.upper()).first()
+def _role_names_subquery(db: Session):
+    """Correlated subquery aggregating a user's active role names as JSON."""
+    if db.get_bind().dialect.name == "postgresql":
+        aggregate = func.json_agg(Role.name)
+    else:
+        aggregate = func.json_group_array(Role.name)
+    return (
+        select(aggregate)
+        .select_from(UserRole)
+        .join(Role, Role.id == UserRole.role_id)
+        .where(
+            UserRole.user_id == User.id,
+            UserRole.removed_at == None,
+            Role.is_active == True,
+        )
+        .correlate(User)
+        .scalar_subquery()
+    )
+
+
+def _lean_user_query(query, db: Session):
+    """Turn a filtered User query into a single flat SELECT of response columns."""
+    return (
+        query.with_entities(
+            User.id, User.ulid, User.name, User.email, User.phone_number,
+            User.category, User.status, User.conversion_date, User.date_of_joining,
+            User.end_date, User.created_at,
+            Domain.name.label("domain_name"),
+            Division.name.label("division_name"),
+            InternshipTracking.start_date.label("internship_start_date"),
+            InternshipTracking.end_date.label("internship_end_date"),
+            _role_names_subquery(db).label("roles"),
+        )
+        .outerjoin(Domain, Domain.id == User.domain_id)
+        .outerjoin(Division, Division.id == User.division_id)
+        .outerjoin(InternshipTracking, InternshipTracking.user_id == User.id)
+    )
+
+
+def _build_user_response_from_row(row) -> UserResponse:
+    """Build a UserResponse from a _lean_user_query row."""
+    roles = row.roles
+    if isinstance(roles, str):
+        roles = json.loads(roles)
+    return UserResponse(
+        id=row.id,
+        ulid=row.ulid,
+        display_id=ulid_to_display_id(row.ulid, row.category.value),
+        name=row.name,
+        email=row.email,
+        phone_number=row.phone_number,
+        category=row.category,
+        status=row.status,
+        domain_name=row.domain_name,
+        division_name=row.division_name,
+        roles=roles or [],
+        conversion_date=row.conversion_date,
+        date_of_joining=row.date_of_joining,
+        start_date=row.internship_start_date,
+        end_date=row.end_date if row.end_date else row.internship_end_date,
+        created_at=row.created_at,
+    )
+
+
+def _validate_user_create(request: UserCreate) -> Optional[str]:
+    """Return an error message if a UserCreate breaks the intern date rules."""
+    if request.category == UserCategory.INTERN:
+        # If start_date not provided, use date_of_joining (which defaults to today if missing)
+        effective_start_date = request.start_date or request.date_of_joining or datetime.utcnow().date()
+
+        if not request.end_date:
+            return "Interns require an end_date"
+        if request.end_date <= effective_start_date:
+            return "end_date must be after start_date"
+    return None
+
+
+def _user_created_audit_value(request: UserCreate, date_of_joining) -> dict:
+    """new_value payload of a USER_CREATED audit row."""
+    return {
+        "name": request.name,
+        "category": request.category.value,
+        "email": request.email,
+        "phone_number": request.phone_number,
+        "domain_id": request.domain_id,
+        "division_id": request.division_id,
+        "date_of_joining": str(date_of_joining),
+    }
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=UserResponse)
@@ -86,41 +224,36 @@ def create_user(
 ):
     """Create a new user and generate their unique ULID (Superadmin only)."""
     # Validate intern fields
-    if request.category == UserCategory.INTERN:
-        # If start_date not provided, use date_of_joining (which defaults to today if missing)
-        effective_start_date = request.start_date or request.date_of_joining or datetime.utcnow().date()
-        
-        if not request.end_date:
-            raise HTTPException(
-                status_code=400,
-                detail="Interns require an end_date",
-            )
-        if request.end_date <= effective_start_date:
-            raise HTTPException(
-                status_code=400,
-                detail="end_date must be after start_date",
-            )
+    error = _validate_user_create(request)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
     # Check email uniqueness
     if db.query(User).filter(User.email == request.email, User.deleted_at == None).first():
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    # Generate ULID
-    ulid_value = generate_ulid(db)
-
-    # Create user
-    user = User(
-        ulid=ulid_value,
-        name=request.name,
-        email=request.email,
-        phone_number=request.phone_number,
-        category=request.category,
-        domain_id=request.domain_id,
-        division_id=request.division_id,
-        date_of_joining=request.date_of_joining or datetime.utcnow().date(),
-    )
-    db.add(user)
-    db.flush()  # Get user.id
+    # Create user — the ULID is generated in-process and the unique
+    # constraint catches the (astronomically rare) collision
+    for attempt in range(ULID_INSERT_ATTEMPTS):
+        ulid_value = generate_ulid()
+        user = User(
+            ulid=ulid_value,
+            name=request.name,
+            email=request.email,
+            phone_number=request.phone_number,
+            category=request.category,
+            domain_id=request.domain_id,
+            division_id=request.division_id,
+            date_of_joining=request.date_of_joining or datetime.utcnow().date(),
+        )
+        db.add(user)
+        try:
+            db.flush()  # Get user.id
+            break
+        except IntegrityError as e:
+            db.rollback()
+            if not is_ulid_collision(e) or attempt == ULID_INSERT_ATTEMPTS - 1:
+                raise
 
     # Create internship tracking if intern
     if request.category == UserCategory.INTERN:
@@ -139,31 +272,152 @@ def create_user(
             db.add(UserRole(user_id=user.id, role_id=role_id, assigned_by=current_admin.id))
 
     # Audit log
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="USER_CREATED",
         entity_type="user",
         entity_id=ulid_value,
         changed_by=current_admin.id,
-        new_value={
-            "name": request.name,
-            "category": request.category.value,
-            "email": request.email,
-            "phone_number": request.phone_number,
-            "domain_id": request.domain_id,
-            "division_id": request.division_id,
-            "date_of_joining": str(user.date_of_joining),
-        },
-    ))
+        new_value=_user_created_audit_value(request, user.date_of_joining),
+    )
 
     db.commit()
     db.refresh(user)
     return _build_user_response(user)
 
 
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=UserBulkCreateResponse)
+def bulk_create_users(
+    request: UserBulkCreateRequest,
+    db: Session = Depends(get_db),
+    current_admin: AdminAccount = Depends(require_superadmin),
+):
+    """
+    Create many users in one request (Superadmin only).
+
+    The whole batch is validated up front (intern dates, duplicate emails
+    against the directory and within the batch, unknown domain/division
+    ids) with one IN query per referenced table. Valid
+    users, internships, role assignments and audit rows are then written
+    with multi-row INSERTs in a single transaction. Invalid items are
+    reported in `errors` and do not block the rest of the batch.
+    """
+    items = request.users
+    errors: List[UserBulkError] = []
+
+    # Emails are unique across all rows, soft-deleted ones included
+    emails = {item.email for item in items}
+    taken = {row.email for row in db.query(User.email).filter(User.email.in_(emails)).all()}
+
+    # Unknown ids would fail the foreign keys and abort the whole INSERT
+    domain_ids = {item.domain_id for item in items if item.domain_id is not None}
+    known_domains = set()
+    if domain_ids:
+        known_domains = {row.id for row in db.query(Domain.id).filter(Domain.id.in_(domain_ids)).all()}
+    division_ids = {item.division_id for item in items if item.division_id is not None}
+    known_divisions = set()
+    if division_ids:
+        known_divisions = {row.id for row in db.query(Division.id).filter(Division.id.in_(division_ids)).all()}
+
+    valid = []
+    seen = set()
+    for index, item in enumerate(items):
+        error = _validate_user_create(item)
+        if error is None and item.email in taken:
+            error = "Email already registered"
+        if error is None and item.email in seen:
+            error = "Duplicate email in batch"
+        if error is None and item.domain_id is not None and item.domain_id not in known_domains:
+            error = "Domain not found"
+        if error is None and item.division_id is not None and item.division_id not in known_divisions:
+            error = "Division not found"
+        if error:
+            errors.append(UserBulkError(index=index, email=item.email, detail=error))
+            continue
+        seen.add(item.email)
+        valid.append((index, item))
+
+    if not valid:
+        return UserBulkCreateResponse(created=[], errors=errors)
+
+    # Same rule as create_user: unknown or inactive roles are skipped
+    requested_role_ids = {rid for _, item in valid for rid in (item.role_ids or [])}
+    active_role_ids = set()
+    if requested_role_ids:
+        active_role_ids = {
+            row.id for row in db.query(Role.id).filter(Role.id.in_(requested_role_ids), Role.is_active == True).all()
+        }
+
+    today = datetime.utcnow().date()
+    for attempt in range(ULID_INSERT_ATTEMPTS):
+        ulids = generate_batch_ulids(len(valid))
+        user_rows = []
+        for (index, item), ulid_value in zip(valid, ulids):
+            user_rows.append({
+                "ulid": ulid_value,
+                "display_suffix": ulid_value[-10:],
+                "name": item.name,
+                "email": item.email,
+                "phone_number": item.phone_number,
+                "category": item.category,
+                "domain_id": item.domain_id,
+                "division_id": item.division_id,
+                "date_of_joining": item.date_of_joining or today,
+            })
+        try:
+            inserted = db.execute(
+                insert(User).returning(User.id, User.ulid, sort_by_parameter_order=True),
+                user_rows,
+            ).all()
+            break
+        except IntegrityError as e:
+            db.rollback()
+            if not is_ulid_collision(e) or attempt == ULID_INSERT_ATTEMPTS - 1:
+                raise
+    user_ids = {row.ulid: row.id for row in inserted}
+
+    internship_rows, role_rows, audit_rows, created = [], [], [], []
+    for (index, item), row in zip(valid, user_rows):
+        user_id = user_ids[row["ulid"]]
+        if item.category == UserCategory.INTERN:
+            internship_rows.append({
+                "user_id": user_id,
+                "start_date": item.start_date or item.date_of_joining or today,
+                "end_date": item.end_date,
+            })
+        for role_id in dict.fromkeys(item.role_ids or []):
+            if role_id in active_role_ids:
+                role_rows.append({"user_id": user_id, "role_id": role_id, "assigned_by": current_admin.id})
+        audit_rows.append(audit_row(
+            "USER_CREATED", "user",
+            entity_id=row["ulid"],
+            changed_by=current_admin.id,
+            new_value=_user_created_audit_value(item, row["date_of_joining"]),
+        ))
+        created.append(UserBulkCreatedItem(
+            index=index,
+            ulid=row["ulid"],
+            display_id=ulid_to_display_id(row["ulid"], item.category.value),
+            email=item.email,
+        ))
+
+    if internship_rows:
+        db.execute(insert(InternshipTracking), internship_rows)
+    if role_rows:
+        db.execute(insert(UserRole), role_rows)
+    record_audit_batch(db, audit_rows)
+
+    mark_user_counts_stale(db)
+    db.commit()
+    return UserBulkCreateResponse(created=created, errors=errors)
+
+
 from sqlalchemy import or_
 
 @router.get("", response_model=UserSearchResponse)
 def search_users(
+    request: Request,
+    response: Response,
     q: Optional[str] = Query(None, description="Generic search (Name, ULID, Display ID, Email)"),
     name: Optional[str] = Query(None),
     ulid: Optional[str] = Query(None),
@@ -176,101 +430,380 @@ def search_users(
     deleted_only: bool = Query(False, description="Only return soft-deleted users"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="'offset' (page numbers) or 'cursor' (keyset)"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (implies cursor mode)"),
+    with_total: bool = Query(True, description="Compute the total match count (extra COUNT query)"),
+    estimate: bool = Query(False, description="Allow a planner row estimate for the total on lightly filtered listings"),
+    fields: Optional[str] = Query(None, description="Comma-separated user fields to return ('*' for all); uses the lean projection"),
+    db: Session = Depends(get_read_db),
     current_admin: AdminAccount = Depends(require_viewer),
 ):
-    """Search users with filtering (Viewer+ access)."""
-    query = db.query(User).options(
-        joinedload(User.domain),
-        joinedload(User.division),
-        joinedload(User.user_roles).joinedload(UserRole.role),
-        joinedload(User.internship),
+    """
+    Search users with filtering (Viewer+ access).
+
+    Offset mode (default) pages with page/per_page. Cursor mode pages on
+    (created_at, id) and returns next_cursor, so deep pages cost the same
+    as the first one. Pass with_total=false to skip the COUNT query.
+    Exact totals are cached in Redis per filter set until the next user
+    write (only when read from the primary, so a lagging replica never
+    re-caches stale state); estimate=true returns a planner estimate instead where possible.
+
+    `q` is matched against name/email through a trigram (PostgreSQL) or
+    FTS5 (SQLite) index and, in offset mode, ranked by match quality.
+
+    `fields` selects a sparse fieldset and builds rows from one flat SELECT
+    with aggregated role names instead of hydrating ORM objects.
+
+    Exact listings (with_total=true, estimate=false) carry a strong ETag
+    built from the matching users' count and max(updated_at) plus change
+    markers of the embedded tables; it is cached with the total, so a
+    matching If-None-Match usually gets 304 without touching the database.
+    """
+    cursor_mode = pagination == "cursor" or cursor is not None
+
+    # Sparse fieldsets take the Core fast path (no ORM hydration)
+    selected_fields = None
+    if fields is not None:
+        selected_fields = _parse_fields(fields)
+
+    filters = {
+        "q": q, "name": name, "ulid": ulid, "role": role, "category": category,
+        "status_filter": status_filter, "domain_id": domain_id, "division_id": division_id,
+        "include_deleted": include_deleted, "deleted_only": deleted_only,
+    }
+    fingerprint = cached_total = etag = generation = None
+    if with_total:
+        fingerprint = filters_fingerprint({
+            "q": q, "name": name, "ulid": ulid, "role": role,
+            "category": category, "status": status_filter,
+            "domain_id": domain_id, "division_id": division_id,
+            "include_deleted": include_deleted, "deleted_only": deleted_only,
+        })
+        cached_total, listing_etag, generation = get_cached_listing(fingerprint)
+
+        if not estimate:
+            if cached_total is None or listing_etag is None:
+                state = _user_listing_state(db, filters)
+                cached_total, listing_etag = state[0], compute_etag(*state)
+                if not served_by_replica(db):
+                    set_cached_listing(fingerprint, cached_total, listing_etag, generation)
+            # One ETag per page/fieldset of the listing
+            etag = compute_etag(listing_etag, sorted(request.query_params.multi_items()))
+            unchanged = not_modified(request, response, etag)
+            if unchanged is not None:
+                return unchanged
+
+    page_response, counted = _search_users_page(
+        db,
+        filters,
+        page=page,
+        per_page=per_page,
+        cursor_mode=cursor_mode,
+        cursor=cursor,
+        with_total=with_total,
+        estimate=estimate,
+        cached_total=cached_total,
+        lean=selected_fields is not None,
+    )
+    if counted and not served_by_replica(db):
+        set_cached_count(fingerprint, page_response.total, generation)
+
+    if selected_fields is None:
+        return page_response
+
+    content = page_response.model_dump(mode="json", exclude={"users"})
+    content["users"] = [u.model_dump(mode="json", include=selected_fields) for u in page_response.users]
+    return JSONResponse(content=content, headers={"ETag": etag} if etag else None)
+
+
+def _user_listing_state(db: Session, filters: dict) -> tuple:
+    """
+    Fingerprint of a user listing for its ETag, in one statement: the
+    count (which doubles as the exact total) and max(updated_at) of the
+    matching users, then change markers of the tables each row embeds.
+    """
+    query, _ = apply_user_search_filters(db.query(func.count(User.id), func.max(User.updated_at)), db, **filters)
+    markers = (
+        func.count(UserRole.id), func.max(UserRole.assigned_at), func.max(UserRole.removed_at),
+        func.max(Role.updated_at), func.max(Domain.updated_at), func.max(Division.updated_at),
+        func.count(InternshipTracking.id), func.max(InternshipTracking.updated_at),
     )
+    query = query.add_columns(*(select(marker).correlate(None).scalar_subquery() for marker in markers))
+    return tuple(query.one())
+
+
+def _search_users_page(
+    db: Session,
+    filters: dict,
+    *,
+    page: int,
+    per_page: int,
+    cursor_mode: bool,
+    cursor: Optional[str],
+    with_total: bool,
+    estimate: bool,
+    cached_total: Optional[int],
+    lean: bool,
+) -> tuple[UserSearchResponse, bool]:
+    """
+    The database side of search_users. Returns the page and whether the
+    total was freshly counted (and should be cached).
+    """
+    query, rank = apply_user_search_filters(db.query(User), db, **filters)
+
+    total = None
+    total_estimated = False
+    counted = False
+    if with_total:
+        # Planner estimates are only trustworthy without text/role filters
+        lightly_filtered = not (filters["q"] or filters["name"] or filters["ulid"] or filters["role"])
+        if estimate and lightly_filtered:
+            total = estimate_row_count(db, query.with_entities(User.id).statement)
+            total_estimated = total is not None
+        if total is None:
+            total = cached_total
+            if total is None:
+                total = query.count()
+                counted = True
+
+    if lean:
+        query = _lean_user_query(query, db)
+        build = _build_user_response_from_row
+    else:
+        query = query.options(*USER_LOAD_OPTIONS)
+        build = _build_user_response
+
+    # Best matches first in offset mode; cursor mode must keep the keyset order
+    if rank is not None and not cursor_mode:
+        query = query.order_by(rank.desc(), User.created_at.desc(), User.id.desc())
+    else:
+        query = query.order_by(User.created_at.desc(), User.id.desc())
 
-    if deleted_only:
-        query = query.filter(User.deleted_at != None)
-    elif not include_deleted:
-        query = query.filter(User.deleted_at == None)
-
-    # Generic search (OR logic)
-    if q:
-        search_term = f"%{q}%"
-        search_filters = [
-            User.name.ilike(search_term),
-            User.email.ilike(search_term),
-            User.ulid == q.upper(),
-        ]
-        # Also check if it's a display ID format
-        if is_display_id_format(q):
+    next_cursor = None
+    if cursor_mode:
+        if cursor:
             try:
-                suffix = display_id_to_ulid_suffix(q)
-                search_filters.append(User.ulid.endswith(suffix))
-            except ValueError:
-                pass
-        query = query.filter(or_(*search_filters))
-
-    # Specific filters (AND logic)
-    if name:
-        query = query.filter(User.name.ilike(f"%{name}%"))
-    if ulid:
-        query = query.filter(User.ulid == ulid.upper())
-    if category:
-        query = query.filter(User.category == category)
-    if status_filter:
-        query = query.filter(User.status.in_(status_filter))
-    if domain_id:
-        query = query.filter(User.domain_id == domain_id)
-    if division_id:
-        query = query.filter(User.division_id == division_id)
-    if role:
-        query = query.join(User.user_roles).join(UserRole.role).filter(
-            Role.name.ilike(f"%{role}%"),
-            UserRole.removed_at == None,
+                after_created_at, after_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            query = query.filter(or_(
+                User.created_at < after_created_at,
+                and_(User.created_at == after_created_at, User.id < after_id),
+            ))
+
+        # Fetch one extra row to learn whether another page exists
+        rows = query.limit(per_page + 1).all()
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        response = UserSearchResponse(
+            users=[build(r) for r in rows],
+            total=total,
+            total_estimated=total_estimated,
+            per_page=per_page,
+            next_cursor=next_cursor,
+        )
+    else:
+        rows = query.offset((page - 1) * per_page).limit(per_page).all()
+        response = UserSearchResponse(
+            users=[build(r) for r in rows],
+            total=total,
+            total_estimated=total_estimated,
+            page=page,
+            per_page=per_page,
+            pages=(math.ceil(total / per_page) if total > 0 else 1) if total is not None else None,
         )
 
-    total = query.count()
-    users = query.order_by(User.created_at.desc()).offset(
-        (page - 1) * per_page
-    ).limit(per_page).all()
+    return response, counted
 
-    return UserSearchResponse(
-        users=[_build_user_response(u) for u in users],
-        total=total,
-        page=page,
-        per_page=per_page,
-        pages=math.ceil(total / per_page) if total > 0 else 1,
+
+EXPORT_BATCH_SIZE = 1000
+
+
+@router.get("/export")
+def export_users(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated user fields to export (default: all)"),
+    q: Optional[str] = Query(None, description="Generic search (Name, ULID, Display ID, Email)"),
+    name: Optional[str] = Query(None),
+    ulid: Optional[str] = Query(None),
+    role: Optional[str] = Query(None),
+    category: Optional[UserCategory] = Query(None),
+    status_filter: Optional[List[UserStatus]] = Query(None, alias="status"),
+    domain_id: Optional[int] = Query(None),
+    division_id: Optional[int] = Query(None),
+    include_deleted: bool = Query(False, description="Include soft-deleted users"),
+    deleted_only: bool = Query(False, description="Only return soft-deleted users"),
+    db: Session = Depends(get_read_db),
+    current_admin: AdminAccount = Depends(require_viewer),
+):
+    """
+    Stream the whole (filtered) directory as NDJSON or CSV (Viewer+ access).
+
+    Takes the same filters as GET /users. Rows come from the lean Core
+    projection through a server-side cursor (yield_per), so memory stays
+    bounded regardless of directory size. The body is gzip-compressed when
+    the client's Accept-Encoding allows gzip (q > 0).
+    """
+    selected = _parse_fields(fields) if fields else USER_RESPONSE_FIELDS
+    columns = [f for f in UserResponse.model_fields if f in selected]
+
+    query, _ = apply_user_search_filters(
+        db.query(User), db,
+        q=q, name=name, ulid=ulid, role=role, category=category,
+        status_filter=status_filter, domain_id=domain_id, division_id=division_id,
+        include_deleted=include_deleted, deleted_only=deleted_only,
     )
+    query = _lean_user_query(query, db).order_by(User.created_at.desc(), User.id.desc())
+
+    def render_batches():
+        # The request-scoped session is closed before the response streams,
+        # so this generator owns it from here on
+        try:
+            out = io.StringIO()
+            writer = csv.writer(out) if format == "csv" else None
+            if writer:
+                writer.writerow(columns)
+            for count, row in enumerate(query.yield_per(EXPORT_BATCH_SIZE), start=1):
+                data = _build_user_response_from_row(row).model_dump(mode="json", include=selected)
+                if writer:
+                    writer.writerow([
+                        ";".join(data[c]) if c == "roles" else ("" if data[c] is None else data[c])
+                        for c in columns
+                    ])
+                else:
+                    out.write(json.dumps(data, separators=(",", ":")) + "\n")
+                if count % EXPORT_BATCH_SIZE == 0:
+                    yield _drain(out)
+            yield _drain(out)
+        finally:
+            db.close()
+
+    chunks = render_batches()
+    headers = {
+        "Content-Disposition": f"attachment; filename=users_{datetime.utcnow().strftime('%Y%m%d')}.{format}",
+    }
+    headers["Vary"] = "Accept-Encoding"
+    if _accepts_gzip(request.headers.get("Accept-Encoding", "")):
+        chunks = _gzip_stream(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    """Empty a text buffer into one encoded chunk."""
+    chunk = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip. An explicit gzip entry
+    wins over `*`; a q-value of 0 refuses the coding.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def _gzip_stream(chunks):
+    """Gzip a byte stream, flushing after each chunk so clients see progress."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+@router.post("/batch-get", response_model=UserBatchGetResponse)
+def batch_get_users(
+    request: UserBatchGetRequest,
+    db: Session = Depends(get_read_db),
+    current_admin: AdminAccount = Depends(require_viewer),
+):
+    """
+    Resolve up to 1000 ULIDs and/or display IDs in one call (Viewer+ access).
+
+    Uses the same resolution rules as single-user lookups (soft-deleted
+    users are not returned) and a single SELECT regardless of batch size.
+    Results are keyed by the input ID; unresolved IDs map to null and are
+    listed in not_found.
+    """
+    lookups = {uid: uid_lookup(uid) for uid in request.ids}
+    ulids = {v for kind, v in filter(None, lookups.values()) if kind == "ulid"}
+    suffixes = {v for kind, v in filter(None, lookups.values()) if kind == "suffix"}
+
+    by_ulid, by_suffix = {}, {}
+    if ulids or suffixes:
+        conditions = []
+        if ulids:
+            conditions.append(User.ulid.in_(ulids))
+        if suffixes:
+            conditions.append(User.display_suffix.in_(suffixes))
+        users = db.query(User).options(*USER_LOAD_OPTIONS).filter(
+            User.deleted_at == None,
+            or_(*conditions),
+        ).order_by(User.id).all()
+        for user in users:
+            by_ulid[user.ulid] = user
+            by_suffix.setdefault(user.display_suffix, user)
+
+    results, not_found = {}, []
+    for uid, lookup in lookups.items():
+        user = None
+        if lookup is not None:
+            kind, value = lookup
+            user = (by_suffix if kind == "suffix" else by_ulid).get(value)
+        results[uid] = _build_user_response(user) if user else None
+        if user is None:
+            not_found.append(uid)
+
+    return UserBatchGetResponse(results=results, not_found=not_found)
 
 
 @router.get("/{uid}", response_model=UserResponse)
-def get_user(
+async def get_user(
     uid: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     current_admin: AdminAccount = Depends(require_viewer),
 ):
     """Get a single user by their ULID or display ID (Viewer+ access)."""
     # Allow fetching deleted users if accessed directly by ID
-    query = db.query(User).options(
-        joinedload(User.domain),
-        joinedload(User.division),
-        joinedload(User.user_roles).joinedload(UserRole.role),
-        joinedload(User.internship),
-    )
-
-    if len(uid) == 26:
-        user = query.filter(User.ulid == uid.upper()).first()
-    elif is_display_id_format(uid):
-        try:
-            suffix = display_id_to_ulid_suffix(uid)
-            user = query.filter(User.ulid.endswith(suffix)).first()
-        except ValueError:
-            user = None
-    else:
-        user = query.filter(User.ulid == uid.upper()).first()
+    lookup = uid_lookup(uid)
+    user = None
+    if lookup is not None:
+        result = await db.execute(select(User).options(*USER_LOAD_OPTIONS).where(uid_filter(lookup)).limit(1))
+        user = result.unique().scalars().first()
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    unchanged = not_modified(request, response, _user_etag(user))
+    if unchanged is not None:
+        return unchanged
     return _build_user_response(user)
 
 
@@ -321,7 +854,8 @@ def update_user(
     user.updated_at = datetime.utcnow()
     user.version = (user.version or 1) + 1
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="USER_UPDATED",
         entity_type="user",
         entity_id=user.ulid,
@@ -334,7 +868,7 @@ def update_user(
             "status": user.status.value,
             "date_of_joining": str(user.date_of_joining),
         },
-    ))
+    )
 
     db.commit()
     db.refresh(user)
@@ -355,13 +889,14 @@ def soft_delete_user(
     user.deleted_at = datetime.utcnow()
     user.status = UserStatus.INACTIVE
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="USER_DELETED",
         entity_type="user",
         entity_id=user.ulid,
         changed_by=current_admin.id,
         description=f"User {user.name} soft-deleted",
-    ))
+    )
 
     db.commit()
     return {"message": f"User {user.ulid} deleted", "ulid": user.ulid}
@@ -387,13 +922,14 @@ def restore_user(
     user.status = UserStatus.ACTIVE
     user.updated_at = datetime.utcnow()
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="USER_RESTORED",
         entity_type="user",
         entity_id=user.ulid,
         changed_by=current_admin.id,
         description=f"User {user.name} restored from trash",
-    ))
+    )
 
     db.commit()
     return {"message": f"User {user.ulid} restored", "ulid": user.ulid}
@@ -427,13 +963,14 @@ def permanent_delete_user(
     # Delete user (UserRoles should cascade)
     db.delete(user)
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="USER_PERMANENTLY_DELETED",
         entity_type="user",
         entity_id=user_details["ulid"], # Note: Entity will no longer exist
         changed_by=current_admin.id,
         description=f"User {user_details['name']} ({user_details['email']}) permanently deleted",
-    ))
+    )
 
     db.commit()
     return {"message": f"User {uid} permanently deleted"}
@@ -468,13 +1005,14 @@ def assign_role(
 
     db.add(UserRole(user_id=user.id, role_id=role_id, assigned_by=current_admin.id))
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="ROLE_ASSIGNED",
         entity_type="user",
         entity_id=user.ulid,
         changed_by=current_admin.id,
         new_value={"role": role.name},
-    ))
+    )
 
     db.commit()
     return {"message": f"Role '{role.name}' assigned to user '{user.name}'"}
@@ -502,13 +1040,14 @@ def remove_role(
 
     user_role.removed_at = datetime.utcnow()
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="ROLE_REMOVED",
         entity_type="user",
         entity_id=user.ulid,
         changed_by=current_admin.id,
         previous_value={"role": user_role.role.name},
-    ))
+    )
 
     db.commit()
     return {"message": "Role removed successfully"}
@@ -568,7 +1107,8 @@ def convert_intern(
     ))
 
     # Audit log
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="INTERN_CONVERTED",
         entity_type="user",
         entity_id=user.ulid,
@@ -579,7 +1119,7 @@ def convert_intern(
             "roles_migrated": active_roles,
             "display_id": ulid_to_display_id(user.ulid, "EMPLOYEE"),
         },
-    ))
+    )
 
     db.commit()
     db.refresh(user)
@@ -623,14 +1163,15 @@ def extend_internship(
         user.status = UserStatus.ACTIVE
         user.updated_at = datetime.utcnow()
 
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="INTERNSHIP_EXTENDED",
         entity_type="user",
         entity_id=user.ulid,
         changed_by=current_admin.id,
         previous_value={"end_date": str(old_end_date)},
         new_value={"end_date": str(request.new_end_date), "reason": request.reason},
-    ))
+    )
 
     db.commit()
     db.refresh(user)
@@ -670,13 +1211,14 @@ def end_internship(
     user.updated_at = datetime.utcnow()
 
     # Log
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="INTERNSHIP_ENDED",
         entity_type="user",
         entity_id=user.ulid,
         changed_by=current_admin.id,
         description=f"Internship for {user.name} ended early by admin",
-    ))
+    )
 
     db.commit()
     db.refresh(user)
@@ -710,7 +1252,8 @@ def retire_employee(
     user.updated_at = datetime.utcnow()
 
     # Log
-    db.add(AuditLog(
+    record_audit(
+        db,
         action="USER_RETIRED",
         entity_type="user",
         entity_id=user.ulid,
@@ -718,7 +1261,7 @@ def retire_employee(
         previous_value={"status": previous_status},
         new_value={"status": "INACTIVE"},
         description=f"Employee {user.name} retired/deactivated",
-    ))
+    )
 
     db.commit()
     db.refresh(user)
@@ -0,0 +1,133 @@
+"""
+In-process cache of verified API keys, keyed by key hash.
+
+A hit gives everything the auth path needs (expiry, owner, pre-parsed
+scopes) without touching the database. Only active keys are cached.
+
+Invalidation follows the admin principal cache: any committed ORM change
+to an ApiKey (e.g. revoke_api_key setting is_active = False) or to the
+owning AdminAccount drops the affected entries here immediately and on
+every other worker via Redis pub/sub. The TTL bounds staleness when Redis
+is unavailable.
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import pubsub
+from app.core.principal_cache import snapshot_admin, admin_from_snapshot
+from app.core.redis_client import get_redis
+from app.core.ttl_cache import LruTtlCache
+from app.models.admin import AdminAccount
+from app.models.api_key import ApiKey
+
+logger = logging.getLogger(__name__)
+
+
+API_KEY_INVALIDATION_CHANNEL = "prismid:api_key_invalidations"
+
+
+class VerifiedApiKey:
+    """Immutable, session-less view of an active API key."""
+
+    __slots__ = ("id", "name", "key_hash", "owner_id", "expires_at", "scopes", "rate_limit", "_owner")
+
+    def __init__(self, api_key: ApiKey):
+        self.id = api_key.id
+        self.name = api_key.name
+        self.key_hash = api_key.key_hash
+        self.owner_id = api_key.owner_id
+        self.expires_at: Optional[datetime] = api_key.expires_at
+        self.scopes = frozenset(api_key.scopes_list)
+        self.rate_limit: Optional[str] = api_key.rate_limit
+        self._owner = snapshot_admin(api_key.owner)
+
+    @property
+    def owner(self) -> AdminAccount:
+        """The owning admin, as a transient AdminAccount."""
+        return admin_from_snapshot(self._owner)
+
+    def has_scope(self, required_scope: str) -> bool:
+        return ApiKey.scopes_allow(self.scopes, required_scope)
+
+
+api_key_cache = LruTtlCache(
+    max_size=settings.API_KEY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS,
+)
+
+
+def get_verified_key(key_hash: str) -> Optional[VerifiedApiKey]:
+    return api_key_cache.get(key_hash)
+
+
+def cache_verified_key(api_key: ApiKey) -> VerifiedApiKey:
+    verified = VerifiedApiKey(api_key)
+    api_key_cache.put(verified.key_hash, verified)
+    return verified
+
+
+# ---------------------------------------------------------------------------
+# Cross-worker invalidation over Redis pub/sub
+#   "key:<hash>"  one key         "owner:<admin id>"  every key of an admin
+# ---------------------------------------------------------------------------
+
+def _apply_invalidation(message: str) -> None:
+    kind, _, value = message.partition(":")
+    if kind == "key":
+        api_key_cache.invalidate(value)
+    elif kind == "owner":
+        owner_id = int(value)
+        api_key_cache.invalidate_where(lambda verified: verified.owner_id == owner_id)
+    else:
+        raise ValueError(message)
+
+
+def publish_api_key_invalidation(message: str) -> None:
+    """Apply an invalidation here and broadcast it to every worker (best-effort)."""
+    _apply_invalidation(message)
+    try:
+        get_redis().publish(API_KEY_INVALIDATION_CHANNEL, message)
+    except Exception:
+        pass
+
+
+def _handle_invalidation_message(data) -> None:
+    if isinstance(data, bytes):
+        data = data.decode()
+    try:
+        _apply_invalidation(data)
+    except ValueError:
+        logger.warning("Ignoring malformed API key invalidation message: %r", data)
+
+
+pubsub.subscribe(
+    API_KEY_INVALIDATION_CHANNEL,
+    _handle_invalidation_message,
+    on_connect=api_key_cache.invalidate,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_keys(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, ApiKey) and obj.key_hash is not None:
+            session.info.setdefault("api_key_invalidations", set()).add(f"key:{obj.key_hash}")
+        elif isinstance(obj, AdminAccount) and obj.id is not None:
+            session.info.setdefault("api_key_invalidations", set()).add(f"owner:{obj.id}")
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_on_commit(session):
+    for message in session.info.pop("api_key_invalidations", ()):
+        publish_api_key_invalidation(message)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("api_key_invalidations", None)
@@ -0,0 +1,155 @@
+"""
+Write-behind recording of API key usage.
+
+Authenticating with an API key used to commit an UPDATE of last_used_at on
+every request. Usage is now accumulated per worker in memory — request
+count, last-seen time and client IP per key — and flushed every
+API_KEY_USAGE_FLUSH_SECONDS in its own session, as one UPDATE per key used
+during the interval (sent as a single executemany).
+
+Counters are incremented in SQL, so any number of workers can flush
+concurrently; last_used_at / last_used_ip only move forward in time. A
+crash loses at most one interval of usage stats, which authentication
+never depends on.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update, bindparam, case, or_
+
+from app.config import settings
+from app.models.api_key import ApiKey
+
+logger = logging.getLogger(__name__)
+
+
+class UsageBuffer:
+    """Per-worker map of key id -> [request count, last used at, last IP]."""
+
+    def __init__(self):
+        self._pending: dict[int, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key_id: int, ip: Optional[str], at: Optional[datetime] = None) -> None:
+        at = at or datetime.utcnow()
+        with self._lock:
+            entry = self._pending.get(key_id)
+            if entry is None:
+                self._pending[key_id] = [1, at, ip]
+            else:
+                entry[0] += 1
+                if at >= entry[1]:
+                    entry[1], entry[2] = at, ip
+
+    def drain(self) -> dict[int, list]:
+        """Take everything recorded so far, leaving the buffer empty."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, drained: dict[int, list]) -> None:
+        """Merge a drained batch back in (after a failed flush)."""
+        with self._lock:
+            for key_id, (count, at, ip) in drained.items():
+                entry = self._pending.get(key_id)
+                if entry is None:
+                    self._pending[key_id] = [count, at, ip]
+                else:
+                    entry[0] += count
+                    if at > entry[1]:
+                        entry[1], entry[2] = at, ip
+
+
+usage_buffer = UsageBuffer()
+
+
+def record_api_key_use(key_id: int, ip: Optional[str]) -> None:
+    """Note one authenticated request for a key (no I/O)."""
+    usage_buffer.record(key_id, ip)
+
+
+_api_keys = ApiKey.__table__
+_is_newer = or_(_api_keys.c.last_used_at.is_(None), _api_keys.c.last_used_at < bindparam("used_at"))
+_FLUSH_STATEMENT = (
+    update(_api_keys)
+    .where(_api_keys.c.id == bindparam("key_id"))
+    .values(
+        request_count=_api_keys.c.request_count + bindparam("hits"),
+        last_used_at=case((_is_newer, bindparam("used_at")), else_=_api_keys.c.last_used_at),
+        last_used_ip=case((_is_newer, bindparam("ip")), else_=_api_keys.c.last_used_ip),
+    )
+)
+
+
+def flush_usage(session_factory=None) -> int:
+    """
+    Write buffered usage to the database. Returns the number of keys updated.
+
+    On failure the batch is put back, to be retried on the next flush.
+    """
+    pending = usage_buffer.drain()
+    if not pending:
+        return 0
+
+    if session_factory is None:
+        from app.database import SessionLocal
+        session_factory = SessionLocal
+
+    rows = [
+        {"key_id": key_id, "hits": count, "used_at": at, "ip": ip}
+        for key_id, (count, at, ip) in sorted(pending.items())  # Stable lock order across workers
+    ]
+    db = session_factory()
+    try:
+        db.execute(_FLUSH_STATEMENT, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        usage_buffer.restore(pending)
+        raise
+    finally:
+        db.close()
+    return len(rows)
+
+
+# ---------------------------------------------------------------------------
+# Background flusher
+# ---------------------------------------------------------------------------
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _run_flusher(interval: float) -> None:
+    while not _stop.wait(interval):
+        try:
+            flush_usage()
+        except Exception as e:
+            logger.warning("API key usage flush failed, will retry: %s", e)
+
+
+def start_usage_flusher() -> None:
+    """Start this worker's periodic flush thread (idempotent)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_run_flusher, args=(settings.API_KEY_USAGE_FLUSH_SECONDS,),
+        name="api-key-usage-flusher", daemon=True,
+    )
+    _thread.start()
+
+
+def stop_usage_flusher() -> None:
+    """Stop the flush thread and write out whatever is still buffered."""
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+    try:
+        flush_usage()
+    except Exception as e:
+        logger.warning("Final API key usage flush failed: %s", e)
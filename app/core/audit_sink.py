@@ -0,0 +1,336 @@
+"""
+Central sink for audit-log rows.
+
+Two ways to write an audit row:
+
+- record_audit(db, ...) / record_audit_batch(db, rows) — transactional.
+  The rows join the caller's session and commit (or roll back) with the
+  change they describe. Use it whenever the audited action itself writes
+  to the database.
+- enqueue_audit(...) — buffered. The row, its timestamp taken at enqueue
+  time, is appended to a Redis list shared by every worker and
+  bulk-inserted by a background flusher every AUDIT_FLUSH_SECONDS in
+  batches of AUDIT_BATCH_SIZE. Use it for events that write nothing else
+  (failed logins, logouts...), so they cost no commit on the request
+  path. It does blocking I/O: async handlers call it in the threadpool.
+
+Buffered delivery is at-least-once. Rows in Redis survive a worker crash
+or restart; a batch is trimmed from the list only after its INSERT is
+committed, and one worker at a time drains the list (a Redis lock). If
+Redis is unavailable, rows go to a per-worker in-memory queue instead,
+flushed the same way and put back in front on failure. Once that queue
+holds AUDIT_MAX_PENDING rows, enqueue_audit writes the row to the
+database itself rather than dropping it, pushing back on the caller.
+Queue depth, direct writes and flush latency are reported in /api/health.
+"""
+
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.redis_client import get_redis
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+AUDIT_QUEUE_KEY = "prismid:audit:pending"
+AUDIT_FLUSH_LOCK_KEY = "prismid:audit:flush-lock"
+_FLUSH_LOCK_SECONDS = 60  # Outlives a stuck flush on a crashed worker, then another takes over
+
+# Delete the lock only if it still holds our token (it may have expired and been re-taken)
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def audit_row(
+    action: str,
+    entity_type: str,
+    entity_id: Optional[str] = None,
+    changed_by: Optional[int] = None,
+    previous_value: Optional[dict] = None,
+    new_value: Optional[dict] = None,
+    description: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+) -> dict:
+    """Column values of one audit_logs row."""
+    return {
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "changed_by": changed_by,
+        "previous_value": previous_value,
+        "new_value": new_value,
+        "description": description,
+        "ip_address": ip_address,
+        "timestamp": timestamp or datetime.utcnow(),
+    }
+
+
+def record_audit(db: Session, action: str, entity_type: str, **fields) -> AuditLog:
+    """Add an audit row to the caller's transaction (no commit)."""
+    log = AuditLog(**audit_row(action, entity_type, **fields))
+    db.add(log)
+    return log
+
+
+def record_audit_batch(db: Session, rows: list[dict]) -> None:
+    """Insert many audit_row() dicts in the caller's transaction as one multi-row INSERT."""
+    if rows:
+        db.execute(insert(AuditLog), rows)
+
+
+class AuditBuffer:
+    """Per-worker FIFO of pending audit rows, with flush instrumentation."""
+
+    def __init__(self):
+        self._rows: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self.peak_depth = 0
+        self.direct_writes = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self._flush_seconds = 0.0
+        self.last_flush_ms: Optional[float] = None
+
+    def push(self, row: dict, max_pending: int) -> Optional[int]:
+        """Queue a row; returns the new depth, or None (row not queued) if max_pending are waiting."""
+        with self._lock:
+            if len(self._rows) >= max_pending:
+                return None
+            self._rows.append(row)
+            depth = len(self._rows)
+            self.peak_depth = max(self.peak_depth, depth)
+            return depth
+
+    def take(self, limit: int) -> list[dict]:
+        with self._lock:
+            return [self._rows.popleft() for _ in range(min(limit, len(self._rows)))]
+
+    def put_back(self, rows: list[dict]) -> None:
+        """Return a batch that failed to flush to the front of the queue."""
+        with self._lock:
+            self._rows.extendleft(reversed(rows))
+
+    def record_direct_write(self) -> None:
+        with self._lock:
+            self.direct_writes += 1
+
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def drain(self) -> list[dict]:
+        with self._lock:
+            rows, self._rows = list(self._rows), deque()
+        return rows
+
+    def record_flush(self, rows: int, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self.last_flush_ms = round(seconds * 1000, 1)
+            if failed:
+                self.failed_flushes += 1
+                return
+            self.flushes += 1
+            self.flushed += rows
+            self._flush_seconds += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": len(self._rows),
+                "peak_queue_depth": self.peak_depth,
+                "direct_writes": self.direct_writes,
+                "flushed_rows": self.flushed,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "last_flush_ms": self.last_flush_ms,
+                "avg_flush_ms": round(self._flush_seconds * 1000 / self.flushes, 1) if self.flushes else None,
+            }
+
+
+audit_buffer = AuditBuffer()
+
+# Serializes flushes so batches are inserted in enqueue order
+_flush_lock = threading.Lock()
+
+
+def _encode_row(row: dict) -> str:
+    return json.dumps({**row, "timestamp": row["timestamp"].isoformat()}, default=str)
+
+
+def _decode_row(raw: bytes) -> dict:
+    row = json.loads(raw)
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+def _default_session_factory():
+    from app.database import SessionLocal
+    return SessionLocal
+
+
+def _insert_rows(session_factory, rows: list[dict]) -> None:
+    """Insert rows in one transaction; raises (after rolling back) on failure."""
+    db = None
+    try:
+        db = session_factory()
+        db.execute(insert(AuditLog), rows)
+        db.commit()
+    except Exception:
+        if db is not None:
+            db.rollback()
+        raise
+    finally:
+        if db is not None:
+            db.close()
+
+
+def enqueue_audit(action: str, entity_type: str, session_factory=None, **fields) -> None:
+    """
+    Queue an audit row for the background flusher (blocking I/O: call it
+    from sync code or the threadpool, never on the event loop).
+    """
+    row = audit_row(action, entity_type, **fields)
+    try:
+        depth = get_redis().rpush(AUDIT_QUEUE_KEY, _encode_row(row))
+    except Exception:
+        depth = audit_buffer.push(row, settings.AUDIT_MAX_PENDING)
+        if depth is None:
+            # Redis down and the local queue full: write it now rather than lose it
+            audit_buffer.record_direct_write()
+            _insert_rows(session_factory or _default_session_factory(), [row])
+            return
+    if depth >= settings.AUDIT_BATCH_SIZE:
+        _wake.set()
+
+
+def _flush_local(session_factory) -> int:
+    written = 0
+    while True:
+        batch = audit_buffer.take(settings.AUDIT_BATCH_SIZE)
+        if not batch:
+            return written
+        started = time.perf_counter()
+        try:
+            _insert_rows(session_factory, batch)
+        except Exception:
+            audit_buffer.put_back(batch)
+            audit_buffer.record_flush(len(batch), time.perf_counter() - started, failed=True)
+            raise
+        audit_buffer.record_flush(len(batch), time.perf_counter() - started)
+        written += len(batch)
+
+
+def _flush_redis(session_factory, r) -> int:
+    token = secrets.token_hex(8)
+    try:
+        if not r.set(AUDIT_FLUSH_LOCK_KEY, token, nx=True, ex=_FLUSH_LOCK_SECONDS):
+            return 0  # Another worker is draining the list
+    except Exception:
+        return 0  # Redis unavailable: nothing can have been queued there meanwhile
+
+    written = 0
+    try:
+        while True:
+            raw = r.lrange(AUDIT_QUEUE_KEY, 0, settings.AUDIT_BATCH_SIZE - 1)
+            if not raw:
+                return written
+            started = time.perf_counter()
+            try:
+                _insert_rows(session_factory, [_decode_row(item) for item in raw])
+            except Exception:
+                audit_buffer.record_flush(len(raw), time.perf_counter() - started, failed=True)
+                raise
+            # Committed: only now leave the list (a crash in between re-inserts the batch)
+            r.ltrim(AUDIT_QUEUE_KEY, len(raw), -1)
+            r.expire(AUDIT_FLUSH_LOCK_KEY, _FLUSH_LOCK_SECONDS)
+            audit_buffer.record_flush(len(raw), time.perf_counter() - started)
+            written += len(raw)
+    finally:
+        try:
+            r.eval(_RELEASE_LUA, 1, AUDIT_FLUSH_LOCK_KEY, token)
+        except Exception:
+            pass
+
+
+def flush_audit(session_factory=None, redis_factory=get_redis) -> int:
+    """
+    Insert every queued audit row — this worker's in-memory fallback queue,
+    then the shared Redis list — one batch per transaction. Returns the
+    number of rows written.
+
+    A batch leaves its queue only once committed; on failure it stays
+    queued and the error is re-raised.
+    """
+    if session_factory is None:
+        session_factory = _default_session_factory()
+    with _flush_lock:
+        written = _flush_local(session_factory)
+        return written + _flush_redis(session_factory, redis_factory())
+
+
+# ---------------------------------------------------------------------------
+# Background flusher
+# ---------------------------------------------------------------------------
+
+_stop = threading.Event()
+# Set by enqueue_audit when a full batch is waiting, to flush before the interval ends
+_wake = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _run_flusher(interval: float) -> None:
+    while True:
+        _wake.wait(interval)
+        _wake.clear()
+        if _stop.is_set():
+            return
+        try:
+            flush_audit()
+        except Exception as e:
+            logger.warning("Audit flush failed, will retry: %s", e)
+            # Back off for a full interval; early wake-ups would retry a down database in a loop
+            if _stop.wait(interval):
+                return
+
+
+def start_audit_flusher() -> None:
+    """Start this worker's periodic flush thread (idempotent)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _wake.clear()
+    _thread = threading.Thread(
+        target=_run_flusher, args=(settings.AUDIT_FLUSH_SECONDS,),
+        name="audit-flusher", daemon=True,
+    )
+    _thread.start()
+
+
+def stop_audit_flusher() -> None:
+    """Stop the flush thread and write out whatever is still queued."""
+    _stop.set()
+    _wake.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+    try:
+        flush_audit()
+    except Exception as e:
+        logger.warning("Final audit flush failed, %d rows lost: %s", audit_buffer.depth(), e)
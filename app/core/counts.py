@@ -0,0 +1,188 @@
+"""
+Fast totals for list endpoints.
+
+- A Redis cache of exact user-search totals, keyed by a normalized hash of
+  the filters, next to each listing's ETag (see app.core.etags). Any
+  committed write to users / user_roles / internships, or to the roles,
+  domains and divisions a listing row embeds, drops the whole cache (see
+  the session hooks at the bottom of this module) and bumps a generation
+  counter. Readers note the generation before querying and only store
+  what they computed if it is unchanged, so a listing read before a
+  concurrent commit cannot be written back after that commit's
+  invalidation.
+- Planner row estimates via EXPLAIN, for cheap approximate totals on
+  unfiltered or lightly filtered listings (PostgreSQL only).
+"""
+
+import hashlib
+import json
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.redis_client import get_redis
+
+
+USER_COUNT_CACHE_KEY = "prismid:user_counts"
+USER_COUNT_GENERATION_KEY = "prismid:user_counts:generation"
+USER_COUNT_CACHE_TTL_SECONDS = 300  # Safety net for writes that bypass the hooks
+
+# Tables whose writes can change a user-search total or the rows of a listing
+USER_COUNT_TABLES = {"users", "user_roles", "internship_tracking", "roles", "domains", "divisions"}
+
+
+# ---------------------------------------------------------------------------
+# Redis count cache
+# ---------------------------------------------------------------------------
+
+def filters_fingerprint(filters: dict) -> str:
+    """
+    Hash a filter set into a stable cache field.
+
+    Unset filters are dropped, list values are sorted and string values are
+    case-folded (every text filter is matched case-insensitively), so
+    equivalent requests share one cache entry.
+    """
+    normalized = {}
+    for name, value in filters.items():
+        if value is None or value is False or value == [] or value == "":
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = sorted(str(getattr(v, "value", v)) for v in value)
+        elif isinstance(value, str):
+            value = value.lower()
+        else:
+            value = getattr(value, "value", value)
+        normalized[name] = value
+    raw = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# Store hash fields only if no invalidation happened since the reader noted the generation
+_STORE_IF_GENERATION_LUA = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class CachedListing(NamedTuple):
+    total: Optional[int]
+    etag: Optional[str]
+    generation: Optional[str]  # Pass back to set_cached_*; None if Redis is unavailable
+
+
+def get_cached_listing(fingerprint: str) -> CachedListing:
+    """Cached total and ETag of a listing (either None on a miss), with the current generation."""
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hmget(USER_COUNT_CACHE_KEY, fingerprint, f"{fingerprint}:etag")
+        pipe.get(USER_COUNT_GENERATION_KEY)
+        (total, etag), generation = pipe.execute()
+    except Exception:
+        return CachedListing(None, None, None)
+    return CachedListing(
+        int(total) if total is not None else None,
+        etag.decode() if etag is not None else None,
+        generation.decode() if generation is not None else "0",
+    )
+
+
+def _store_if_generation(generation: Optional[str], fields: dict) -> None:
+    if generation is None:
+        return
+    try:
+        args = [generation, USER_COUNT_CACHE_TTL_SECONDS]
+        for field, value in fields.items():
+            args += [field, value]
+        get_redis().eval(_STORE_IF_GENERATION_LUA, 2, USER_COUNT_CACHE_KEY, USER_COUNT_GENERATION_KEY, *args)
+    except Exception:
+        pass
+
+
+def set_cached_count(fingerprint: str, total: int, generation: Optional[str]) -> None:
+    """Store a total computed after get_cached_listing returned `generation` (best-effort)."""
+    _store_if_generation(generation, {fingerprint: total})
+
+
+def set_cached_listing(fingerprint: str, total: int, etag: str, generation: Optional[str]) -> None:
+    """Store a listing's total and ETag together, like set_cached_count."""
+    _store_if_generation(generation, {fingerprint: total, f"{fingerprint}:etag": etag})
+
+
+def invalidate_user_counts() -> None:
+    """Drop every cached user-search total and start a new generation (best-effort)."""
+    try:
+        pipe = get_redis().pipeline()
+        pipe.incr(USER_COUNT_GENERATION_KEY)
+        pipe.delete(USER_COUNT_CACHE_KEY)
+        pipe.execute()
+    except Exception:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Planner estimates
+# ---------------------------------------------------------------------------
+
+class explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON) <stmt>` as an executable construct."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def _compile_explain_pg(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_row_count(db: Session, statement) -> Optional[int]:
+    """
+    Return the planner's row estimate for a SELECT, without running it.
+
+    Returns None on databases without a usable EXPLAIN (e.g. SQLite), so the
+    caller can fall back to an exact count.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    plan = db.execute(explain(statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+# ---------------------------------------------------------------------------
+# Invalidation hooks — any committed ORM write to a user table drops the cache
+# ---------------------------------------------------------------------------
+
+def mark_user_counts_stale(session: Session) -> None:
+    """Flag a session whose Core-level writes (no ORM flush) touch user tables."""
+    session.info["user_counts_stale"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_user_counts_stale(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, "__tablename__", None) in USER_COUNT_TABLES:
+            session.info["user_counts_stale"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("user_counts_stale", False):
+        invalidate_user_counts()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("user_counts_stale", None)
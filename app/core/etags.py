@@ -0,0 +1,49 @@
+"""
+Strong ETags and If-None-Match handling for conditional GETs.
+
+An ETag is a digest of the values a representation is built from (row
+versions, updated_at timestamps, counts), so an endpoint can compute it
+and answer 304 Not Modified before it loads or serializes anything else.
+When the representation carries a row version, the ETag starts with it
+("v3-…"), which makes it easy to match against PUT's `version` field.
+"""
+
+import hashlib
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def compute_etag(*parts, version: Optional[int] = None) -> str:
+    """Quoted strong ETag for the given fingerprint values (ints, strings, datetimes, None, tuples)."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    if version is not None:
+        return f'"v{version}-{digest}"'
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Return a 304 response if the request's If-None-Match matches `etag`.
+    Otherwise set the ETag header on the endpoint's `response` and return None.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
@@ -9,8 +9,11 @@ Generates ULID-based identifiers for users.
 - Display ID is derived deterministically from the ULID for human readability.
 """
 
+import os
 import re
-from ulid import ULID
+import threading
+import time
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 
@@ -18,25 +21,93 @@ from sqlalchemy.orm import Session
 CROCKFORD_BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
 
 
-def generate_ulid(db: Session) -> str:
+class MonotonicUlidGenerator:
     """
-    Generate a unique ULID.
+    Thread-safe, monotonic ULID factory.
+
+    Within one millisecond the 80-bit random part is advanced by a random
+    step instead of redrawn, so IDs from this process are strictly
+    increasing even under bursts while display IDs (the low 50 bits) stay
+    non-sequential. If the clock steps backwards the last timestamp is reused.
+    Uniqueness across processes relies on the 80 random bits plus the
+    users.ulid unique constraint (callers retry on IntegrityError), so no
+    database round trip is needed.
+    """
+
+    RANDOM_BITS = 80
+    RANDOM_MAX = (1 << RANDOM_BITS) - 1
+    STEP_BITS = 40  # In-millisecond increments are random in [1, 2^40]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new(self) -> str:
+        """Return one new ULID."""
+        return self.batch(1)[0]
+
+    def batch(self, count: int) -> list[str]:
+        """Return `count` strictly increasing ULIDs under a single lock."""
+        out = []
+        with self._lock:
+            for _ in range(count):
+                now_ms = time.time_ns() // 1_000_000
+                if now_ms > self._last_ms:
+                    self._last_ms = now_ms
+                    self._last_random = int.from_bytes(os.urandom(10), "big")
+                else:
+                    self._last_random += 1 + int.from_bytes(os.urandom(self.STEP_BITS // 8), "big")
+                if self._last_random > self.RANDOM_MAX:
+                    # Random space for this millisecond exhausted: borrow the next one
+                    self._last_ms += 1
+                    self._last_random = int.from_bytes(os.urandom(10), "big")
+                out.append(_encode_ulid((self._last_ms << self.RANDOM_BITS) | self._last_random))
+        return out
+
+
+def _encode_ulid(value: int) -> str:
+    """Encode a 128-bit integer as a 26-char Crockford Base32 ULID."""
+    chars = []
+    for _ in range(26):
+        chars.append(CROCKFORD_BASE32[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+_generator = MonotonicUlidGenerator()
+
+# Attempts callers make when an insert hits the users.ulid unique constraint
+ULID_INSERT_ATTEMPTS = 3
+
+
+def generate_ulid(db: Session | None = None) -> str:
+    """
+    Generate a unique ULID without touching the database.
+
+    Args:
+        db: Ignored; accepted for backward compatibility.
 
     Returns:
         26-character uppercase Crockford Base32 string.
     """
-    from app.models.user import User  # Lazy import to avoid circular
+    return _generator.new()
+
 
-    max_attempts = 100
-    for attempt in range(max_attempts):
-        ulid_value = str(ULID()).upper()
+# users.ulid is unique through both its table constraint and its index (PostgreSQL names)
+ULID_UNIQUE_CONSTRAINTS = {"users_ulid_key", "ix_users_ulid"}
 
-        # Validate uniqueness
-        existing = db.query(User.id).filter(User.ulid == ulid_value).first()
-        if not existing:
-            return ulid_value
 
-    raise RuntimeError("Failed to generate unique ULID after 100 attempts")
+def is_ulid_collision(exc: IntegrityError) -> bool:
+    """True if an IntegrityError came from the users.ulid unique constraint."""
+    diag = getattr(exc.orig, "diag", None)
+    if diag is not None:
+        # PostgreSQL: a unique_violation on one of the ulid constraints
+        return getattr(exc.orig, "pgcode", None) == "23505" and diag.constraint_name in ULID_UNIQUE_CONSTRAINTS
+    # SQLite: "UNIQUE constraint failed: users.ulid" (columns of a composite key are comma-separated)
+    message = str(exc.orig)
+    prefix = "UNIQUE constraint failed: "
+    return message.startswith(prefix) and "users.ulid" in message[len(prefix):].split(", ")
 
 
 def validate_ulid(ulid_str: str) -> bool:
@@ -107,6 +178,6 @@ def is_display_id_format(value: str) -> bool:
     return bool(re.match(pattern, value.upper().strip()))
 
 
-def generate_batch_ulids(db: Session, count: int) -> list[str]:
-    """Generate multiple unique ULIDs in one call."""
-    return [generate_ulid(db) for _ in range(count)]
+def generate_batch_ulids(count: int) -> list[str]:
+    """Generate multiple unique, increasing ULIDs in one call (no DB hits)."""
+    return _generator.batch(count)
@@ -0,0 +1,132 @@
+"""
+Redis-backed store for Idempotency-Key responses (asyncio client).
+
+Each key moves through two states in a single Redis string:
+
+- "pending:<token>" — set with SET NX by the first request to claim the
+  key, expiring after IDEMPOTENCY_LOCK_SECONDS in case that worker dies.
+  A concurrent duplicate sees it and waits (polling) up to
+  IDEMPOTENCY_WAIT_SECONDS for the result, then gives up with 409.
+- "done:" + zlib(header line + body) — the finished 2xx response, kept for
+  IDEMPOTENCY_TTL_SECONDS. Bodies larger than IDEMPOTENCY_MAX_BODY_BYTES
+  are not stored.
+
+If the first request fails (non-2xx, exception, body too large), it
+deletes its own marker, so a retry with the same key runs again. Both
+completing and releasing only touch the key while it still holds the
+request's own marker: if the marker expired and another request claimed
+the key, that request's claim (or result) is left alone.
+"""
+
+import asyncio
+import json
+import secrets
+import time
+import zlib
+from typing import NamedTuple, Optional
+
+from app.config import settings
+from app.core.redis_client import get_async_redis
+
+
+KEY_PREFIX = "prismid:idempotency:v2"
+
+_PENDING = b"pending:"
+_DONE = b"done:"
+
+# Delete the key only if it still holds our marker (it may have expired and been re-claimed)
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Replace our marker with the finished response, only if the key still holds it
+_COMPLETE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Times claim() retries SET NX after finding the key gone between SET NX and GET
+_MAX_RECLAIMS = 3
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+
+
+class InProgress(Exception):
+    """Another request holding the same key did not finish in time."""
+
+
+def _encode(response: StoredResponse) -> bytes:
+    header = json.dumps({"status_code": response.status_code, "content_type": response.content_type})
+    return _DONE + zlib.compress(header.encode() + b"\n" + response.body)
+
+
+def _decode(value: bytes) -> StoredResponse:
+    header, _, body = zlib.decompress(value[len(_DONE):]).partition(b"\n")
+    meta = json.loads(header)
+    return StoredResponse(meta["status_code"], meta["content_type"], body)
+
+
+class IdempotencyStore:
+    def __init__(self, redis_factory=get_async_redis, poll_seconds: float = 0.05):
+        self.redis_factory = redis_factory
+        self.poll_seconds = poll_seconds
+
+    async def claim(self, key: str) -> tuple[Optional[bytes], Optional[StoredResponse]]:
+        """
+        Claim `key` for this request.
+
+        Returns (marker, None) when the caller should run the handler and
+        later complete() or release() with `marker`, or (None, response)
+        when a finished response is available to replay. Raises InProgress
+        if another request still holds the key after the wait, and lets
+        Redis errors propagate.
+        """
+        r = self.redis_factory()
+        marker = _PENDING + secrets.token_hex(8).encode()
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        reclaims = 0
+        while True:
+            if await r.set(key, marker, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS):
+                return marker, None
+            value = await r.get(key)
+            if value is not None and value.startswith(_DONE):
+                return None, _decode(value)
+            if value is None:
+                # Released or expired between SET NX and GET: claim again, a bounded number of times
+                reclaims += 1
+                if reclaims > _MAX_RECLAIMS:
+                    raise InProgress(key)
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            if time.monotonic() >= deadline:
+                raise InProgress(key)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def complete(self, key: str, marker: bytes, response: StoredResponse) -> bool:
+        """
+        Store the finished response in place of our marker. Returns False if
+        it was too large or the key no longer holds `marker`.
+        """
+        if len(response.body) > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+            return False
+        stored = await self.redis_factory().eval(
+            _COMPLETE_LUA, 1, key, marker, _encode(response), settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+        return bool(stored)
+
+    async def release(self, key: str, marker: bytes) -> None:
+        """Drop our in-progress marker without storing anything."""
+        await self.redis_factory().eval(_RELEASE_LUA, 1, key, marker)
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,227 @@
+"""
+Asymmetric JWT signing keys and the published JWKS.
+
+With JWT_ALGORITHM set to an asymmetric algorithm (RS256), tokens are
+signed with a private key from the `jwt_signing_keys` table and carry its
+`kid`; every non-expired public key is published at
+/.well-known/jwks.json so other services can verify tokens offline.
+
+Key lifecycle (see rotate_signing_keys, run on a Celery beat schedule):
+1. A new key is inserted with `activates_at` JWT_KEY_PUBLISH_LEAD_MINUTES
+   in the future, so verifiers that cache the JWKS pick it up before the
+   first token signed with it appears.
+2. From `activates_at` on, it is the signing key (the newest active key).
+3. The keys it replaces get `expires_at` = its activation + the longest
+   token lifetime, remaining in the JWKS until every token they signed
+   has expired, and are deleted after that.
+
+Private keys are stored as PKCS#8 PEM, encrypted with
+JWT_KEY_ENCRYPTION_PASSPHRASE when it is set. Without a passphrase they
+are stored in plaintext, so anyone who can read the table can sign
+tokens. Keys created before a passphrase was configured stay plaintext
+until rotated out.
+
+Each worker keeps the key set in memory and reloads it every
+JWT_KEY_RELOAD_SECONDS, or early when a token names an unknown kid.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.signing_key import SigningKey
+
+
+ASYMMETRIC_ALGORITHMS = {"RS256"}
+
+# Unknown kids trigger a reload at most this often, so forged kids cannot hammer the DB
+_MIN_FORCED_RELOAD_SECONDS = 5
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm in ASYMMETRIC_ALGORITHMS
+
+
+def _b64url_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def generate_signing_key(algorithm: str = "RS256", activates_at: Optional[datetime] = None) -> SigningKey:
+    """Create (but do not persist) a new RSA signing key."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    numbers = private_key.public_key().public_numbers()
+    jwk = {"kty": "RSA", "n": _b64url_uint(numbers.n), "e": _b64url_uint(numbers.e)}
+    # RFC 7638 thumbprint: SHA-256 of the required members in lexicographic order
+    thumbprint = hashlib.sha256(json.dumps(jwk, sort_keys=True, separators=(",", ":")).encode()).digest()
+    kid = base64.urlsafe_b64encode(thumbprint).decode().rstrip("=")
+    jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+
+    passphrase = settings.JWT_KEY_ENCRYPTION_PASSPHRASE
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.BestAvailableEncryption(passphrase.encode()) if passphrase else serialization.NoEncryption(),
+    ).decode()
+    return SigningKey(
+        kid=kid,
+        algorithm=algorithm,
+        private_key_pem=pem,
+        public_jwk=jwk,
+        activates_at=activates_at or datetime.utcnow(),
+    )
+
+
+def decrypt_private_key_pem(pem: str) -> str:
+    """The plaintext PEM of a stored private key (encrypted ones need JWT_KEY_ENCRYPTION_PASSPHRASE)."""
+    if "ENCRYPTED PRIVATE KEY" not in pem:
+        return pem
+    private_key = serialization.load_pem_private_key(
+        pem.encode(), password=settings.JWT_KEY_ENCRYPTION_PASSPHRASE.encode() or None,
+    )
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def max_token_lifetime() -> timedelta:
+    return max(
+        timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES),
+        timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+def rotate_signing_keys(db, now: Optional[datetime] = None, lead: Optional[timedelta] = None) -> SigningKey:
+    """
+    Stage a new signing key, schedule the current ones to expire and purge
+    expired keys. Commits and returns the new key.
+    """
+    now = now or datetime.utcnow()
+    if lead is None:
+        lead = timedelta(minutes=settings.JWT_KEY_PUBLISH_LEAD_MINUTES)
+    new_key = generate_signing_key(settings.JWT_ALGORITHM, activates_at=now + lead)
+
+    db.query(SigningKey).filter(SigningKey.expires_at != None, SigningKey.expires_at < now).delete(
+        synchronize_session=False,
+    )
+    db.query(SigningKey).filter(SigningKey.expires_at == None).update(
+        {SigningKey.expires_at: new_key.activates_at + max_token_lifetime()},
+        synchronize_session=False,
+    )
+    db.add(new_key)
+    db.commit()
+    return new_key
+
+
+class KeyRing:
+    """Per-worker view of the signing keys, reloaded periodically."""
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory
+        self._keys: list[dict] = []
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _session(self):
+        if self.session_factory is None:
+            from app.database import SessionLocal
+            return SessionLocal()
+        return self.session_factory()
+
+    def _load(self) -> None:
+        now = datetime.utcnow()
+        db = self._session()
+        try:
+            rows = db.query(SigningKey).filter(
+                (SigningKey.expires_at == None) | (SigningKey.expires_at > now)
+            ).order_by(SigningKey.activates_at.desc(), SigningKey.id.desc()).all()
+            if not any(row.activates_at <= now for row in rows):
+                # First use (or every key lapsed): bootstrap a key that signs immediately
+                key = generate_signing_key(settings.JWT_ALGORITHM)
+                db.add(key)
+                db.commit()
+                rows.insert(0, key)
+            self._keys = [
+                {
+                    "kid": row.kid,
+                    "algorithm": row.algorithm,
+                    "private_key_pem": decrypt_private_key_pem(row.private_key_pem),
+                    "public_jwk": dict(row.public_jwk),
+                    "activates_at": row.activates_at,
+                }
+                for row in rows
+            ]
+            self._loaded_at = time.monotonic()
+        finally:
+            db.close()
+
+    def _stale(self, force: bool = False) -> bool:
+        age = time.monotonic() - self._loaded_at
+        return not self._keys or age >= settings.JWT_KEY_RELOAD_SECONDS or (force and age >= _MIN_FORCED_RELOAD_SECONDS)
+
+    def _ensure_loaded(self, force: bool = False) -> None:
+        if self._stale(force):
+            with self._lock:
+                # Another thread may have reloaded while this one waited for the lock
+                if self._stale(force):
+                    self._load()
+
+    def _find(self, kid: str) -> Optional[dict]:
+        for key in self._keys:
+            if key["kid"] == kid:
+                return key["public_jwk"]
+        return None
+
+    def signing_key(self) -> dict:
+        """The key new tokens are signed with: the newest one already active."""
+        self._ensure_loaded()
+        now = datetime.utcnow()
+        # _load guarantees at least one key that was already active when loaded
+        return next(key for key in self._keys if key["activates_at"] <= now)
+
+    def public_jwk(self, kid: str) -> Optional[dict]:
+        """Public JWK for a kid, or None if it is unknown or expired."""
+        for attempt in (False, True):
+            self._ensure_loaded(force=attempt)
+            jwk = self._find(kid)
+            if jwk is not None:
+                return jwk
+        return None
+
+    async def public_jwk_async(self, kid: str) -> Optional[dict]:
+        """
+        public_jwk for the event loop. A known kid in a fresh key set is
+        answered from memory; a reload (a query, and possibly a bootstrap
+        commit, under the reload lock) runs in the threadpool.
+        """
+        for attempt in (False, True):
+            if self._stale(force=attempt):
+                await run_in_threadpool(self._ensure_loaded, attempt)
+            jwk = self._find(kid)
+            if jwk is not None:
+                return jwk
+        return None
+
+    def jwks(self) -> dict:
+        """The JWKS document: every key that is pending, signing or still verifying."""
+        self._ensure_loaded()
+        return {"keys": [key["public_jwk"] for key in self._keys]}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._keys = []
+            self._loaded_at = 0.0
+
+
+keyring = KeyRing()
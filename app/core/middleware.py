@@ -1,85 +1,146 @@
 """
 Custom middleware for request tracing and idempotency.
+
+Both are plain ASGI middleware rather than BaseHTTPMiddleware subclasses:
+they wrap `send` instead of running the endpoint in a separate task and
+re-streaming its response, so they add almost nothing per request.
 """
 
 import uuid
-import json
 import hashlib
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import Response, JSONResponse
 from app.config import settings
+from app.core.idempotency import (
+    KEY_PREFIX as IDEMPOTENCY_KEY_PREFIX, IdempotencyStore, InProgress, StoredResponse, idempotency_store,
+)
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
+class RequestIdMiddleware:
     """Attach a unique X-Request-Id header to every request/response."""
 
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("X-Request-Id", str(uuid.uuid4()))
-        request.state.request_id = request_id
-        response = await call_next(request)
-        response.headers["X-Request-Id"] = request_id
-        return response
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None:
+            request_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
 
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-Id"] = request_id
+            await send(message)
 
-class IdempotencyMiddleware(BaseHTTPMiddleware):
+        await self.app(scope, receive, send_with_request_id)
+
+
+class IdempotencyMiddleware:
     """
     For POST/PUT/DELETE/PATCH requests with an Idempotency-Key header,
     cache the response in Redis. If the same key is seen again, return
-    the cached response instead of re-processing.
+    the cached response instead of re-processing; a duplicate that arrives
+    while the first is still running waits for its result, or gets 409.
+    See app.core.idempotency for the store.
+
+    The response streams to the client unchanged; a 2xx body is collected
+    on the way (as a list of chunks, joined once) and stored afterwards.
     """
 
     IDEMPOTENT_METHODS = {"POST", "PUT", "DELETE", "PATCH"}
-    TTL_SECONDS = 86400  # 24 hours
 
-    async def dispatch(self, request: Request, call_next):
-        if request.method not in self.IDEMPOTENT_METHODS:
-            return await call_next(request)
+    def __init__(self, app, store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.store = store
 
-        idem_key = request.headers.get("Idempotency-Key")
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        idem_key = None
+        for name, value in scope["headers"]:
+            if name == b"idempotency-key":
+                idem_key = value.decode("latin-1")
+                break
         if not idem_key:
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Build a composite key: method + path + idempotency key
-        cache_key = f"prismid:idempotency:{hashlib.sha256(f'{request.method}:{request.url.path}:{idem_key}'.encode()).hexdigest()}"
+        method, path = scope["method"], scope["path"]
+        cache_key = f"{IDEMPOTENCY_KEY_PREFIX}:{hashlib.sha256(f'{method}:{path}:{idem_key}'.encode()).hexdigest()}"
 
         try:
-            import redis
-            r = redis.from_url(settings.REDIS_URL, decode_responses=True)
-            cached = r.get(cache_key)
-            if cached:
-                data = json.loads(cached)
-                return JSONResponse(
-                    content=data["body"],
-                    status_code=data["status_code"],
-                    headers={"X-Idempotent-Replay": "true"},
-                )
+            marker, stored = await self.store.claim(cache_key)
+        except InProgress:
+            conflict = JSONResponse(
+                status_code=409,
+                content={"detail": "A request with this Idempotency-Key is still being processed."},
+            )
+            await conflict(scope, receive, send)
+            return
         except Exception:
             # Redis unavailable — proceed without idempotency
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
+
+        if stored is not None:
+            headers = {"X-Idempotent-Replay": "true"}
+            if stored.content_type:
+                headers["Content-Type"] = stored.content_type
+            replay = Response(content=stored.body, status_code=stored.status_code, headers=headers)
+            await replay(scope, receive, send)
+            return
+
+        status_code = 0
+        content_type = None
+        chunks: list[bytes] = []
+        size = 0
+
+        async def capture_send(message):
+            nonlocal status_code, content_type, chunks, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body" and 200 <= status_code < 300 and chunks is not None:
+                body = message.get("body", b"")
+                size += len(body)
+                if size > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                    chunks = None
+                else:
+                    chunks.append(body)
+            await send(message)
 
-        response = await call_next(request)
+        try:
+            await self.app(scope, receive, capture_send)
+        except Exception:
+            await self._release(cache_key, marker)
+            raise
 
         # Only cache successful responses (2xx)
-        if 200 <= response.status_code < 300:
+        stored_ok = False
+        if 200 <= status_code < 300 and chunks is not None:
             try:
-                body = b""
-                async for chunk in response.body_iterator:
-                    body += chunk if isinstance(chunk, bytes) else chunk.encode()
-
-                cache_data = json.dumps({
-                    "status_code": response.status_code,
-                    "body": json.loads(body.decode()),
-                })
-                r.setex(cache_key, self.TTL_SECONDS, cache_data)
-
-                return Response(
-                    content=body,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    media_type=response.media_type,
+                stored_ok = await self.store.complete(
+                    cache_key, marker, StoredResponse(status_code, content_type, b"".join(chunks)),
                 )
             except Exception:
                 pass
+        if not stored_ok:
+            await self._release(cache_key, marker)
 
-        return response
+    async def _release(self, cache_key: str, marker: bytes) -> None:
+        try:
+            await self.store.release(cache_key, marker)
+        except Exception:
+            pass
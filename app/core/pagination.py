@@ -0,0 +1,33 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque to clients: a URL-safe base64 encoding of the sort key
+of the last row on the previous page. Pages are ordered by
+(created_at DESC, id DESC), so the next page is every row strictly "before"
+that key.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) sort key into an opaque cursor string."""
+    raw = json.dumps({"c": created_at.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed or has been tampered with.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(data["c"]), int(data["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: '{cursor}'") from e
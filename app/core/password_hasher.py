@@ -0,0 +1,101 @@
+"""
+Dedicated, bounded executor for password hashing.
+
+bcrypt is deliberately slow CPU work. Running it on the shared AnyIO
+threadpool lets a burst of logins occupy every worker thread and starve
+ordinary requests. All hashing and verification goes through this small
+pool instead:
+
+- A thread pool is enough: the bcrypt C extension releases the GIL while
+  hashing, so the work runs in parallel without pickling or extra processes.
+- Work admitted but not yet finished is capped. Past the cap, callers get
+  PasswordHasherBusy at once (surfaced as 503) instead of queueing without
+  bound behind the attacker or the thundering herd.
+- Queue depth, latency and rejections are tracked for /api/health.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password executor is saturated."""
+
+
+class PasswordHasher:
+    def __init__(self, context: CryptContext, workers: int, max_pending: int):
+        self.context = context
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusy("Password hashing is saturated, retry shortly")
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._busy_seconds += time.perf_counter() - started
+
+        future = self._executor.submit(timed)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+        self._slots.release()
+
+    # --- sync API (callers already off the event loop) ---
+
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._submit(self.context.verify, password, hashed).result()
+
+    # --- async API (frees the caller's event loop / threadpool while bcrypt runs) ---
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit(self.context.verify, password, hashed))
+
+    def needs_update(self, hashed: str) -> bool:
+        """True if a stored hash uses an old scheme or work factor (cheap; no hashing)."""
+        return self.context.needs_update(hashed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "queued": max(self._in_flight - self.workers, 0),
+                "peak_in_flight": self._peak_in_flight,
+                "max_pending": self.max_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_ms": round(self._busy_seconds * 1000 / self._completed, 1) if self._completed else None,
+            }
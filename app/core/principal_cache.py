@@ -0,0 +1,154 @@
+"""
+In-process cache of admin principals for JWT authentication.
+
+Every JWT request used to re-load the same admin_accounts row. Instead the
+columns the request path needs are cached per worker (LRU, bounded, with a
+short TTL) and handed out as transient AdminAccount objects.
+
+Invalidation:
+- Any committed, security-relevant ORM change to an AdminAccount (level,
+  deactivation, password reset, delete) publishes the admin id (and its new
+  security epoch, see app.core.security_epochs) on a Redis channel; every
+  worker's pub/sub listener (app.core.pubsub) drops that entry. The publishing worker drops
+  it locally first, so it never serves its own stale entry.
+- If Redis is unavailable, or the listener reconnects (and may have missed
+  messages), the TTL bounds how long a stale principal can be served.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import pubsub
+from app.core.redis_client import get_redis
+from app.core.security_epochs import admin_epochs, bump_security_epoch, reload_security_epochs
+from app.core.ttl_cache import LruTtlCache
+from app.models.admin import AdminAccount
+
+logger = logging.getLogger(__name__)
+
+
+ADMIN_INVALIDATION_CHANNEL = "prismid:admin_invalidations"
+INVALIDATE_ALL = "*"
+
+# Columns copied into the cache; password_hash is deliberately left out
+_PRINCIPAL_FIELDS = (
+    "id", "username", "email", "display_name", "access_level",
+    "is_active", "created_at", "last_login",
+)
+
+
+def snapshot_admin(admin: AdminAccount) -> dict:
+    """Copy the principal columns of a loaded admin."""
+    return {name: getattr(admin, name) for name in _PRINCIPAL_FIELDS}
+
+
+def admin_from_snapshot(snapshot: dict) -> AdminAccount:
+    """Build a transient (session-less) AdminAccount from snapshot_admin output."""
+    return AdminAccount(**snapshot)
+
+
+class PrincipalCache(LruTtlCache):
+    """LRU + TTL cache of admin snapshots keyed by admin id."""
+
+    def get(self, admin_id: int) -> Optional[AdminAccount]:
+        """Return a transient AdminAccount for a cached, unexpired entry."""
+        snapshot = super().get(admin_id)
+        return admin_from_snapshot(snapshot) if snapshot is not None else None
+
+    def put(self, admin: AdminAccount) -> None:
+        """Cache the principal columns of a loaded admin."""
+        self.put_snapshot(snapshot_admin(admin))
+
+    def put_snapshot(self, snapshot: dict) -> None:
+        super().put(snapshot["id"], snapshot)
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.ADMIN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.ADMIN_CACHE_TTL_SECONDS,
+)
+
+
+# ---------------------------------------------------------------------------
+# Cross-worker invalidation over Redis pub/sub
+# ---------------------------------------------------------------------------
+
+def publish_admin_invalidation(admin_id: Optional[int] = None) -> None:
+    """
+    Invalidate an admin here and on every other worker (best-effort).
+
+    A single admin also gets a new security epoch, which the message carries
+    as "<id>:<epoch>" so other workers stop honouring older token claims.
+    """
+    principal_cache.invalidate(admin_id)
+    message = INVALIDATE_ALL
+    if admin_id is not None:
+        message = f"{admin_id}:{bump_security_epoch(admin_id)}"
+    try:
+        get_redis().publish(ADMIN_INVALIDATION_CHANNEL, message)
+    except Exception:
+        pass
+
+
+def _handle_invalidation_message(data) -> None:
+    if isinstance(data, bytes):
+        data = data.decode()
+    if data == INVALIDATE_ALL:
+        principal_cache.invalidate()
+        return
+    try:
+        admin_id, _, epoch = data.partition(":")
+        principal_cache.invalidate(int(admin_id))
+        if epoch:
+            admin_epochs.observe(int(admin_id), int(epoch))
+    except (TypeError, ValueError):
+        logger.warning("Ignoring malformed admin invalidation message: %r", data)
+
+
+def _on_connect() -> None:
+    # Messages may have been missed while disconnected, so start over
+    principal_cache.invalidate()
+    reload_security_epochs()
+
+
+pubsub.subscribe(
+    ADMIN_INVALIDATION_CHANNEL,
+    _handle_invalidation_message,
+    on_connect=_on_connect,
+    on_disconnect=admin_epochs.mark_unsynced,
+)
+
+
+# ---------------------------------------------------------------------------
+# Invalidation hooks — committed, security-relevant ORM changes to an admin are published
+# ---------------------------------------------------------------------------
+
+# Changes to these columns alter what an admin may do (bookkeeping like last_login does not)
+_SECURITY_FIELDS = ("username", "access_level", "is_active", "password_hash")
+
+
+def _security_relevant(admin: AdminAccount) -> bool:
+    state = inspect(admin)
+    return state.deleted or any(state.attrs[name].history.has_changes() for name in _SECURITY_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_admins(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, AdminAccount) and obj.id is not None and _security_relevant(obj):
+            session.info.setdefault("changed_admin_ids", set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_on_commit(session):
+    for admin_id in session.info.pop("changed_admin_ids", ()):
+        publish_admin_invalidation(admin_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("changed_admin_ids", None)
@@ -0,0 +1,93 @@
+"""
+One Redis pub/sub listener thread per worker, shared by every in-process
+cache that needs cross-worker invalidation.
+
+Modules register a channel with `subscribe()` at import time; the thread
+started on app startup subscribes to all of them on one connection and
+dispatches each message to its handler.
+
+Handlers must be cheap and must not raise. `on_connect` runs after every
+(re)subscribe, `on_disconnect` whenever the connection is lost — caches
+use them to resynchronise state that may have changed while no messages
+could be received.
+"""
+
+import logging
+import threading
+from typing import Callable, Optional
+
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 5
+
+
+class _Channel:
+    def __init__(self, handler, on_connect, on_disconnect):
+        self.handler = handler
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+
+
+_channels: dict[str, _Channel] = {}
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def subscribe(
+    channel: str,
+    handler: Callable[[bytes], None],
+    on_connect: Optional[Callable[[], None]] = None,
+    on_disconnect: Optional[Callable[[], None]] = None,
+) -> None:
+    """Register a handler for a channel (call before start_listener)."""
+    _channels[channel] = _Channel(handler, on_connect, on_disconnect)
+
+
+def _run_callbacks(name: str) -> None:
+    for channel, registration in _channels.items():
+        callback = getattr(registration, name)
+        if callback is not None:
+            try:
+                callback()
+            except Exception:
+                logger.exception("pub/sub %s callback failed for %s", name, channel)
+
+
+def _listen() -> None:
+    while not _stop.is_set():
+        pubsub = None
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(*_channels)
+            _run_callbacks("on_connect")
+            while not _stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                channel = message["channel"]
+                registration = _channels.get(channel.decode() if isinstance(channel, bytes) else channel)
+                if registration is not None:
+                    registration.handler(message["data"])
+        except Exception as e:
+            logger.warning("pub/sub listener disconnected: %s", e)
+            _run_callbacks("on_disconnect")
+            _stop.wait(RECONNECT_DELAY_SECONDS)
+        finally:
+            if pubsub is not None:
+                pubsub.close()
+
+
+def start_listener() -> None:
+    """Start this worker's listener thread (idempotent; no-op without channels)."""
+    global _thread
+    if not _channels or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_listen, name="redis-pubsub-listener", daemon=True)
+    _thread.start()
+
+
+def stop_listener() -> None:
+    _stop.set()
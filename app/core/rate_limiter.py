@@ -1,8 +1,347 @@
 """
-Rate limiting using SlowAPI.
+Distributed rate limiting: sliding-window counters in Redis.
+
+Every /api request is charged to one caller identity, most specific first:
+
+1. a verified API key (one already in the API key cache)  -> "key:<id>"
+2. a validly signed access token                          -> "admin:<id>"
+3. the client IP, taken from X-Forwarded-For when the
+   direct peer is one of TRUSTED_PROXIES                  -> "ip:<addr>"
+
+API keys use their own quota (`api_keys.rate_limit`) when one is set, and
+RATE_LIMIT_DEFAULT otherwise. Anonymous callers get RATE_LIMIT_ANONYMOUS.
+A few routes also have a per-IP limit of their own (ROUTE_LIMITS, e.g.
+login), checked in the same call.
+
+Each window is a sliding-window counter: the current fixed window's count
+plus the previous window's count weighted by how much of it still
+overlaps. All of a request's buckets are checked and charged by a single
+Lua script, so each request costs one atomic Redis round trip (EVALSHA),
+and the count is shared across every worker.
+
+Responses carry X-RateLimit-Limit / -Remaining / -Reset. Rejected requests
+get 429 with Retry-After. If Redis is unreachable, each worker falls back
+to the same algorithm in local memory (limits then apply per worker)
+and retries Redis after RATE_LIMIT_REDIS_RETRY_SECONDS.
 """
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import hashlib
+import ipaddress
+import json
+import logging
+import math
+import threading
+import time
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from redis.exceptions import NoScriptError
+
+from app.config import settings
+from app.core.api_key_cache import get_verified_key
+from app.core.redis_client import get_async_redis
+from app.core.security import hash_api_key, token_subject
+
+logger = logging.getLogger(__name__)
+
+
+KEY_PREFIX = "prismid:ratelimit"
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Rate(NamedTuple):
+    limit: int
+    window: int  # Seconds
+
+
+@lru_cache(maxsize=1024)
+def parse_rate(value: str) -> Rate:
+    """Parse "<count>/<second|minute|hour|day>", e.g. "100/minute"."""
+    count, _, period = value.strip().partition("/")
+    period = period.strip().lower().rstrip("s")
+    if period not in _PERIODS or not count.strip().isdigit() or int(count) < 1:
+        raise ValueError(f"Invalid rate limit {value!r}, expected e.g. '100/minute'")
+    return Rate(int(count), _PERIODS[period])
+
+
+# (method, path) -> per-IP rate, on top of the caller's own quota
+ROUTE_LIMITS = {
+    ("POST", "/api/v1/auth/login"): "5/minute",
+}
+
+
+class Verdict(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # Seconds until the most constrained window rolls over
+    retry_after: int  # Seconds; 0 when allowed
+
+
+# KEYS: per bucket, its current and previous window counters.
+# ARGV: now (ms), then per bucket its limit and window (ms).
+# Returns per bucket {used_before, retry_ms}; counters are incremented only
+# when every bucket has room.
+_SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local results = {}
+local allowed = true
+for i = 1, #KEYS / 2 do
+    local limit = tonumber(ARGV[2 * i])
+    local window = tonumber(ARGV[2 * i + 1])
+    local elapsed = now % window
+    local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    local used = previous * (window - elapsed) / window + current
+    local retry = 0
+    if used + 1 > limit then
+        allowed = false
+        if current + 1 > limit or previous == 0 then
+            retry = window - elapsed
+        else
+            retry = math.ceil(window * (1 - (limit - current - 1) / previous) - elapsed)
+        end
+    end
+    results[i] = {math.floor(used), retry}
+end
+if allowed then
+    for i = 1, #KEYS / 2 do
+        redis.call('INCR', KEYS[2 * i - 1])
+        redis.call('PEXPIRE', KEYS[2 * i - 1], 2 * tonumber(ARGV[2 * i + 1]))
+    end
+end
+return results
+"""
+_SLIDING_WINDOW_SHA = hashlib.sha1(_SLIDING_WINDOW_LUA.encode()).hexdigest()
+
+
+def _window_keys(bucket: str, window_ms: int, now_ms: int) -> tuple[str, str]:
+    index = now_ms // window_ms
+    return f"{KEY_PREFIX}:{bucket}:{window_ms}:{index}", f"{KEY_PREFIX}:{bucket}:{window_ms}:{index - 1}"
+
+
+class _LocalWindows:
+    """The Lua script's algorithm over an in-process dict (Redis fallback)."""
+
+    def __init__(self):
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def check(self, keys: list[str], args: list[int]) -> list[list[int]]:
+        now = args[0]
+        with self._lock:
+            results, allowed = [], True
+            for i in range(len(keys) // 2):
+                limit, window = args[1 + 2 * i], args[2 + 2 * i]
+                elapsed = now % window
+                current = self._counts.get(keys[2 * i], 0)
+                previous = self._counts.get(keys[2 * i + 1], 0)
+                used = previous * (window - elapsed) / window + current
+                retry = 0
+                if used + 1 > limit:
+                    allowed = False
+                    if current + 1 > limit or previous == 0:
+                        retry = window - elapsed
+                    else:
+                        retry = math.ceil(window * (1 - (limit - current - 1) / previous) - elapsed)
+                results.append([math.floor(used), retry])
+            if allowed:
+                for i in range(0, len(keys), 2):
+                    self._counts[keys[i]] = self._counts.get(keys[i], 0) + 1
+            if len(self._counts) > 100_000:
+                self._prune(now)
+            return results
+
+    def _prune(self, now_ms: int) -> None:
+        # Keep only counters from the current or previous window
+        def live(key: str) -> bool:
+            window, index = key.rsplit(":", 2)[1:]
+            return int(index) >= now_ms // int(window) - 1
+        self._counts = {key: count for key, count in self._counts.items() if live(key)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+class RateLimiter:
+    def __init__(self):
+        self.enabled = settings.RATE_LIMIT_ENABLED
+        self._local = _LocalWindows()
+        self._redis_retry_at = 0.0
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.redis_errors = 0
+
+    async def _evaluate(self, keys: list[str], args: list[int]) -> list[list[int]]:
+        if time.monotonic() >= self._redis_retry_at:
+            try:
+                r = get_async_redis()
+                try:
+                    return await r.evalsha(_SLIDING_WINDOW_SHA, len(keys), *keys, *args)
+                except NoScriptError:
+                    return await r.eval(_SLIDING_WINDOW_LUA, len(keys), *keys, *args)
+            except Exception as e:
+                with self._lock:
+                    self.redis_errors += 1
+                self._redis_retry_at = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+                logger.warning("Rate limiter falling back to per-worker counters: %s", e)
+        return self._local.check(keys, args)
+
+    async def hit(self, buckets: list[tuple[str, Rate]]) -> Verdict:
+        """Check and (if every bucket has room) charge one request to each bucket."""
+        now_ms = int(time.time() * 1000)
+        keys, args = [], [now_ms]
+        for bucket, rate in buckets:
+            window_ms = rate.window * 1000
+            keys.extend(_window_keys(bucket, window_ms, now_ms))
+            args.extend((rate.limit, window_ms))
+
+        results = await self._evaluate(keys, args)
+
+        allowed = all(int(retry) == 0 for _, retry in results)
+        # Report the bucket closest to its limit
+        tightest = min(
+            range(len(buckets)),
+            key=lambda i: buckets[i][1].limit - int(results[i][0]),
+        )
+        rate = buckets[tightest][1]
+        used = int(results[tightest][0]) + (1 if allowed else 0)
+        window_ms = rate.window * 1000
+        retry_ms = max(int(retry) for _, retry in results)
+
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.limited += 1
+        return Verdict(
+            allowed=allowed,
+            limit=rate.limit,
+            remaining=max(rate.limit - used, 0),
+            reset=math.ceil((window_ms - now_ms % window_ms) / 1000),
+            retry_after=math.ceil(retry_ms / 1000),
+        )
+
+    def reset(self) -> None:
+        self._local.clear()
+        self._redis_retry_at = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "backend": "redis" if time.monotonic() >= self._redis_retry_at else "local",
+                "allowed": self.allowed,
+                "limited": self.limited,
+                "redis_errors": self.redis_errors,
+            }
+
+
+limiter = RateLimiter()
+
+
+# ---------------------------------------------------------------------------
+# Caller identity
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=4)
+def _parse_networks(value: str) -> tuple:
+    return tuple(ipaddress.ip_network(part.strip(), strict=False) for part in value.split(",") if part.strip())
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _parse_networks(settings.TRUSTED_PROXIES))
+
+
+def client_address(scope) -> Optional[str]:
+    """
+    The originating client IP: the peer address, or, if the peer is a
+    trusted proxy, the right-most X-Forwarded-For entry that is not.
+    """
+    peer = scope.get("client")
+    address = peer[0] if peer else None
+    if address is None or not _is_trusted_proxy(address):
+        return address
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            for hop in reversed(value.decode("latin-1").split(",")):
+                hop = hop.strip()
+                if hop and not _is_trusted_proxy(hop):
+                    return hop
+    return address
+
+
+async def _caller_bucket(headers: dict, address: Optional[str]) -> tuple[str, Rate]:
+    api_key = headers.get(b"x-api-key")
+    if api_key:
+        verified = get_verified_key(hash_api_key(api_key.decode("latin-1")))
+        if verified is not None:
+            return f"key:{verified.id}", parse_rate(verified.rate_limit or settings.RATE_LIMIT_DEFAULT)
+
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    if authorization.startswith("Bearer "):
+        subject = await token_subject(authorization[7:])
+        if subject is not None:
+            return f"admin:{subject}", parse_rate(settings.RATE_LIMIT_DEFAULT)
+
+    return f"ip:{address}", parse_rate(settings.RATE_LIMIT_ANONYMOUS)
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+class RateLimitMiddleware:
+    """Charge every /api request to its caller and add X-RateLimit headers."""
+
+    def __init__(self, app, limiter: RateLimiter = limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        address = client_address(scope)
+        buckets = [await _caller_bucket(headers, address)]
+        route_rate = ROUTE_LIMITS.get((scope["method"], scope["path"]))
+        if route_rate is not None:
+            buckets.append((f"route:{scope['path']}:ip:{address}", parse_rate(route_rate)))
+
+        verdict = await self.limiter.hit(buckets)
+        rate_headers = [
+            (b"x-ratelimit-limit", str(verdict.limit).encode()),
+            (b"x-ratelimit-remaining", str(verdict.remaining).encode()),
+            (b"x-ratelimit-reset", str(verdict.reset).encode()),
+        ]
+
+        if not verdict.allowed:
+            body = json.dumps({"error": "rate_limited", "detail": "Rate limit exceeded, retry later."}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(verdict.retry_after).encode()),
+                    *rate_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *rate_headers]
+            await send(message)
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["30/minute"])
+        await self.app(scope, receive, send_with_headers)
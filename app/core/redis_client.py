@@ -0,0 +1,78 @@
+"""
+Shared Redis clients.
+
+Every Redis call in the app goes through one of these instead of
+`redis.from_url(...)` per call, which built a fresh connection pool (and
+usually a fresh TCP connection) each time.
+
+- get_redis():       sync client for request handlers, Celery tasks and helpers.
+- get_async_redis(): asyncio client for middleware and async endpoints.
+
+Both share the same settings: a bounded pool, connect/read timeouts so a
+slow or unreachable Redis fails fast (callers treat Redis as best-effort),
+and periodic health checks on idle connections. Responses are bytes.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+
+def _pool_options() -> dict:
+    return {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        "health_check_interval": 30,
+    }
+
+
+_client: Optional[redis.Redis] = None
+_client_lock = threading.Lock()
+
+# asyncio connections belong to the loop that opened them, so keep one client per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> redis.Redis:
+    """Return the process-wide sync client (created on first use)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                pool = redis.ConnectionPool.from_url(settings.REDIS_URL, **_pool_options())
+                _client = redis.Redis(connection_pool=pool)
+    return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Return the asyncio client for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        pool = aioredis.ConnectionPool.from_url(settings.REDIS_URL, **_pool_options())
+        client = aioredis.Redis(connection_pool=pool)
+        _async_clients[loop] = client
+    return client
+
+
+def close_redis() -> None:
+    """Disconnect the sync pool (e.g. on shutdown). The next get_redis() reconnects."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.connection_pool.disconnect()
+            _client = None
+
+
+async def close_async_redis() -> None:
+    """Disconnect the running loop's asyncio pool."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
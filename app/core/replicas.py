@@ -0,0 +1,314 @@
+"""
+Read-replica routing for read-only endpoints.
+
+Endpoints that only read take their session from `get_read_db` /
+`get_async_read_db` (app.api.deps), which marks it read-only. A
+RoutingSession sends a read-only session's SELECTs to one replica
+(picked round-robin per session, so a request sees one consistent
+snapshot) and everything else to the primary:
+
+- any flush or DML statement (ORM or Core `session.execute(insert(...))`),
+  and every statement after the session has written
+- sessions that are not marked read-only
+- the admin behind the request, for REPLICA_READ_YOUR_WRITES_SECONDS
+  after one of their writes committed (pinned on every worker over
+  Redis pub/sub), so they read their own writes
+- when no replica is healthy
+
+A replica is ejected for REPLICA_EJECT_SECONDS when a connection to it
+fails, and by the monitor thread when it stops answering or (PostgreSQL)
+lags more than REPLICA_MAX_LAG_SECONDS behind; the monitor readmits it
+once it is healthy again.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import pubsub
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+REPLICA_PIN_CHANNEL = "prismid:replica-pins"
+
+# The admin behind the current request (set by the auth dependencies)
+current_admin_id: ContextVar[Optional[int]] = ContextVar("current_admin_id", default=None)
+
+# Seconds of replay lag; 0 when the replica has replayed everything it received
+_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine, async_engine):
+        self.name = name
+        # Session.get_bind needs sync Engine objects; async sessions use the AsyncEngine's
+        self.engines = {"sync": engine, "async": async_engine.sync_engine}
+        self.engine = engine
+        self.async_engine = async_engine
+        self.ejected_until = 0.0
+        self.last_error: Optional[str] = None
+        self.ejections = 0
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class ReplicaSet:
+    def __init__(self):
+        self.replicas: list[Replica] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def add(self, url: str, engine: Engine, async_engine) -> Replica:
+        replica = Replica(make_url(url).render_as_string(hide_password=True), engine, async_engine)
+        for target in replica.engines.values():
+            event.listen(target, "handle_error", lambda ctx, replica=replica: self._on_error(replica, ctx))
+        self.replicas.append(replica)
+        return replica
+
+    def choose(self) -> Optional[Replica]:
+        """The next healthy replica in round-robin order, or None."""
+        now = time.monotonic()
+        healthy = [replica for replica in self.replicas if replica.available(now)]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def eject(self, replica: Replica, reason: str) -> None:
+        with self._lock:
+            if replica.available(time.monotonic()):
+                replica.ejections += 1
+                logger.warning("Ejecting read replica %s: %s", replica.name, reason)
+            replica.ejected_until = time.monotonic() + settings.REPLICA_EJECT_SECONDS
+            replica.last_error = reason
+
+    def readmit(self, replica: Replica) -> None:
+        with self._lock:
+            if not replica.available(time.monotonic()):
+                logger.info("Read replica %s is healthy again", replica.name)
+            replica.ejected_until = 0.0
+            replica.last_error = None
+
+    def _on_error(self, replica: Replica, ctx) -> None:
+        if ctx.is_disconnect or isinstance(ctx.sqlalchemy_exception, exc.OperationalError):
+            self.eject(replica, str(ctx.original_exception)[:200])
+
+    def check(self) -> None:
+        """Probe every replica once, ejecting or readmitting it."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    if conn.dialect.name == "postgresql":
+                        lag = float(conn.execute(_LAG_SQL).scalar() or 0)
+                    else:
+                        conn.execute(text("SELECT 1"))
+                        lag = 0.0
+            except Exception as e:
+                self.eject(replica, str(e)[:200])
+                continue
+            if lag > settings.REPLICA_MAX_LAG_SECONDS:
+                self.eject(replica, f"replication lag {lag:.1f}s")
+            else:
+                self.readmit(replica)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.available(now),
+                    "ejections": replica.ejections,
+                    "last_error": replica.last_error,
+                }
+                for replica in self.replicas
+            ],
+            "pinned_admins": recent_writers.size(),
+        }
+
+
+read_replicas = ReplicaSet()
+
+
+# ---------------------------------------------------------------------------
+# Read-your-own-writes
+# ---------------------------------------------------------------------------
+
+class RecentWriters:
+    """Admins whose reads stay on the primary until a deadline (per worker)."""
+
+    def __init__(self):
+        self._until: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def pin(self, admin_id: int) -> None:
+        until = time.monotonic() + settings.REPLICA_READ_YOUR_WRITES_SECONDS
+        with self._lock:
+            self._until[admin_id] = until
+            if len(self._until) > 10_000:
+                now = time.monotonic()
+                self._until = {key: value for key, value in self._until.items() if value > now}
+
+    def pinned(self, admin_id: Optional[int]) -> bool:
+        if admin_id is None:
+            return False
+        until = self._until.get(admin_id)
+        return until is not None and until > time.monotonic()
+
+    def size(self) -> int:
+        now = time.monotonic()
+        return sum(1 for until in list(self._until.values()) if until > now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+
+recent_writers = RecentWriters()
+
+
+def note_write(admin_id: int) -> None:
+    """Pin an admin's reads to the primary here and on every other worker (best-effort)."""
+    recent_writers.pin(admin_id)
+    try:
+        get_redis().publish(REPLICA_PIN_CHANNEL, str(admin_id))
+    except Exception:
+        pass
+
+
+def _handle_pin_message(data) -> None:
+    try:
+        recent_writers.pin(int(data))
+    except (TypeError, ValueError):
+        logger.warning("Ignoring malformed replica pin message: %r", data)
+
+
+pubsub.subscribe(REPLICA_PIN_CHANNEL, _handle_pin_message)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+    session.info["unpinned_write"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml_written(orm_execute_state):
+    # Core-level INSERT/UPDATE/DELETE through session.execute() never flushes
+    if orm_execute_state.statement.is_dml:
+        _mark_written(orm_execute_state.session, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer_on_commit(session):
+    if session.info.pop("unpinned_write", False) and getattr(session, "replicas", None):
+        admin_id = current_admin_id.get()
+        if admin_id is not None:
+            note_write(admin_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("unpinned_write", None)
+
+
+def served_by_replica(session) -> bool:
+    """
+    True if any read of this session went to a replica.
+
+    Shared caches that are invalidated on primary commits must not be
+    refilled from such a session: a lagging replica would re-cache the
+    state the invalidation just dropped.
+    """
+    return session.info.get("replica") is not None
+
+
+# ---------------------------------------------------------------------------
+# Routing session
+# ---------------------------------------------------------------------------
+
+class RoutingSession(Session):
+    """
+    Session that sends a read-only session's reads to a replica.
+
+    `driver` selects which engine of each replica to bind: "sync", or
+    "async" when this is the sync_session_class of an AsyncSession.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet = read_replicas, driver: str = "sync", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.driver = driver
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = self._replica_for(clause)
+        if replica is not None:
+            return replica.engines[self.driver]
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def _replica_for(self, clause) -> Optional[Replica]:
+        if not self.replicas or not self.info.get("read_only"):
+            return None
+        if self._flushing or self.info.get("wrote") or getattr(clause, "is_dml", False):
+            return None
+        if recent_writers.pinned(current_admin_id.get()):
+            return None
+
+        # Stay on this session's replica while it is healthy
+        replica = self.info.get("replica")
+        if replica is None or not replica.available(time.monotonic()):
+            replica = self.replicas.choose()
+            self.info["replica"] = replica
+        return replica
+
+
+# ---------------------------------------------------------------------------
+# Health monitor
+# ---------------------------------------------------------------------------
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _run_monitor(interval: float) -> None:
+    while not _stop.wait(interval):
+        try:
+            read_replicas.check()
+        except Exception as e:
+            logger.warning("Read replica health check failed: %s", e)
+
+
+def start_replica_monitor() -> None:
+    """Start this worker's replica health-check thread (idempotent; no-op without replicas)."""
+    global _thread
+    if not read_replicas or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_run_monitor, args=(settings.REPLICA_HEALTH_CHECK_SECONDS,),
+        name="replica-monitor", daemon=True,
+    )
+    _thread.start()
+
+
+def stop_replica_monitor() -> None:
+    """Stop the health-check thread."""
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
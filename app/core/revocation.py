@@ -0,0 +1,131 @@
+"""
+In-process replica of revoked token JTIs.
+
+Redis remains the source of truth for revocations:
+- `prismid:token_blacklist:<jti>` keys, which expire with the token;
+- the `prismid:revoked_jtis` sorted set (score = token exp), which lets a
+  worker load every live revocation on startup;
+- the `prismid:token_revocations` channel, which announces each new one.
+
+Each worker mirrors the unexpired revocations in a local dict. The set of
+tokens revoked within their lifetime is small (logouts and refresh
+rotation), so an exact set is used rather than a bloom filter: there are
+no false positives and a negative answer needs no Redis round trip.
+
+The replica only answers while its pub/sub subscription is live (it is
+reloaded on every reconnect). Otherwise callers fall back to a Redis
+EXISTS, as before.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.core import pubsub
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+REVOKED_JTIS_KEY = "prismid:revoked_jtis"
+REVOCATION_CHANNEL = "prismid:token_revocations"
+
+
+class RevokedJtiReplica:
+    """Thread-safe map of revoked JTI -> token exp (unix seconds)."""
+
+    def __init__(self):
+        self._entries: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.synced = False
+
+    def add(self, jti: str, exp: float) -> None:
+        now = time.time()
+        with self._lock:
+            # Revocations are rare; pruning on insert keeps the map at live entries only
+            for stale in [k for k, v in self._entries.items() if v <= now]:
+                del self._entries[stale]
+            if exp > now:
+                self._entries[jti] = exp
+
+    def contains(self, jti: str) -> bool:
+        with self._lock:
+            exp = self._entries.get(jti)
+            if exp is None:
+                return False
+            if exp <= time.time():
+                del self._entries[jti]
+                return False
+            return True
+
+    def load(self, entries: dict[str, float]) -> None:
+        """Replace the replica with a full snapshot and mark it synced."""
+        now = time.time()
+        with self._lock:
+            self._entries = {jti: exp for jti, exp in entries.items() if exp > now}
+            self.synced = True
+
+    def mark_unsynced(self) -> None:
+        self.synced = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"synced": self.synced, "size": len(self._entries)}
+
+
+revoked_jtis = RevokedJtiReplica()
+
+
+def publish_revocation(jti: str, exp: float) -> None:
+    """
+    Record a revocation in Redis and announce it to every worker.
+
+    Raises redis errors to the caller, which decides whether Redis being
+    down is fatal.
+    """
+    revoked_jtis.add(jti, exp)
+    ttl_seconds = max(int(exp - time.time()), 1)
+    pipe = get_redis().pipeline()
+    pipe.setex(f"prismid:token_blacklist:{jti}", ttl_seconds, "revoked")
+    pipe.zadd(REVOKED_JTIS_KEY, {jti: exp})
+    pipe.zremrangebyscore(REVOKED_JTIS_KEY, "-inf", time.time())
+    pipe.publish(REVOCATION_CHANNEL, f"{jti} {exp}")
+    pipe.execute()
+
+
+def is_revoked_locally(jti: str) -> Optional[bool]:
+    """Answer from the replica, or None if it is not currently in sync."""
+    if not revoked_jtis.synced:
+        return None
+    return revoked_jtis.contains(jti)
+
+
+# ---------------------------------------------------------------------------
+# Pub/sub wiring
+# ---------------------------------------------------------------------------
+
+def _handle_revocation_message(data) -> None:
+    if isinstance(data, bytes):
+        data = data.decode()
+    try:
+        jti, exp = data.split(" ", 1)
+        revoked_jtis.add(jti, float(exp))
+    except ValueError:
+        logger.warning("Ignoring malformed revocation message: %r", data)
+
+
+def _reload() -> None:
+    # Runs after (re)subscribing, so nothing published from here on is missed
+    entries = get_redis().zrangebyscore(REVOKED_JTIS_KEY, time.time(), "+inf", withscores=True)
+    revoked_jtis.load({
+        (jti.decode() if isinstance(jti, bytes) else jti): exp for jti, exp in entries
+    })
+
+
+pubsub.subscribe(
+    REVOCATION_CHANNEL,
+    _handle_revocation_message,
+    on_connect=_reload,
+    on_disconnect=revoked_jtis.mark_unsynced,
+)
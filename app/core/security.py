@@ -2,26 +2,63 @@
 Security module: JWT tokens, password hashing, token verification, and token revocation.
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
+import time
 import uuid
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.config import settings
+from app.core.jwt_keys import keyring, is_asymmetric
+from app.core.password_hasher import PasswordHasher
+from app.core.redis_client import get_redis, get_async_redis
+from app.core.security_epochs import current_security_epoch
+from app.core.revocation import publish_revocation, is_revoked_locally
 
 
-# Password hashing context (bcrypt, 12 rounds)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (bcrypt, work factor from settings). Hashes made
+# with any other work factor report needs_update and are upgraded on login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# All bcrypt work runs on this dedicated pool, never the request threadpool
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
 
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a bcrypt hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without blocking the event loop or a threadpool worker."""
+    return await password_hasher.hash_async(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop or a threadpool worker."""
+    return await password_hasher.verify_async(plain_password, hashed_password)
+
+
+def password_needs_update(hashed_password: str) -> bool:
+    """True if a stored hash should be re-hashed with the current work factor."""
+    return password_hasher.needs_update(hashed_password)
+
+
+def _encode(claims: dict) -> str:
+    """Sign claims with the configured algorithm (asymmetric keys carry a kid)."""
+    if is_asymmetric(settings.JWT_ALGORITHM):
+        key = keyring.signing_key()
+        return jwt.encode(claims, key["private_key_pem"], algorithm=key["algorithm"], headers={"kid": key["kid"]})
+    return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -35,7 +72,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         "type": "access",
         "jti": str(uuid.uuid4()),
     })
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    # Lets read requests authorize from the claims alone while the epoch is current
+    if "sub" in to_encode and "epoch" not in to_encode:
+        epoch = current_security_epoch(int(to_encode["sub"]))
+        if epoch is not None:
+            to_encode["epoch"] = epoch
+    return _encode(to_encode)
 
 
 def create_refresh_token(data: dict) -> str:
@@ -47,19 +89,57 @@ def create_refresh_token(data: dict) -> str:
         "type": "refresh",
         "jti": str(uuid.uuid4()),
     })
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return _encode(to_encode)
+
+
+def _check_signature(token: str, kid: Optional[str], jwk: Optional[dict]) -> dict:
+    """
+    Verify a token's signature and claims. Raises JWTError.
+
+    Tokens with a kid are checked against that published key only (`jwk`,
+    looked up by the caller), with the key's own algorithm. Tokens without
+    one use the shared secret. Once signing is asymmetric, that is only
+    allowed until JWT_ACCEPT_LEGACY_HS256_UNTIL (to let HS256 tokens issued
+    before the switch expire); after it the shared secret is retired.
+    """
+    if kid is not None:
+        if jwk is None:
+            raise JWTError("Unknown signing key")
+        return jwt.decode(token, jwk, algorithms=[jwk["alg"]])
+    if not is_asymmetric(settings.JWT_ALGORITHM):
+        return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    if not _legacy_hs256_accepted():
+        raise JWTError("Token has no signing key id")
+    return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+
+
+def _legacy_hs256_accepted() -> bool:
+    until = settings.JWT_ACCEPT_LEGACY_HS256_UNTIL
+    if until is None:
+        return False
+    if until.tzinfo is not None:
+        until = until.astimezone(timezone.utc).replace(tzinfo=None)
+    return datetime.utcnow() < until
+
+
+def _verify(token: str) -> dict:
+    """Verify a token (see _check_signature). Raises JWTError."""
+    kid = jwt.get_unverified_header(token).get("kid")
+    return _check_signature(token, kid, keyring.public_jwk(kid) if kid is not None else None)
+
+
+async def _verify_async(token: str) -> dict:
+    """_verify for the event loop: a key set reload runs in the threadpool."""
+    kid = jwt.get_unverified_header(token).get("kid")
+    return _check_signature(token, kid, await keyring.public_jwk_async(kid) if kid is not None else None)
 
 
 def decode_token(token: str) -> Optional[dict]:
     """Decode and validate a JWT token. Returns payload or None.
-    Also checks the token against the Redis blacklist.
+    Also checks the token against the revocation list.
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
+        payload = _verify(token)
         # Check if this token has been revoked
         jti = payload.get("jti")
         if jti and is_token_revoked(jti):
@@ -69,23 +149,52 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
-def revoke_token(jti: str, ttl_seconds: int = 86400) -> bool:
-    """Add a token's JTI to the Redis blacklist."""
+async def decode_token_async(token: str) -> Optional[dict]:
+    """decode_token for async callers: no blocking Redis or database I/O on the event loop."""
+    try:
+        payload = await _verify_async(token)
+        jti = payload.get("jti")
+        if jti and await is_token_revoked_async(jti):
+            return None
+        return payload
+    except JWTError:
+        return None
+
+
+def revoke_token(jti: str, ttl_seconds: int = 86400, exp: Optional[float] = None) -> bool:
+    """
+    Revoke a token by JTI until it expires.
+
+    Pass the token's `exp` claim so the revocation lives exactly as long as
+    the token; otherwise it is kept for `ttl_seconds`.
+    """
+    if exp is None:
+        exp = time.time() + ttl_seconds
     try:
-        import redis
-        r = redis.from_url(settings.REDIS_URL)
-        r.setex(f"prismid:token_blacklist:{jti}", ttl_seconds, "revoked")
+        publish_revocation(jti, exp)
         return True
     except Exception:
         return False
 
 
 def is_token_revoked(jti: str) -> bool:
-    """Check if a token JTI is in the Redis blacklist."""
+    """Check a JTI against the local replica, falling back to Redis when it is out of sync."""
+    local = is_revoked_locally(jti)
+    if local is not None:
+        return local
     try:
-        import redis
-        r = redis.from_url(settings.REDIS_URL)
-        return r.exists(f"prismid:token_blacklist:{jti}") > 0
+        return get_redis().exists(f"prismid:token_blacklist:{jti}") > 0
+    except Exception:
+        return False
+
+
+async def is_token_revoked_async(jti: str) -> bool:
+    """is_token_revoked with the fallback on the async Redis client."""
+    local = is_revoked_locally(jti)
+    if local is not None:
+        return local
+    try:
+        return await get_async_redis().exists(f"prismid:token_blacklist:{jti}") > 0
     except Exception:
         return False
 
@@ -104,6 +213,17 @@ def generate_api_key() -> str:
     return f"prismid_{random_part}"
 
 
+async def token_subject(token: str) -> Optional[str]:
+    """
+    The `sub` of a validly signed, unexpired token, skipping the revocation
+    check. Only for attributing requests (rate limiting), never for auth.
+    """
+    try:
+        return (await _verify_async(token)).get("sub")
+    except JWTError:
+        return None
+
+
 def hash_api_key(key: str) -> str:
     """Create a SHA-256 hash of an API key (one-way, for storage)."""
     return hashlib.sha256(key.encode()).hexdigest()
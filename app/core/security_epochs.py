@@ -0,0 +1,114 @@
+"""
+Per-admin security epochs for claims-only authorization.
+
+Access tokens carry the admin's `level`, `username` and the admin's
+security epoch at issue time (`epoch` claim). Every committed change to an
+admin (deactivation, level change, password reset...) bumps the epoch in
+the Redis hash `prismid:admin_epochs` and announces it on the admin
+invalidation channel.
+
+Read requests may then be authorized from the verified claims alone when
+the token's epoch still equals the admin's current epoch; a mismatch means
+the claims may be stale and the caller falls back to loading the admin.
+
+Like the revoked-JTI replica, each worker mirrors the epochs locally (full
+reload on every pub/sub (re)connect, updates from the channel), so the
+check needs no Redis round trip; while the replica is out of sync the
+fast path is simply not used.
+"""
+
+import threading
+from typing import Optional
+
+from app.core.redis_client import get_redis
+from app.models.admin import AdminAccount, AccessLevel
+
+
+ADMIN_EPOCHS_KEY = "prismid:admin_epochs"
+
+
+class EpochReplica:
+    """Thread-safe map of admin id -> security epoch (missing = 0)."""
+
+    def __init__(self):
+        self._epochs: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.synced = False
+
+    def current(self, admin_id: int) -> Optional[int]:
+        """The admin's epoch, or None if the replica cannot be trusted right now."""
+        if not self.synced:
+            return None
+        with self._lock:
+            return self._epochs.get(admin_id, 0)
+
+    def observe(self, admin_id: int, epoch: int) -> None:
+        """Record an epoch announced by another worker (epochs only move forward)."""
+        with self._lock:
+            if epoch > self._epochs.get(admin_id, 0):
+                self._epochs[admin_id] = epoch
+
+    def bump_local(self, admin_id: int) -> int:
+        with self._lock:
+            epoch = self._epochs.get(admin_id, 0) + 1
+            self._epochs[admin_id] = epoch
+            return epoch
+
+    def load(self, epochs: dict[int, int]) -> None:
+        with self._lock:
+            self._epochs = dict(epochs)
+            self.synced = True
+
+    def mark_unsynced(self) -> None:
+        self.synced = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"synced": self.synced, "admins": len(self._epochs)}
+
+
+admin_epochs = EpochReplica()
+
+
+def bump_security_epoch(admin_id: int) -> int:
+    """
+    Advance an admin's epoch here and in Redis; returns the new epoch.
+
+    The local bump makes this worker stop trusting older tokens immediately,
+    even if Redis is unreachable.
+    """
+    epoch = admin_epochs.bump_local(admin_id)
+    try:
+        epoch = max(epoch, int(get_redis().hincrby(ADMIN_EPOCHS_KEY, str(admin_id), 1)))
+        admin_epochs.observe(admin_id, epoch)
+    except Exception:
+        pass
+    return epoch
+
+
+def reload_security_epochs() -> None:
+    raw = get_redis().hgetall(ADMIN_EPOCHS_KEY)
+    admin_epochs.load({int(k): int(v) for k, v in raw.items()})
+
+
+def current_security_epoch(admin_id: int) -> Optional[int]:
+    """Epoch to embed in a new token, or None if it cannot be determined."""
+    return admin_epochs.current(admin_id)
+
+
+def admin_from_claims(payload: dict) -> Optional[AdminAccount]:
+    """
+    Build a transient AdminAccount from verified access-token claims, or
+    None if the claims cannot be trusted (old token, stale epoch, replica
+    out of sync).
+    """
+    if payload.get("type") != "access" or "epoch" not in payload:
+        return None
+    try:
+        admin_id = int(payload["sub"])
+        level = AccessLevel(payload["level"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if admin_epochs.current(admin_id) != payload["epoch"]:
+        return None
+    return AdminAccount(id=admin_id, username=payload.get("username"), access_level=level, is_active=True)
@@ -1,8 +1,11 @@
 """SQLAlchemy database engine, session, and base model."""
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.config import settings
+from app.core.replicas import RoutingSession, read_replicas
 
 
 engine = create_engine(
@@ -13,7 +16,46 @@ engine = create_engine(
     echo=settings.DEBUG,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
+
+
+# Async drivers for the same databases (asyncpg for PostgreSQL)
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync DATABASE_URL to use the matching asyncio driver."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)).render_as_string(
+        hide_password=False,
+    )
+
+
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_size=20,
+    max_overflow=10,
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+)
+
+# Objects stay readable after commit: async code cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False, sync_session_class=RoutingSession, driver="async",
+)
+
+# Read replicas, used only by sessions from the read-only dependencies (see app.core.replicas)
+for _url in filter(None, (part.strip() for part in settings.DATABASE_REPLICA_URLS.split(","))):
+    read_replicas.add(
+        _url,
+        create_engine(_url, pool_size=20, max_overflow=10, pool_pre_ping=True, echo=settings.DEBUG),
+        create_async_engine(
+            async_database_url(_url), pool_size=20, max_overflow=10, pool_pre_ping=True, echo=settings.DEBUG,
+        ),
+    )
+
+# Register session hooks that invalidate cached user-search totals on writes
+import app.core.counts  # noqa: E402,F401
 
 
 class Base(DeclarativeBase):
@@ -27,3 +69,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency that provides an AsyncSession (for async endpoints)."""
+    async with AsyncSessionLocal() as db:
+        yield db
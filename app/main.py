@@ -12,15 +12,25 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 import os
 
 from app.config import settings
 from app.database import engine, Base
 from app.models import *  # noqa: F401,F403 — Import all models for table creation
-from app.core.rate_limiter import limiter
+from app.core.rate_limiter import limiter, RateLimitMiddleware
 from app.core.middleware import RequestIdMiddleware, IdempotencyMiddleware
+from app.core.redis_client import get_async_redis, close_redis, close_async_redis
+from app.core.principal_cache import principal_cache
+from app.core.api_key_cache import api_key_cache
+from app.core.api_key_usage import start_usage_flusher, stop_usage_flusher
+from app.core.audit_sink import audit_buffer, start_audit_flusher, stop_audit_flusher
+from app.core.replicas import read_replicas, start_replica_monitor, stop_replica_monitor
+from app.core.password_hasher import PasswordHasherBusy
+from app.core.security import password_hasher
+from app.core.jwt_keys import keyring, is_asymmetric
+from app.core.revocation import revoked_jtis
+from app.core.security_epochs import admin_epochs
+from app.core import pubsub
 
 # Create FastAPI app
 app = FastAPI(
@@ -40,9 +50,18 @@ app = FastAPI(
 )
 
 
-# --- Rate Limiter ---
+# --- Rate Limiter (applied by RateLimitMiddleware below) ---
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+
+# --- Password executor saturated (burst of logins) ---
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication is busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
 
 
 # --- Global exception handler for consistent JSON errors ---
@@ -58,6 +77,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -70,13 +90,17 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     print(f"Validation Errors: {exc.errors()}")
     return JSONResponse(
         status_code=422,
-        content={"detail": exc.errors()},
+        content={"detail": jsonable_encoder(exc.errors())},
     )
 
 
-# --- Middleware (order matters: outermost first) ---
-app.add_middleware(RequestIdMiddleware)
+# --- Middleware ---
+# add_middleware prepends, so the last one registered is the outermost. Effective
+# order, outermost first: RequestId -> TrustedHost (if configured) -> CORS ->
+# RateLimit -> Idempotency. RequestId wraps everything, so 429s, replays and
+# rejected hosts still carry X-Request-Id.
 app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(RateLimitMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -85,7 +109,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Request-Id", "X-Idempotent-Replay"],
+    expose_headers=[
+        "X-Request-Id", "X-Idempotent-Replay",
+        "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After",
+    ],
 )
 
 # Trusted-host protection (only if configured)
@@ -95,6 +122,8 @@ if settings.ALLOWED_HOSTS:
         allowed_hosts=settings.allowed_hosts_list,
     )
 
+app.add_middleware(RequestIdMiddleware)
+
 
 # ---------------------------------------------------------------------------
 # API v1 router — all endpoints live here
@@ -136,6 +165,14 @@ async def health():
         "version": settings.APP_VERSION,
         "database": "unknown",
         "redis": "unknown",
+        "admin_cache": principal_cache.stats(),
+        "api_key_cache": api_key_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "audit_sink": audit_buffer.stats(),
+        "rate_limiter": limiter.stats(),
+        "revoked_jti_replica": revoked_jtis.stats(),
+        "security_epochs": admin_epochs.stats(),
+        "read_replicas": read_replicas.stats(),
     }
 
     # Check database
@@ -152,9 +189,7 @@ async def health():
 
     # Check Redis
     try:
-        import redis
-        r = redis.from_url(settings.REDIS_URL)
-        r.ping()
+        await get_async_redis().ping()
         health_status["redis"] = "connected"
     except Exception as e:
         health_status["redis"] = f"error: {str(e)[:100]}"
@@ -163,6 +198,14 @@ async def health():
     return health_status
 
 
+# --- Public signing keys for offline token verification ---
+@app.get("/.well-known/jwks.json", tags=["Health"])
+def jwks():
+    """Public keys that verify PRISMID access tokens (empty while signing with a shared secret)."""
+    document = keyring.jwks() if is_asymmetric(settings.JWT_ALGORITHM) else {"keys": []}
+    return JSONResponse(content=document, headers={"Cache-Control": "public, max-age=300"})
+
+
 # --- Serve static files ---
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 if os.path.exists(static_dir):
@@ -183,3 +226,17 @@ async def serve_dashboard():
 @app.on_event("startup")
 async def startup():
     Base.metadata.create_all(bind=engine)
+    pubsub.start_listener()
+    start_usage_flusher()
+    start_audit_flusher()
+    start_replica_monitor()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    pubsub.stop_listener()
+    stop_usage_flusher()
+    stop_audit_flusher()
+    stop_replica_monitor()
+    close_redis()
+    await close_async_redis()
@@ -8,6 +8,7 @@ from app.models.admin import AdminAccount, AccessLevel
 from app.models.audit import AuditLog, ConversionHistory, IdMigrationMap
 from app.models.sync import SheetSyncLog, SyncType, SyncTarget, SyncStatus
 from app.models.api_key import ApiKey
+from app.models.signing_key import SigningKey
 
 __all__ = [
     "User", "InternshipTracking", "UserCategory", "UserStatus", "InternshipStatus",
@@ -17,5 +18,6 @@ __all__ = [
     "AuditLog", "ConversionHistory", "IdMigrationMap",
     "SheetSyncLog", "SyncType", "SyncTarget", "SyncStatus",
     "ApiKey",
+    "SigningKey",
 ]
 
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Boolean, DateTime, ForeignKey, Text,
+    Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Text,
 )
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -20,7 +20,11 @@ class ApiKey(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     expires_at = Column(DateTime, nullable=True)                     # None = never expires
+    # Usage is buffered in memory and flushed periodically (see app.core.api_key_usage)
     last_used_at = Column(DateTime, nullable=True)
+    last_used_ip = Column(String(45), nullable=True)                 # Fits IPv6
+    request_count = Column(BigInteger, default=0, server_default="0", nullable=False)
+    rate_limit = Column(String(32), nullable=True)                   # e.g. "1000/minute"; None = RATE_LIMIT_DEFAULT
 
     # Relationships
     owner = relationship("AdminAccount", backref="api_keys", lazy="joined")
@@ -34,7 +38,11 @@ class ApiKey(Base):
 
     def has_scope(self, required_scope: str) -> bool:
         """Check if this key has the required scope (supports wildcard)."""
-        scopes = self.scopes_list
+        return self.scopes_allow(frozenset(self.scopes_list), required_scope)
+
+    @staticmethod
+    def scopes_allow(scopes: frozenset, required_scope: str) -> bool:
+        """Scope check against an already-parsed scope set."""
         if "*" in scopes:
             return True
         # Support wildcard within resource, e.g. "users:*"
@@ -0,0 +1,20 @@
+"""SQLAlchemy model for JWT signing keys (asymmetric signing + JWKS)."""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from app.database import Base
+
+
+class SigningKey(Base):
+    __tablename__ = "jwt_signing_keys"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kid = Column(String(64), unique=True, nullable=False)            # RFC 7638 thumbprint of the public key
+    algorithm = Column(String(16), nullable=False)                   # e.g. "RS256"
+    # PKCS#8 PEM, encrypted with JWT_KEY_ENCRYPTION_PASSPHRASE when set; plaintext otherwise,
+    # in which case read access to this table is enough to mint tokens
+    private_key_pem = Column(Text, nullable=False)
+    public_jwk = Column(JSON, nullable=False)                        # Published as-is in /.well-known/jwks.json
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    activates_at = Column(DateTime, nullable=False)                  # Published before it signs, so verifiers can prefetch
+    expires_at = Column(DateTime, nullable=True)                     # Set on rotation; None = current key
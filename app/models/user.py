@@ -4,7 +4,7 @@ import enum
 from datetime import datetime, date
 from sqlalchemy import (
     Column, Integer, String, Enum, DateTime, Date,
-    ForeignKey, Text, Boolean, Index
+    ForeignKey, Text, Boolean, Index, DDL, event
 )
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -22,11 +22,17 @@ class UserStatus(str, enum.Enum):
     CONVERTED = "CONVERTED"
 
 
+def _display_suffix_default(context) -> str:
+    """Derive the display-ID suffix (last 10 ULID chars) at insert time."""
+    return context.get_current_parameters()["ulid"][-10:].upper()
+
+
 class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     ulid = Column(String(26), unique=True, nullable=False, index=True)
+    display_suffix = Column(String(10), nullable=False, default=_display_suffix_default)  # ULID[-10:], immutable
     name = Column(String(255), nullable=False, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
     category = Column(Enum(UserCategory), nullable=False)
@@ -51,7 +57,17 @@ class User(Base):
     __table_args__ = (
         Index("ix_users_category_status", "category", "status"),
         Index("ix_users_name_search", "name"),
-        Index("ix_users_ulid_suffix", "ulid"),  # For display ID suffix lookups
+        Index("ix_users_display_suffix", "display_suffix"),  # For display ID suffix lookups
+        Index("ix_users_created_at_id", "created_at", "id"),  # Keyset pagination sort key
+        # Trigram indexes for generic `q` search (PostgreSQL only, needs pg_trgm)
+        Index(
+            "ix_users_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_email_trgm", "email",
+            postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
     @property
@@ -59,6 +75,35 @@ class User(Base):
         return self.status == UserStatus.ACTIVE and self.deleted_at is None
 
 
+# --- Search index support (see app.services.search_service) ---
+
+# PostgreSQL: the trigram indexes above need the pg_trgm extension
+event.listen(
+    User.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# SQLite: FTS5 shadow table with trigram tokenizer, kept in sync by triggers
+_SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "name, email, content='users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, email ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+]
+for _statement in _SQLITE_FTS_DDL:
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    User.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS users_fts").execute_if(dialect="sqlite"),
+)
+
+
 class InternshipStatus(str, enum.Enum):
     ACTIVE = "ACTIVE"
     EXPIRED = "EXPIRED"
@@ -1,8 +1,9 @@
 """Pydantic schemas for role-related API operations."""
 
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, model_validator
+from app.models.user import UserCategory, UserStatus
 
 
 class RoleCreate(BaseModel):
@@ -43,3 +44,37 @@ class UserRoleAssign(BaseModel):
 
 class UserRoleRemove(BaseModel):
     role_id: int
+
+
+class RoleAssignmentFilters(BaseModel):
+    """search_users-style filters selecting the users to (un)assign. Soft-deleted users never match."""
+    q: Optional[str] = None
+    name: Optional[str] = None
+    ulid: Optional[str] = None
+    role: Optional[str] = None
+    category: Optional[UserCategory] = None
+    status: Optional[List[UserStatus]] = None
+    domain_id: Optional[int] = None
+    division_id: Optional[int] = None
+
+
+class RoleBulkAssignmentRequest(BaseModel):
+    """Assign or remove one role for many users, given either explicit IDs or filters."""
+    action: Literal["assign", "remove"] = "assign"
+    user_ids: Optional[List[str]] = Field(None, min_length=1, max_length=5000)  # ULIDs and/or display IDs
+    filters: Optional[RoleAssignmentFilters] = None
+
+    @model_validator(mode="after")
+    def exactly_one_target(self):
+        if (self.user_ids is None) == (self.filters is None):
+            raise ValueError("Provide exactly one of user_ids or filters")
+        return self
+
+
+class RoleBulkAssignmentResponse(BaseModel):
+    role_id: int
+    action: str
+    matched: int   # Users selected by user_ids / filters
+    changed: int   # Users whose assignment was created, reactivated or removed
+    skipped: int   # Already in the requested state
+    not_found: List[str]  # user_ids that did not resolve to an active user
@@ -1,7 +1,7 @@
 """Pydantic schemas for user-related API operations."""
 
 from datetime import datetime, date
-from typing import Optional, List, Any
+from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, EmailStr, Field, model_validator
 from app.models.user import UserCategory, UserStatus
 
@@ -83,10 +83,45 @@ class UserSearchQuery(BaseModel):
 
 class UserSearchResponse(BaseModel):
     users: List[UserResponse]
-    total: int
-    page: int
+    total: Optional[int] = None      # None when with_total=false
+    total_estimated: bool = False    # True when total is a planner estimate
+    page: Optional[int] = None       # None in cursor mode
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Cursor mode only; None on the last page
+
+
+class UserBulkCreateRequest(BaseModel):
+    """Request body for creating many users in one call."""
+    users: List[UserCreate] = Field(..., min_length=1, max_length=5000)
+
+
+class UserBulkCreatedItem(BaseModel):
+    index: int  # Position in the request's users list
+    ulid: str
+    display_id: str
+    email: str
+
+
+class UserBulkError(BaseModel):
+    index: int
+    email: str
+    detail: str
+
+
+class UserBulkCreateResponse(BaseModel):
+    created: List[UserBulkCreatedItem]
+    errors: List[UserBulkError]
+
+
+class UserBatchGetRequest(BaseModel):
+    """Request body for resolving many users at once (ULIDs and/or display IDs)."""
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class UserBatchGetResponse(BaseModel):
+    results: Dict[str, Optional[UserResponse]]  # Keyed by input ID; null = not found
+    not_found: List[str]
 
 
 class InternConvertRequest(BaseModel):
@@ -0,0 +1,193 @@
+"""
+Index-backed generic user search.
+
+Replaces the `name ILIKE '%q%' OR email ILIKE '%q%'` scan with an
+engine-specific index:
+
+- PostgreSQL: pg_trgm GIN indexes on users.name / users.email serve the
+  ILIKE predicate directly; results are ranked by trigram similarity.
+- SQLite: an FTS5 `users_fts` shadow table (trigram tokenizer, kept in sync
+  by triggers — see app.models.user) is matched with MATCH and ranked by bm25.
+
+Anything else (or a query too short for trigrams) falls back to plain ILIKE.
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, func, select, text, literal_column, table, column
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.id_generator import display_id_to_ulid_suffix, is_display_id_format
+from app.models.role import Role, UserRole
+from app.models.user import User, UserCategory, UserStatus
+
+
+# Trigram indexes cannot narrow queries shorter than one trigram
+MIN_TRIGRAM_LENGTH = 3
+
+# Per-engine memo of whether the SQLite FTS shadow table exists
+_fts_available: dict[str, bool] = {}
+
+
+class UserSearchService:
+    """Build filter and ranking expressions for the `q` search parameter."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def match(self, q: str) -> Tuple[ColumnElement, Optional[ColumnElement]]:
+        """
+        Return (filter, rank) for a free-text name/email search.
+
+        `rank` sorts best matches first when ordered DESC; it is None when
+        no index-backed ranking is available.
+        """
+        term = q.strip()
+        if len(term) >= MIN_TRIGRAM_LENGTH:
+            if self.dialect == "postgresql":
+                return self._match_trigram(term)
+            if self.dialect == "sqlite" and self._has_fts():
+                return self._match_fts(term)
+        return self._match_ilike(term), None
+
+    # ------------------------------------------------------------------
+    # Engines
+    # ------------------------------------------------------------------
+
+    def _match_ilike(self, term: str) -> ColumnElement:
+        pattern = f"%{term}%"
+        return or_(User.name.ilike(pattern), User.email.ilike(pattern))
+
+    def _match_trigram(self, term: str) -> Tuple[ColumnElement, ColumnElement]:
+        # ILIKE keeps today's substring semantics and is served by gin_trgm_ops
+        rank = func.greatest(
+            func.similarity(User.name, term),
+            func.similarity(User.email, term),
+        )
+        return self._match_ilike(term), rank
+
+    def _match_fts(self, term: str) -> Tuple[ColumnElement, ColumnElement]:
+        # Quote as a single FTS5 string so user input is never parsed as syntax
+        fts_query = '"' + term.replace('"', '""') + '"'
+        fts = table("users_fts", column("rowid"))
+        is_match = literal_column("users_fts").op("MATCH")(fts_query)
+        matches = select(fts.c.rowid).where(is_match)
+        # bm25() is more negative for better matches, so negate it for DESC
+        rank = (
+            select(-func.bm25(literal_column("users_fts")))
+            .select_from(fts)
+            .where(is_match, fts.c.rowid == User.id)
+            .scalar_subquery()
+        )
+        return User.id.in_(matches), rank
+
+    def _has_fts(self) -> bool:
+        key = str(self.db.get_bind().url)
+        if key not in _fts_available:
+            found = self.db.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+            )).first()
+            _fts_available[key] = found is not None
+        return _fts_available[key]
+
+
+# ---------------------------------------------------------------------------
+# User lookup and listing filters (shared by the users and roles routers)
+# ---------------------------------------------------------------------------
+
+def uid_lookup(uid: str) -> Optional[tuple[str, str]]:
+    """
+    Classify a user identifier.
+
+    Returns ("ulid", value) or ("suffix", value), or None when uid looks like
+    a display ID but cannot be parsed.
+    """
+    # Full ULID (26 chars)
+    if len(uid) == 26:
+        return "ulid", uid.upper()
+
+    # Display ID format (e.g., INT-T6V4-B1C9-D0 or T6V4-B1C9-D0)
+    if is_display_id_format(uid):
+        try:
+            return "suffix", display_id_to_ulid_suffix(uid)
+        except ValueError:
+            return None
+
+    # Try as-is (could be partial or old format)
+    return "ulid", uid.upper()
+
+
+def uid_filter(lookup: tuple[str, str]):
+    """SQL filter for a uid_lookup result."""
+    kind, value = lookup
+    if kind == "suffix":
+        return User.display_suffix == value
+    return User.ulid == value
+
+
+def apply_user_search_filters(
+    query,
+    db: Session,
+    *,
+    q: Optional[str] = None,
+    name: Optional[str] = None,
+    ulid: Optional[str] = None,
+    role: Optional[str] = None,
+    category: Optional[UserCategory] = None,
+    status_filter: Optional[List[UserStatus]] = None,
+    domain_id: Optional[int] = None,
+    division_id: Optional[int] = None,
+    include_deleted: bool = False,
+    deleted_only: bool = False,
+):
+    """
+    Apply the search_users filter set to a User query.
+
+    Returns (query, rank) where rank is the text-search ranking expression,
+    or None when `q` is not set or the search engine cannot rank.
+    """
+    if deleted_only:
+        query = query.filter(User.deleted_at != None)
+    elif not include_deleted:
+        query = query.filter(User.deleted_at == None)
+
+    # Generic search (OR logic) — name/email go through the index-backed engine
+    rank = None
+    if q:
+        text_filter, rank = UserSearchService(db).match(q)
+        search_filters = [
+            text_filter,
+            User.ulid == q.upper(),
+        ]
+        # Also check if it's a display ID format
+        if is_display_id_format(q):
+            try:
+                suffix = display_id_to_ulid_suffix(q)
+                search_filters.append(User.display_suffix == suffix)
+            except ValueError:
+                pass
+        query = query.filter(or_(*search_filters))
+
+    # Specific filters (AND logic)
+    if name:
+        query = query.filter(User.name.ilike(f"%{name}%"))
+    if ulid:
+        query = query.filter(User.ulid == ulid.upper())
+    if category:
+        query = query.filter(User.category == category)
+    if status_filter:
+        query = query.filter(User.status.in_(status_filter))
+    if domain_id:
+        query = query.filter(User.domain_id == domain_id)
+    if division_id:
+        query = query.filter(User.division_id == division_id)
+    if role:
+        # EXISTS rather than a join, so users holding several matching roles appear once
+        query = query.filter(User.user_roles.any(and_(
+            UserRole.removed_at == None,
+            UserRole.role.has(Role.name.ilike(f"%{role}%")),
+        )))
+
+    return query, rank
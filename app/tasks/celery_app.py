@@ -11,6 +11,7 @@ celery_app = Celery(
     include=[
         "app.tasks.intern_expiry",
         "app.tasks.sheet_sync",
+        "app.tasks.key_rotation",
     ],
 )
 
@@ -35,4 +36,8 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.sheet_sync.sync_to_sheets",
         "schedule": crontab(minute="*/15"),  # Every 15 minutes
     },
+    "rotate-jwt-signing-keys": {
+        "task": "app.tasks.key_rotation.rotate_jwt_signing_keys",
+        "schedule": crontab(hour=1, minute=0),  # Daily check; rotates every JWT_KEY_ROTATION_DAYS
+    },
 }
@@ -14,7 +14,7 @@ import json
 from app.tasks.celery_app import celery_app
 from app.database import SessionLocal
 from app.models.user import User, UserCategory, UserStatus, InternshipTracking, InternshipStatus
-from app.models.audit import AuditLog
+from app.core.audit_sink import record_audit
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +44,8 @@ def check_intern_expiry():
             intern_track.status = InternshipStatus.EXPIRED
             intern_track.updated_at = datetime.utcnow()
 
-            db.add(AuditLog(
+            record_audit(
+                db,
                 action="INTERN_EXPIRED",
                 entity_type="user",
                 entity_id=user.ulid,
@@ -54,7 +55,7 @@ def check_intern_expiry():
                     "end_date": str(intern_track.end_date),
                     "status": "EXPIRED",
                 },
-            ))
+            )
             expired_count += 1
 
         # --- 2. Generate 7-day warnings ---
@@ -82,10 +83,8 @@ def check_intern_expiry():
 
         # Store warnings in Redis for dashboard display
         try:
-            import redis
-            from app.config import settings
-            r = redis.from_url(settings.REDIS_URL)
-            r.setex(
+            from app.core.redis_client import get_redis
+            get_redis().setex(
                 "prismid:intern_warnings",
                 86400,  # TTL: 24 hours
                 json.dumps(warnings),
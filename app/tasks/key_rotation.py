@@ -0,0 +1,42 @@
+"""
+JWT signing key rotation task.
+
+Runs daily: when asymmetric signing is enabled and the newest signing key
+is older than JWT_KEY_ROTATION_DAYS, stages a replacement and retires the
+current key (see app.core.jwt_keys for the key lifecycle).
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from app.tasks.celery_app import celery_app
+from app.config import settings
+from app.database import SessionLocal
+from app.models.signing_key import SigningKey
+from app.core.jwt_keys import is_asymmetric, rotate_signing_keys
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.key_rotation.rotate_jwt_signing_keys")
+def rotate_jwt_signing_keys():
+    """Rotate the JWT signing key if it is due."""
+    if not is_asymmetric(settings.JWT_ALGORITHM):
+        return {"rotated": False, "reason": "symmetric signing"}
+
+    db = SessionLocal()
+    try:
+        newest = db.query(SigningKey).order_by(SigningKey.activates_at.desc()).first()
+        due = datetime.utcnow() - timedelta(days=settings.JWT_KEY_ROTATION_DAYS)
+        if newest is not None and newest.activates_at > due:
+            return {"rotated": False, "kid": newest.kid}
+
+        key = rotate_signing_keys(db)
+        logger.info(f"Staged JWT signing key {key.kid}, active from {key.activates_at.isoformat()}")
+        return {"rotated": True, "kid": key.kid}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"JWT signing key rotation failed: {e}")
+        raise
+    finally:
+        db.close()
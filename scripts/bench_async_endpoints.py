@@ -0,0 +1,157 @@
+"""
+Benchmark the hot read endpoints under concurrency: sync handlers on the
+threadpool (the previous implementation, reproduced below) vs the async
+handlers on AsyncSession.
+
+- GET /api/v1/users/{uid}
+- GET /api/v1/dashboard/stats
+
+(GET /api/v1/users stays a sync handler: its ORM query and response
+hydration would otherwise run on the event loop.)
+
+Requests are driven in-process through httpx's ASGI transport with a fixed
+number of concurrent clients. Auth is stubbed out for both variants so the
+numbers compare the handlers and their database access only. The gap is
+largest on PostgreSQL (asyncpg vs psycopg2 on a 40-thread pool); SQLite
+serialises on a single file, so expect the two variants to be close there.
+
+Usage:
+    python scripts/bench_async_endpoints.py [--requests 2000] [--concurrency 50] [--users 2000]
+    python scripts/bench_async_endpoints.py --database-url postgresql://... (seeds that database)
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api import users as users_api
+from app.api.deps import require_viewer
+from app.core.rate_limiter import limiter
+from app.database import get_db, get_async_db, async_database_url
+from app.main import app
+from app.models import AdminAccount, AccessLevel, AuditLog, Role, User
+from app.models.user import UserCategory, UserStatus
+from app.services.search_service import uid_filter, uid_lookup
+from bench_user_listing import seed
+
+
+# ---------------------------------------------------------------------------
+# Previous sync handlers
+# ---------------------------------------------------------------------------
+
+legacy = APIRouter(prefix="/legacy")
+
+
+@legacy.get("/users/{uid}")
+def legacy_get_user(uid: str, db: Session = Depends(get_db), current_admin=Depends(require_viewer)):
+    lookup = uid_lookup(uid)
+    user = None
+    if lookup is not None:
+        user = db.query(User).options(*users_api.USER_LOAD_OPTIONS).filter(uid_filter(lookup)).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return users_api._build_user_response(user)
+
+
+@legacy.get("/dashboard/stats")
+def legacy_dashboard_stats(db: Session = Depends(get_db), current_admin=Depends(require_viewer)):
+    recent_actions = db.query(AuditLog).order_by(AuditLog.timestamp.desc()).limit(5).all()
+    return {
+        "total_users": db.query(User).filter(User.deleted_at == None).count(),
+        "active_users": db.query(User).filter(User.status == UserStatus.ACTIVE, User.deleted_at == None).count(),
+        "total_interns": db.query(User).filter(User.category == UserCategory.INTERN, User.deleted_at == None).count(),
+        "total_employees": db.query(User).filter(User.category == UserCategory.EMPLOYEE, User.deleted_at == None).count(),
+        "total_roles": db.query(Role).filter(Role.is_active == True).count(),
+        "recent_actions": [{"action": log.action, "timestamp": log.timestamp.isoformat()} for log in recent_actions],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+async def requests_per_second(urls: list[str], total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        assert (await client.get(urls[0])).status_code == 200  # warm-up
+
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(random.choice(urls))
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    if url.startswith("sqlite"):
+        engine_args = {"connect_args": {"check_same_thread": False}}
+    else:
+        engine_args = {"pool_size": 20, "max_overflow": 10}
+    engine = create_engine(url, **engine_args)
+    seed(engine, args.users)
+    SyncSession = sessionmaker(bind=engine)
+    AsyncSession = async_sessionmaker(
+        create_async_engine(async_database_url(url), **{k: v for k, v in engine_args.items() if k != "connect_args"}),
+        expire_on_commit=False,
+    )
+    with SyncSession() as db:
+        ulids = db.scalars(select(User.ulid).limit(500)).all()
+
+    def bench_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def bench_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.include_router(legacy)
+    app.dependency_overrides[get_db] = bench_db
+    app.dependency_overrides[get_async_db] = bench_async_db
+    app.dependency_overrides[require_viewer] = lambda: AdminAccount(id=1, username="bench", access_level=AccessLevel.VIEWER)
+    limiter.enabled = False
+
+    endpoints = {
+        "GET /users/{uid}": lambda prefix: [f"{prefix}/users/{ulid}" for ulid in ulids],
+        "GET /dashboard/stats": lambda prefix: [f"{prefix}/dashboard/stats"],
+    }
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {engine.dialect.name}, in-process ASGI")
+    print(f"{'endpoint':<22}{'sync req/s':>14}{'async req/s':>14}")
+    for label, build in endpoints.items():
+        sync = asyncio.run(requests_per_second(build("/legacy"), args.requests, args.concurrency))
+        native = asyncio.run(requests_per_second(build("/api/v1"), args.requests, args.concurrency))
+        print(f"{label:<22}{sync:>14.0f}{native:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark RequestIdMiddleware + IdempotencyMiddleware: BaseHTTPMiddleware
+(the previous implementation, reproduced below) vs pure ASGI.
+
+Requests are driven in-process through httpx's ASGI transport with a fixed
+number of concurrent clients, so the numbers isolate the ASGI stack
+(no sockets, no uvicorn). Two endpoints:
+
+- a trivial JSON endpoint on an otherwise empty app (middleware overhead)
+- GET /api/v1/users on the real app, seeded as in bench_user_listing.py
+
+Usage:
+    python scripts/bench_middleware.py [--requests 3000] [--concurrency 20] [--users 2000]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response, JSONResponse
+
+from app.core.middleware import RequestIdMiddleware, IdempotencyMiddleware
+from app.core.redis_client import get_async_redis
+from app.database import get_db
+from app.main import app as prismid_app
+from app.models import AdminAccount, AccessLevel
+from app.api.deps import require_viewer
+from bench_user_listing import seed
+
+
+class LegacyRequestIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-Id", str(uuid.uuid4()))
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-Id"] = request_id
+        return response
+
+
+class LegacyIdempotencyMiddleware(BaseHTTPMiddleware):
+    IDEMPOTENT_METHODS = {"POST", "PUT", "DELETE", "PATCH"}
+    TTL_SECONDS = 86400
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method not in self.IDEMPOTENT_METHODS:
+            return await call_next(request)
+        idem_key = request.headers.get("Idempotency-Key")
+        if not idem_key:
+            return await call_next(request)
+        cache_key = f"prismid:idempotency:{hashlib.sha256(f'{request.method}:{request.url.path}:{idem_key}'.encode()).hexdigest()}"
+        try:
+            r = get_async_redis()
+            cached = await r.get(cache_key)
+            if cached:
+                data = json.loads(cached)
+                return JSONResponse(content=data["body"], status_code=data["status_code"],
+                                    headers={"X-Idempotent-Replay": "true"})
+        except Exception:
+            return await call_next(request)
+        response = await call_next(request)
+        if 200 <= response.status_code < 300:
+            try:
+                body = b""
+                async for chunk in response.body_iterator:
+                    body += chunk if isinstance(chunk, bytes) else chunk.encode()
+                await r.setex(cache_key, self.TTL_SECONDS, json.dumps({
+                    "status_code": response.status_code, "body": json.loads(body.decode()),
+                }))
+                return Response(content=body, status_code=response.status_code,
+                                headers=dict(response.headers), media_type=response.media_type)
+            except Exception:
+                pass
+        return response
+
+
+VARIANTS = {
+    "BaseHTTPMiddleware": (LegacyRequestIdMiddleware, LegacyIdempotencyMiddleware),
+    "pure ASGI": (RequestIdMiddleware, IdempotencyMiddleware),
+}
+
+
+def trivial_app(request_id_cls, idempotency_cls) -> FastAPI:
+    app = FastAPI(middleware=[Middleware(request_id_cls), Middleware(idempotency_cls)])
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    return app
+
+
+def use_variant(app: FastAPI, request_id_cls, idempotency_cls) -> FastAPI:
+    """Swap the two middlewares in the real app's stack (rebuilt on next request)."""
+    swap = {
+        RequestIdMiddleware: request_id_cls, LegacyRequestIdMiddleware: request_id_cls,
+        IdempotencyMiddleware: idempotency_cls, LegacyIdempotencyMiddleware: idempotency_cls,
+    }
+    app.user_middleware = [
+        Middleware(swap.get(m.cls, m.cls), *m.args, **m.kwargs) for m in app.user_middleware
+    ]
+    app.middleware_stack = None
+    return app
+
+
+async def requests_per_second(app, url: str, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        assert (await client.get(url)).status_code == 200  # warm-up
+
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(url)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--per-page", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+                           connect_args={"check_same_thread": False})
+    seed(engine, args.users)
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    prismid_app.dependency_overrides[get_db] = bench_db
+    prismid_app.dependency_overrides[require_viewer] = lambda: AdminAccount(id=1, username="bench", access_level=AccessLevel.VIEWER)
+    prismid_app.state.limiter.enabled = False
+
+    users_url = f"/api/v1/users?per_page={args.per_page}&with_total=false"
+    print(f"{args.requests} requests, {args.concurrency} concurrent, in-process ASGI")
+    print(f"{'middleware':<22}{'trivial req/s':>16}{'GET /users req/s':>20}")
+    for label, classes in VARIANTS.items():
+        trivial = asyncio.run(requests_per_second(trivial_app(*classes), "/ping", args.requests, args.concurrency))
+        users = asyncio.run(requests_per_second(
+            use_variant(prismid_app, *classes), users_url, args.requests // 5, args.concurrency,
+        ))
+        print(f"{label:<22}{trivial:>16.0f}{users:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
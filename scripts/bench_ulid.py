@@ -0,0 +1,70 @@
+"""
+Micro-benchmark: in-process monotonic ULIDs vs the old DB-probing generator.
+
+The old generator drew a random ULID and ran `SELECT id FROM users WHERE
+ulid = ?` per attempt; batches repeated that per ULID. It is reproduced
+here as `legacy_generate_ulid` so both can be timed against the same
+seeded SQLite database (or --database-url).
+
+Usage:
+    python scripts/bench_ulid.py [--rows 20000] [--batch 1000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from ulid import ULID
+
+from app.database import Base
+from app.models import User
+from app.core.id_generator import generate_ulid, generate_batch_ulids
+
+
+def legacy_generate_ulid(db) -> str:
+    for _ in range(100):
+        ulid_value = str(ULID()).upper()
+        if not db.query(User.id).filter(User.ulid == ulid_value).first():
+            return ulid_value
+    raise RuntimeError("Failed to generate unique ULID after 100 attempts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Users to seed before timing")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    db_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"ulid": u, "name": f"Seed {i}", "email": f"seed{i}@prismid.com", "category": "EMPLOYEE"}
+            for i, u in enumerate(generate_batch_ulids(args.rows))
+        ])
+    db = sessionmaker(bind=engine)()
+
+    cases = [
+        ("legacy single (DB probe)", lambda: legacy_generate_ulid(db), 2000),
+        ("monotonic single", generate_ulid, 2000),
+        (f"legacy batch of {args.batch}", lambda: [legacy_generate_ulid(db) for _ in range(args.batch)], 5),
+        (f"monotonic batch of {args.batch}", lambda: generate_batch_ulids(args.batch), 5),
+    ]
+    print(f"{engine.dialect.name}, {args.rows} existing users")
+    print(f"{'case':<32}{'per call':>14}")
+    for label, fn, number in cases:
+        best = min(timeit.repeat(fn, number=number, repeat=3)) / number
+        unit, scale = ("ms", 1e3) if best >= 1e-3 else ("us", 1e6)
+        print(f"{label:<32}{best * scale:>11.1f} {unit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark GET /api/v1/users: ORM hydration vs the lean Core projection.
+
+Seeds a throwaway SQLite database (or uses --database-url) with users that
+carry roles, a domain/division and, for interns, an internship row, then
+times full pages through the real endpoint and records peak Python memory.
+
+Usage:
+    python scripts/bench_user_listing.py [--users 5000] [--per-page 100] [--rounds 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+from ulid import ULID
+
+from app.database import Base, get_db
+from app.main import app
+from app.models import User, UserRole, Role, Domain, Division, InternshipTracking, AdminAccount, AccessLevel
+from app.api.deps import require_viewer
+
+
+def seed(engine, user_count: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Domain), [{"name": f"Domain {i}"} for i in range(10)])
+        conn.execute(insert(Division), [{"name": f"Division {i}"} for i in range(10)])
+        conn.execute(insert(Role), [{"name": f"Role {i}", "clearance_level": 1 + i % 10} for i in range(20)])
+
+        users = []
+        for i in range(user_count):
+            users.append({
+                "ulid": str(ULID()).upper(),
+                "name": f"Bench User {i}",
+                "email": f"bench{i}@prismid.com",
+                "category": "INTERN" if i % 2 else "EMPLOYEE",
+                "domain_id": 1 + i % 10,
+                "division_id": 1 + i % 10,
+            })
+        conn.execute(insert(User), users)
+
+        conn.execute(insert(UserRole), [
+            {"user_id": uid, "role_id": 1 + (uid + k) % 20}
+            for uid in range(1, user_count + 1) for k in range(3)
+        ])
+        conn.execute(insert(InternshipTracking), [
+            {"user_id": uid, "start_date": date.today(), "end_date": date.today() + timedelta(days=90)}
+            for uid in range(2, user_count + 1, 2)
+        ])
+
+
+def measure(client: TestClient, url: str, rounds: int) -> tuple[float, float, float]:
+    """Return (median ms, p95 ms, peak KiB) for `rounds` requests."""
+    client.get(url)  # warm-up
+    timings = []
+    tracemalloc.start()
+    for _ in range(rounds):
+        started = time.perf_counter()
+        res = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert res.status_code == 200, res.text
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    db_url = args.database_url
+    if db_url is None:
+        db_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(db_url)
+    seed(engine, args.users)
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = bench_db
+    app.dependency_overrides[require_viewer] = lambda: AdminAccount(id=1, username="bench", access_level=AccessLevel.VIEWER)
+    app.state.limiter.enabled = False
+    client = TestClient(app)
+
+    base = f"/api/v1/users?per_page={args.per_page}&with_total=false"
+    cases = [
+        ("ORM (joinedload)", base),
+        ("lean fields=*", base + "&fields=*"),
+        ("lean fields=ulid,name,roles", base + "&fields=ulid,name,roles"),
+    ]
+    print(f"{args.users} users, {args.per_page} rows/page, {args.rounds} rounds ({engine.dialect.name})")
+    print(f"{'mode':<30}{'median ms':>12}{'p95 ms':>12}{'peak KiB':>12}")
+    for label, url in cases:
+        median, p95, peak = measure(client, url, args.rounds)
+        print(f"{label:<30}{median:>12.1f}{p95:>12.1f}{peak:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
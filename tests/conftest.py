@@ -2,19 +2,31 @@
 
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db, async_database_url
 from app.main import app
 from app.models.admin import AdminAccount, AccessLevel
 from app.core.security import hash_password
+from app.core.principal_cache import principal_cache
+from app.core.api_key_cache import api_key_cache
+from app.core.api_key_usage import usage_buffer
+from app.core.security_epochs import admin_epochs
+from app.core.audit_sink import audit_buffer
+from app.core.rate_limiter import limiter
+from app.core.replicas import recent_writers
 
 
 # Use SQLite for tests
 TEST_DATABASE_URL = "sqlite:///./test_prismid.db"
 engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 TestSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# NullPool: each test's TestClient runs its own event loop, and aiosqlite connections are loop-bound
+async_engine = create_async_engine(async_database_url(TEST_DATABASE_URL), poolclass=NullPool)
+AsyncTestSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 def override_get_db():
@@ -25,7 +37,13 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with AsyncTestSession() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 
 @pytest.fixture(autouse=True)
@@ -44,6 +62,15 @@ def setup_db():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    # Admin ids are reused by the next test's fresh database
+    principal_cache.invalidate()
+    api_key_cache.invalidate()
+    usage_buffer.drain()
+    audit_buffer.drain()
+    limiter.reset()
+    recent_writers.clear()
+    admin_epochs.load({})
+    admin_epochs.mark_unsynced()
 
 
 @pytest.fixture
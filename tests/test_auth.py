@@ -76,3 +76,464 @@ class TestAdminRegistration:
             headers=auth_header(superadmin_token),
         )
         assert response.status_code == 409
+
+
+class TestPrincipalCache:
+    def test_repeat_requests_hit_cache(self, client, superadmin_token):
+        from app.core.principal_cache import principal_cache
+
+        client.get("/api/v1/auth/me", headers=auth_header(superadmin_token))
+        before = principal_cache.stats()
+        response = client.get("/api/v1/auth/me", headers=auth_header(superadmin_token))
+        after = principal_cache.stats()
+
+        assert response.status_code == 200
+        assert response.json()["username"] == "testadmin"
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"]
+
+    def test_deactivation_invalidates(self, client, db, viewer, viewer_token):
+        assert client.get("/api/v1/auth/me", headers=auth_header(viewer_token)).status_code == 200
+
+        viewer.is_active = False
+        db.commit()
+
+        response = client.get("/api/v1/auth/me", headers=auth_header(viewer_token))
+        assert response.status_code == 401
+
+    def test_change_password_with_cached_principal(self, client, superadmin_token):
+        client.get("/api/v1/auth/me", headers=auth_header(superadmin_token))
+        response = client.post("/api/v1/auth/change-password",
+            json={"current_password": "TestPass123", "new_password": "NewPass12345"},
+            headers=auth_header(superadmin_token),
+        )
+        assert response.status_code == 200
+
+        login = client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "NewPass12345"})
+        assert login.status_code == 200
+
+    def test_health_exposes_counters(self, client):
+        stats = client.get("/api/health").json()["admin_cache"]
+        assert {"hits", "misses", "size"} <= set(stats)
+
+
+class TestRevokedJtiReplica:
+    @pytest.fixture
+    def synced_replica(self):
+        from app.core.revocation import revoked_jtis
+        revoked_jtis.load({})
+        yield revoked_jtis
+        revoked_jtis.load({})
+        revoked_jtis.mark_unsynced()
+
+    def test_logout_revokes_locally(self, client, superadmin_token, synced_replica):
+        assert client.get("/api/v1/auth/me", headers=auth_header(superadmin_token)).status_code == 200
+        client.post("/api/v1/auth/logout", headers=auth_header(superadmin_token))
+
+        response = client.get("/api/v1/auth/me", headers=auth_header(superadmin_token))
+        assert response.status_code == 401
+        assert synced_replica.stats()["size"] == 1
+
+    def test_entries_expire_with_token(self, synced_replica):
+        import time
+        from app.core.security import is_token_revoked
+
+        synced_replica.add("live", time.time() + 60)
+        synced_replica.add("expired", time.time() - 1)
+        assert is_token_revoked("live")
+        assert not is_token_revoked("expired")
+        assert synced_replica.stats()["size"] == 1
+
+    def test_revocation_messages_update_replica(self, synced_replica):
+        import time
+        from app.core.revocation import _handle_revocation_message
+
+        _handle_revocation_message(f"remote-jti {time.time() + 60}".encode())
+        _handle_revocation_message(b"garbage")
+        assert synced_replica.contains("remote-jti")
+
+    def test_unsynced_replica_is_not_trusted(self, synced_replica):
+        import time
+        from app.core.revocation import is_revoked_locally
+
+        synced_replica.add("jti", time.time() + 60)
+        synced_replica.mark_unsynced()
+        assert is_revoked_locally("jti") is None
+
+
+class TestClaimsFastPath:
+    @pytest.fixture
+    def synced_epochs(self):
+        from app.core.security_epochs import admin_epochs
+        admin_epochs.load({})
+        yield admin_epochs
+        admin_epochs.load({})
+        admin_epochs.mark_unsynced()
+
+    def _login(self, client):
+        response = client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "TestPass123"})
+        assert response.status_code == 200
+        return response.json()["access_token"]
+
+    def test_reads_skip_admin_lookup(self, client, superadmin, synced_epochs):
+        from app.core.principal_cache import principal_cache
+
+        token = self._login(client)
+        before = principal_cache.stats()
+        response = client.get("/api/v1/auth/me", headers=auth_header(token))
+
+        assert response.status_code == 200
+        assert response.json()["username"] == "testadmin"
+        after = principal_cache.stats()
+        assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
+
+    def test_deactivation_bumps_epoch(self, client, db, superadmin, synced_epochs):
+        token = self._login(client)
+        assert client.get("/api/v1/auth/me", headers=auth_header(token)).status_code == 200
+
+        superadmin.is_active = False
+        db.commit()
+        assert synced_epochs.current(superadmin.id) == 1
+        assert client.get("/api/v1/auth/me", headers=auth_header(token)).status_code == 401
+
+    def test_bookkeeping_changes_keep_epoch(self, client, db, superadmin, synced_epochs):
+        self._login(client)
+        self._login(client)  # Updates last_login and nothing security-relevant
+        assert synced_epochs.current(superadmin.id) == 0
+
+    def test_writes_use_full_lookup(self, client, superadmin, synced_epochs):
+        from app.core.principal_cache import principal_cache
+
+        token = self._login(client)
+        before = principal_cache.stats()
+        client.post("/api/v1/auth/logout", headers=auth_header(token))
+        after = principal_cache.stats()
+        assert after["hits"] + after["misses"] == before["hits"] + before["misses"] + 1
+
+    def test_unsynced_epochs_fall_back(self, client, superadmin, synced_epochs):
+        from app.core.principal_cache import principal_cache
+
+        token = self._login(client)
+        synced_epochs.mark_unsynced()
+        before = principal_cache.stats()
+        assert client.get("/api/v1/auth/me", headers=auth_header(token)).status_code == 200
+        after = principal_cache.stats()
+        assert after["hits"] + after["misses"] == before["hits"] + before["misses"] + 1
+
+
+class TestApiKeyCache:
+    def _create_key(self, client, token, scopes="*"):
+        response = client.post("/api/v1/api-keys",
+            json={"name": "Integration", "scopes": scopes},
+            headers=auth_header(token),
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    def test_repeat_calls_hit_cache(self, client, superadmin_token):
+        from app.core.api_key_cache import api_key_cache
+
+        key = self._create_key(client, superadmin_token)
+        headers = {"X-API-Key": key["plain_key"]}
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        before = api_key_cache.stats()
+        response = client.get("/api/v1/auth/me", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["username"] == "testadmin"
+        assert api_key_cache.stats()["hits"] == before["hits"] + 1
+
+    def test_revoke_invalidates_immediately(self, client, superadmin_token):
+        key = self._create_key(client, superadmin_token)
+        headers = {"X-API-Key": key["plain_key"]}
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+        client.delete(f"/api/v1/api-keys/{key['id']}", headers=auth_header(superadmin_token))
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+    def test_usage_is_written_behind(self, client, superadmin_token):
+        from app.core.api_key_usage import flush_usage
+        from tests.conftest import TestSession
+
+        key = self._create_key(client, superadmin_token)
+        for _ in range(3):
+            client.get("/api/v1/auth/me", headers={"X-API-Key": key["plain_key"]})
+
+        keys = client.get("/api/v1/api-keys", headers=auth_header(superadmin_token)).json()
+        assert keys[0]["last_used_at"] is None
+        assert keys[0]["request_count"] == 0
+
+        assert flush_usage(TestSession) == 1
+        keys = client.get("/api/v1/api-keys", headers=auth_header(superadmin_token)).json()
+        assert keys[0]["last_used_at"] is not None
+        assert keys[0]["request_count"] == 3
+
+        # Counters accumulate across flushes
+        client.get("/api/v1/auth/me", headers={"X-API-Key": key["plain_key"]})
+        flush_usage(TestSession)
+        keys = client.get("/api/v1/api-keys", headers=auth_header(superadmin_token)).json()
+        assert keys[0]["request_count"] == 4
+
+    def test_scopes_pre_parsed(self, superadmin):
+        from app.core.api_key_cache import VerifiedApiKey
+        from app.models.api_key import ApiKey
+
+        row = ApiKey(id=1, name="k", key_hash="h", owner_id=superadmin.id, owner=superadmin,
+                     scopes="users:read, roles:*")
+        verified = VerifiedApiKey(row)
+        assert verified.scopes == frozenset({"users:read", "roles:*"})
+        assert verified.has_scope("users:read")
+        assert verified.has_scope("roles:write")
+        assert not verified.has_scope("users:write")
+
+
+class TestAuditSink:
+    def _audit_actions(self, client, token):
+        logs = client.get("/api/v1/audit", headers=auth_header(token)).json()["logs"]
+        return [log["action"] for log in logs]
+
+    def test_failed_login_is_buffered(self, client, superadmin_token):
+        from app.core.audit_sink import audit_buffer, flush_audit
+        from tests.conftest import TestSession
+
+        client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "wrong"})
+        client.post("/api/v1/auth/login", json={"username": "nobody", "password": "wrong"})
+        assert "LOGIN_FAILED" not in self._audit_actions(client, superadmin_token)
+        assert audit_buffer.stats()["queue_depth"] == 2
+
+        assert flush_audit(TestSession) == 2
+        assert self._audit_actions(client, superadmin_token).count("LOGIN_FAILED") == 2
+        stats = audit_buffer.stats()
+        assert stats["queue_depth"] == 0
+        assert stats["last_flush_ms"] is not None
+
+    def test_login_audit_is_transactional(self, client, superadmin_token):
+        # Written in the same commit as last_login, visible without a flush
+        assert "LOGIN_SUCCESS" in self._audit_actions(client, superadmin_token)
+
+    def test_failed_flush_keeps_rows(self):
+        from app.core.audit_sink import audit_buffer, enqueue_audit, flush_audit
+
+        def broken_session():
+            raise RuntimeError("database unavailable")
+
+        enqueue_audit("LOGOUT", "ADMIN", description="first")
+        enqueue_audit("LOGOUT", "ADMIN", description="second")
+        with pytest.raises(RuntimeError):
+            flush_audit(broken_session)
+        assert [row["description"] for row in audit_buffer.drain()] == ["first", "second"]
+        assert audit_buffer.stats()["failed_flushes"] >= 1
+
+    def test_full_local_queue_writes_directly(self, client, superadmin_token, monkeypatch):
+        from app.config import settings
+        from app.core.audit_sink import audit_buffer, enqueue_audit
+        from tests.conftest import TestSession
+
+        monkeypatch.setattr(settings, "AUDIT_MAX_PENDING", 2)
+        for description in ("first", "second", "third"):
+            enqueue_audit("LOGOUT", "ADMIN", description=description, session_factory=TestSession)
+
+        # Nothing is dropped: the row that did not fit went straight to the database
+        assert audit_buffer.stats()["direct_writes"] == 1
+        assert [row["description"] for row in audit_buffer.drain()] == ["first", "second"]
+        assert "LOGOUT" in self._audit_actions(client, superadmin_token)
+
+    def test_rows_queue_in_redis_until_committed(self, client, superadmin_token, monkeypatch):
+        from app.core import audit_sink
+        from app.core.audit_sink import AUDIT_QUEUE_KEY, enqueue_audit, flush_audit
+        from tests.conftest import TestSession
+
+        redis = FakeRedis()
+        monkeypatch.setattr(audit_sink, "get_redis", lambda: redis)
+
+        def broken_session():
+            raise RuntimeError("database unavailable")
+
+        enqueue_audit("LOGOUT", "ADMIN", description="durable")
+        with pytest.raises(RuntimeError):
+            flush_audit(broken_session, redis_factory=lambda: redis)
+        assert len(redis.lists[AUDIT_QUEUE_KEY]) == 1
+        assert redis.strings == {}  # Flush lock released
+
+        assert flush_audit(TestSession, redis_factory=lambda: redis) == 1
+        assert redis.lists[AUDIT_QUEUE_KEY] == []
+        assert "LOGOUT" in self._audit_actions(client, superadmin_token)
+
+
+class FakeRedis:
+    """The Redis commands the audit sink uses, in memory."""
+
+    def __init__(self):
+        self.lists = {}
+        self.strings = {}
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value.encode())
+        return len(self.lists[key])
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start:end + 1]
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    def expire(self, key, seconds):
+        return key in self.strings
+
+    def eval(self, script, numkeys, key, token):
+        # The sink's only script: release the flush lock if it still holds `token`
+        if self.strings.get(key) == token:
+            del self.strings[key]
+            return 1
+        return 0
+
+
+class TestPasswordHashing:
+    def test_login_upgrades_outdated_hash(self, client, db):
+        from passlib.context import CryptContext
+        from app.core.security import password_needs_update
+        from app.models.admin import AdminAccount, AccessLevel
+
+        weak = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("LegacyPass123")
+        admin = AdminAccount(username="legacy", password_hash=weak, access_level=AccessLevel.VIEWER)
+        db.add(admin)
+        db.commit()
+        assert password_needs_update(weak)
+
+        response = client.post("/api/v1/auth/login", json={"username": "legacy", "password": "LegacyPass123"})
+        assert response.status_code == 200
+
+        db.refresh(admin)
+        assert admin.password_hash != weak
+        assert not password_needs_update(admin.password_hash)
+        # The upgraded hash still verifies
+        assert client.post("/api/v1/auth/login", json={"username": "legacy", "password": "LegacyPass123"}).status_code == 200
+
+    def test_saturated_executor_returns_503(self, client, superadmin, monkeypatch):
+        import threading
+        from app.core.security import password_hasher
+
+        monkeypatch.setattr(password_hasher, "_slots", threading.BoundedSemaphore(1))
+        password_hasher._slots.acquire()
+
+        response = client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "TestPass123"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert password_hasher.stats()["rejected"] >= 1
+
+
+class TestAsymmetricSigning:
+    @pytest.fixture
+    def rs256(self, monkeypatch):
+        from app.config import settings
+        from app.core.jwt_keys import keyring
+        from tests.conftest import TestSession
+
+        monkeypatch.setattr(settings, "JWT_ALGORITHM", "RS256")
+        monkeypatch.setattr(keyring, "session_factory", TestSession)
+        keyring.reset()
+        yield keyring
+        keyring.reset()
+
+    def _login(self, client):
+        response = client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "TestPass123"})
+        assert response.status_code == 200
+        return response.json()["access_token"]
+
+    def test_tokens_verify_offline_against_jwks(self, client, superadmin, rs256):
+        from jose import jwt
+
+        token = self._login(client)
+        header = jwt.get_unverified_header(token)
+        assert header["alg"] == "RS256"
+
+        jwks = client.get("/.well-known/jwks.json").json()
+        jwk = next(k for k in jwks["keys"] if k["kid"] == header["kid"])
+        assert "d" not in jwk  # Public half only
+        claims = jwt.decode(token, jwk, algorithms=["RS256"])
+        assert claims["username"] == "testadmin"
+
+        assert client.get("/api/v1/auth/me", headers=auth_header(token)).status_code == 200
+
+    def test_rotation_publishes_before_signing(self, client, db, superadmin, rs256):
+        from datetime import timedelta
+        from jose import jwt
+        from app.core.jwt_keys import rotate_signing_keys
+
+        old_token = self._login(client)
+        old_kid = jwt.get_unverified_header(old_token)["kid"]
+
+        staged = rotate_signing_keys(db, lead=timedelta(hours=1))
+        rs256.reset()
+        kids = {k["kid"] for k in client.get("/.well-known/jwks.json").json()["keys"]}
+        assert kids == {old_kid, staged.kid}
+        # Still signing with the old key until the new one activates
+        assert jwt.get_unverified_header(self._login(client))["kid"] == old_kid
+
+        active = rotate_signing_keys(db, lead=timedelta(0))
+        rs256.reset()
+        assert jwt.get_unverified_header(self._login(client))["kid"] == active.kid
+        # Tokens signed by retired keys keep verifying until they expire
+        assert client.get("/api/v1/auth/me", headers=auth_header(old_token)).status_code == 200
+
+    def test_unknown_kid_rejected(self, client, superadmin, rs256):
+        from app.core.jwt_keys import generate_signing_key
+        from jose import jwt
+
+        rogue = generate_signing_key()
+        token = jwt.encode({"sub": str(superadmin.id), "type": "access"}, rogue.private_key_pem,
+                           algorithm="RS256", headers={"kid": rogue.kid})
+        assert client.get("/api/v1/auth/me", headers=auth_header(token)).status_code == 401
+
+    def test_fresh_key_set_verifies_without_reload(self, client, superadmin, rs256, monkeypatch):
+        token = self._login(client)
+
+        def no_reload():
+            raise AssertionError("key set reloaded on the request path")
+
+        monkeypatch.setattr(rs256, "_load", no_reload)
+        assert client.get("/api/v1/auth/me", headers=auth_header(token)).status_code == 200
+
+    def test_legacy_hs256_tokens_need_a_cutoff(self, client, superadmin, rs256, monkeypatch):
+        from datetime import datetime, timedelta
+        from jose import jwt
+        from app.config import settings
+
+        legacy = jwt.encode({"sub": str(superadmin.id), "type": "access", "jti": "legacy"},
+                            settings.JWT_SECRET_KEY, algorithm="HS256")
+        assert client.get("/api/v1/auth/me", headers=auth_header(legacy)).status_code == 401
+
+        monkeypatch.setattr(settings, "JWT_ACCEPT_LEGACY_HS256_UNTIL", datetime.utcnow() + timedelta(hours=1))
+        assert client.get("/api/v1/auth/me", headers=auth_header(legacy)).status_code == 200
+
+        monkeypatch.setattr(settings, "JWT_ACCEPT_LEGACY_HS256_UNTIL", datetime.utcnow() - timedelta(seconds=1))
+        assert client.get("/api/v1/auth/me", headers=auth_header(legacy)).status_code == 401
+
+    def test_private_keys_encrypted_at_rest(self, client, db, superadmin, rs256, monkeypatch):
+        from app.config import settings
+        from app.models.signing_key import SigningKey
+
+        monkeypatch.setattr(settings, "JWT_KEY_ENCRYPTION_PASSPHRASE", "test-passphrase")
+        token = self._login(client)
+        stored = db.query(SigningKey).one()
+        assert "ENCRYPTED PRIVATE KEY" in stored.private_key_pem
+        assert client.get("/api/v1/auth/me", headers=auth_header(token)).status_code == 200
+
+    def test_login_signs_off_the_event_loop(self, client, superadmin, rs256, monkeypatch):
+        import asyncio
+
+        load = rs256._load
+
+        def load_off_loop():
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            load()
+
+        monkeypatch.setattr(rs256, "_load", load_off_loop)
+        self._login(client)
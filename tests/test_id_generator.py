@@ -1,14 +1,20 @@
 """Tests for ULID generation and display ID derivation."""
 
+import threading
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
+from ulid import ULID
 
 from app.core.id_generator import (
     generate_ulid,
+    generate_batch_ulids,
     validate_ulid,
     ulid_to_display_id,
     display_id_to_ulid_suffix,
     is_display_id_format,
+    is_ulid_collision,
     CROCKFORD_BASE32,
 )
 
@@ -40,25 +46,65 @@ class TestGenerateUlid:
             assert ulid_value not in ulids, f"Collision: {ulid_value}"
             ulids.add(ulid_value)
 
-    def test_checks_db_uniqueness(self):
-        mock_db = MagicMock()
-        # First call returns existing (collision), second returns None (unique)
-        mock_db.query.return_value.filter.return_value.first.side_effect = [
-            MagicMock(),  # Exists
-            None,         # Unique
-        ]
-
-        ulid_value = generate_ulid(mock_db)
-        assert len(ulid_value) == 26
-        assert mock_db.query.return_value.filter.return_value.first.call_count == 2
-
-    def test_raises_after_max_attempts(self):
+    def test_does_not_query_db(self):
         mock_db = MagicMock()
-        # Always return existing
-        mock_db.query.return_value.filter.return_value.first.return_value = MagicMock()
 
-        with pytest.raises(RuntimeError, match="Failed to generate unique ULID"):
-            generate_ulid(mock_db)
+        generate_ulid(mock_db)
+        generate_batch_ulids(50)
+        mock_db.query.assert_not_called()
+
+    def test_monotonic_within_burst(self):
+        ulids = [generate_ulid() for _ in range(1000)]
+        assert ulids == sorted(ulids)
+        assert len(set(ulids)) == 1000
+
+    def test_batch_is_increasing_and_unique(self):
+        ulids = generate_batch_ulids(500)
+        assert len(ulids) == 500
+        assert ulids == sorted(ulids)
+        assert all(validate_ulid(u) for u in ulids)
+
+    def test_thread_safe(self):
+        results = []
+
+        def worker():
+            results.extend(generate_batch_ulids(200))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(results)) == 1600
+
+    def test_encodes_current_timestamp(self):
+        before = int(time.time() * 1000)
+        ulid_value = generate_ulid()
+        after = int(time.time() * 1000)
+        assert before <= ULID.from_str(ulid_value).milliseconds <= after + 1
+
+
+class TestIsUlidCollision:
+    """Tests for telling ULID collisions apart from other integrity errors."""
+
+    def _error(self, orig):
+        from sqlalchemy.exc import IntegrityError
+        return IntegrityError("INSERT INTO users ...", {}, orig)
+
+    def test_sqlite_messages(self):
+        assert is_ulid_collision(self._error(Exception("UNIQUE constraint failed: users.ulid")))
+        assert not is_ulid_collision(self._error(Exception("UNIQUE constraint failed: users.email")))
+        assert not is_ulid_collision(self._error(Exception("FOREIGN KEY constraint failed")))
+
+    def test_postgres_constraint_names(self):
+        orig = MagicMock(pgcode="23505")
+        orig.diag.constraint_name = "users_ulid_key"
+        assert is_ulid_collision(self._error(orig))
+
+        # A foreign key violation naming a ulid column is not a collision
+        orig = MagicMock(pgcode="23503")
+        orig.diag.constraint_name = "conversion_history_user_ulid_fkey"
+        assert not is_ulid_collision(self._error(orig))
 
 
 class TestValidateUlid:
@@ -0,0 +1,160 @@
+"""Tests for the request-id and idempotency middleware."""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from app.config import settings
+from app.core.idempotency import (
+    KEY_PREFIX, IdempotencyStore, InProgress, StoredResponse, idempotency_store, _COMPLETE_LUA,
+)
+
+
+class FakeAsyncRedis:
+    """The few asyncio Redis commands the idempotency store uses, in memory."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, marker, *args):
+        # The store's scripts: replace (complete) or delete (release) the key if it still holds `marker`
+        if self.data.get(key) != marker:
+            return 0
+        if script == _COMPLETE_LUA:
+            self.data[key] = args[0]
+        else:
+            del self.data[key]
+        return 1
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeAsyncRedis()
+    monkeypatch.setattr(idempotency_store, "redis_factory", lambda: fake)
+    return fake
+
+
+def _login_key(idem_key):
+    digest = hashlib.sha256(f"POST:/api/v1/auth/login:{idem_key}".encode()).hexdigest()
+    return f"{KEY_PREFIX}:{digest}"
+
+
+class TestRequestIdMiddleware:
+    def test_generates_request_id(self, client):
+        response = client.get("/api/health")
+        assert len(response.headers["X-Request-Id"]) == 36
+
+    def test_echoes_client_request_id(self, client):
+        response = client.get("/api/health", headers={"X-Request-Id": "trace-123"})
+        assert response.headers["X-Request-Id"] == "trace-123"
+
+
+class TestIdempotencyMiddleware:
+    LOGIN = {"username": "testadmin", "password": "TestPass123"}
+
+    def test_replays_stored_response(self, client, superadmin, fake_redis):
+        headers = {"Idempotency-Key": "login-1"}
+        first = client.post("/api/v1/auth/login", json=self.LOGIN, headers=headers)
+        second = client.post("/api/v1/auth/login", json=self.LOGIN, headers=headers)
+
+        assert second.headers["X-Idempotent-Replay"] == "true"
+        assert len(second.headers["X-Request-Id"]) == 36
+        assert second.json() == first.json()
+        assert second.headers["content-type"] == "application/json"
+        assert fake_redis.data[_login_key("login-1")].startswith(b"done:")
+
+    def test_failed_request_releases_key(self, client, superadmin, fake_redis):
+        headers = {"Idempotency-Key": "login-2"}
+        bad = client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "wrong"}, headers=headers)
+        assert bad.status_code == 401
+        assert fake_redis.data == {}
+
+        retry = client.post("/api/v1/auth/login", json=self.LOGIN, headers=headers)
+        assert retry.status_code == 200
+        assert "X-Idempotent-Replay" not in retry.headers
+
+    def test_in_flight_duplicate_gets_conflict(self, client, superadmin, fake_redis, monkeypatch):
+        monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.1)
+        fake_redis.data[_login_key("login-3")] = b"pending:other-worker"
+
+        response = client.post("/api/v1/auth/login", json=self.LOGIN, headers={"Idempotency-Key": "login-3"})
+        assert response.status_code == 409
+
+    def test_oversized_response_not_stored(self, client, superadmin, fake_redis, monkeypatch):
+        monkeypatch.setattr(settings, "IDEMPOTENCY_MAX_BODY_BYTES", 16)
+        response = client.post("/api/v1/auth/login", json=self.LOGIN, headers={"Idempotency-Key": "login-4"})
+        assert response.status_code == 200
+        assert fake_redis.data == {}
+
+    def test_duplicate_waits_for_first_result(self):
+        fake = FakeAsyncRedis()
+        store = IdempotencyStore(redis_factory=lambda: fake, poll_seconds=0.01)
+
+        async def scenario():
+            marker, _ = await store.claim("k")
+            waiter = asyncio.create_task(store.claim("k"))
+            await asyncio.sleep(0.05)
+            assert not waiter.done()
+            await store.complete("k", marker, StoredResponse(201, "application/json", b'{"id": 1}'))
+            return marker, await waiter
+
+        marker, (second_marker, stored) = asyncio.run(scenario())
+        assert marker is not None and second_marker is None
+        assert stored == StoredResponse(201, "application/json", b'{"id": 1}')
+
+    def test_wait_gives_up(self, monkeypatch):
+        monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+        fake = FakeAsyncRedis()
+        store = IdempotencyStore(redis_factory=lambda: fake, poll_seconds=0.01)
+
+        async def scenario():
+            await store.claim("k")
+            await store.claim("k")
+
+        with pytest.raises(InProgress):
+            asyncio.run(scenario())
+
+    def test_complete_leaves_a_reclaimed_key_alone(self):
+        fake = FakeAsyncRedis()
+        store = IdempotencyStore(redis_factory=lambda: fake, poll_seconds=0.01)
+
+        async def scenario():
+            stale, _ = await store.claim("k")
+            del fake.data["k"]  # Our marker expired...
+            current, _ = await store.claim("k")  # ...and another request claimed the key
+            return stale, current, await store.complete("k", stale, StoredResponse(200, None, b"late"))
+
+        stale, current, stored = asyncio.run(scenario())
+        assert stored is False
+        assert fake.data["k"] == current != stale
+
+    def test_reclaim_is_bounded(self):
+        class VanishingRedis(FakeAsyncRedis):
+            async def get(self, key):
+                return None  # The key always disappears between SET NX and GET
+
+            async def set(self, key, value, nx=False, ex=None):
+                return None
+
+        store = IdempotencyStore(redis_factory=VanishingRedis, poll_seconds=0.001)
+        with pytest.raises(InProgress):
+            asyncio.run(store.claim("k"))
+
+    def test_passes_through_without_redis(self, client, superadmin):
+        headers = {"Idempotency-Key": "login-1"}
+        body = {"username": "testadmin", "password": "TestPass123"}
+        first = client.post("/api/v1/auth/login", json=body, headers=headers)
+        second = client.post("/api/v1/auth/login", json=body, headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert "X-Idempotent-Replay" not in second.headers
@@ -0,0 +1,87 @@
+"""Tests for the sliding-window rate limiter (Redis unavailable: per-worker fallback)."""
+
+import pytest
+
+from app.config import settings
+from app.core.rate_limiter import client_address, limiter, parse_rate, Rate
+from tests.conftest import auth_header
+
+
+@pytest.fixture
+def rate_limited():
+    limiter.enabled = True
+    limiter.reset()
+    yield limiter
+    limiter.reset()
+
+
+class TestRateLimiter:
+    def test_login_limited_per_ip(self, client, superadmin, rate_limited):
+        statuses = [
+            client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "wrong"}).status_code
+            for _ in range(6)
+        ]
+        assert statuses == [401] * 5 + [429]
+
+        response = client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "TestPass123"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+
+    def test_rejected_requests_carry_request_id(self, client, superadmin, rate_limited):
+        for _ in range(5):
+            client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "wrong"})
+        response = client.post("/api/v1/auth/login", json={"username": "testadmin", "password": "wrong"},
+                               headers={"X-Request-Id": "trace-429"})
+        assert response.status_code == 429
+        assert response.headers["X-Request-Id"] == "trace-429"
+
+    def test_headers_on_authenticated_requests(self, client, superadmin_token, rate_limited):
+        first = client.get("/api/v1/auth/me", headers=auth_header(superadmin_token))
+        second = client.get("/api/v1/auth/me", headers=auth_header(superadmin_token))
+
+        assert first.headers["X-RateLimit-Limit"] == str(parse_rate(settings.RATE_LIMIT_DEFAULT).limit)
+        assert int(second.headers["X-RateLimit-Remaining"]) == int(first.headers["X-RateLimit-Remaining"]) - 1
+
+    def test_per_key_quota(self, client, superadmin_token, rate_limited):
+        key = client.post("/api/v1/api-keys", json={"name": "Batch"}, headers=auth_header(superadmin_token)).json()
+        response = client.put(
+            f"/api/v1/api-keys/{key['id']}/rate-limit",
+            json={"rate_limit": "2/minute"},
+            headers=auth_header(superadmin_token),
+        )
+        assert response.status_code == 200
+        assert response.json()["rate_limit"] == "2/minute"
+
+        headers = {"X-API-Key": key["plain_key"]}
+        # The first call verifies the key (charged to the IP); later calls use the key's own quota
+        statuses = [client.get("/api/v1/auth/me", headers=headers).status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+
+    def test_invalid_quota_rejected(self, client, superadmin_token):
+        key = client.post("/api/v1/api-keys", json={"name": "Batch"}, headers=auth_header(superadmin_token)).json()
+        response = client.put(
+            f"/api/v1/api-keys/{key['id']}/rate-limit",
+            json={"rate_limit": "lots"},
+            headers=auth_header(superadmin_token),
+        )
+        assert response.status_code == 422
+
+    def test_forwarded_for_only_from_trusted_proxy(self):
+        proxied = {"client": ("127.0.0.1", 5000), "headers": [(b"x-forwarded-for", b"203.0.113.9, 127.0.0.1")]}
+        direct = {"client": ("198.51.100.7", 5000), "headers": [(b"x-forwarded-for", b"203.0.113.9")]}
+        assert client_address(proxied) == "203.0.113.9"
+        assert client_address(direct) == "198.51.100.7"
+
+    def test_forwarded_for_from_trusted_proxy_cidr(self, monkeypatch):
+        monkeypatch.setattr(settings, "TRUSTED_PROXIES", "127.0.0.1,172.28.0.0/16")
+        via_nginx = {"client": ("172.28.0.5", 5000), "headers": [(b"x-forwarded-for", b"203.0.113.9")]}
+        outside = {"client": ("172.29.0.5", 5000), "headers": [(b"x-forwarded-for", b"203.0.113.9")]}
+        assert client_address(via_nginx) == "203.0.113.9"
+        assert client_address(outside) == "172.29.0.5"
+
+    def test_parse_rate(self):
+        assert parse_rate("100/minute") == Rate(100, 60)
+        assert parse_rate("5/seconds") == Rate(5, 1)
+        with pytest.raises(ValueError):
+            parse_rate("0/minute")
@@ -0,0 +1,29 @@
+"""Tests for the shared Redis clients."""
+
+import asyncio
+
+from app.core.redis_client import get_redis, get_async_redis, close_redis
+
+
+class TestSharedClients:
+    def test_sync_client_is_shared(self):
+        assert get_redis() is get_redis()
+
+    def test_close_resets_client(self):
+        first = get_redis()
+        close_redis()
+        assert get_redis() is not first
+
+    def test_timeouts_applied(self):
+        kwargs = get_redis().connection_pool.connection_kwargs
+        assert kwargs["socket_connect_timeout"] is not None
+        assert kwargs["socket_timeout"] is not None
+
+    def test_async_client_per_event_loop(self):
+        async def fetch_twice():
+            return get_async_redis(), get_async_redis()
+
+        a1, a2 = asyncio.run(fetch_twice())
+        b1, _ = asyncio.run(fetch_twice())
+        assert a1 is a2
+        assert b1 is not a1
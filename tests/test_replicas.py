@@ -0,0 +1,131 @@
+"""Tests for read-replica routing (a second SQLite file stands in for the replica)."""
+
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base, get_db, async_database_url
+from app.main import app
+from app.models.role import Role
+from app.core.replicas import ReplicaSet, RoutingSession, current_admin_id, recent_writers, served_by_replica
+from tests.conftest import auth_header, engine as primary_engine, override_get_db
+
+
+def _sqlite_replica(replicas: ReplicaSet, path: str):
+    url = f"sqlite:///{path}"
+    return replicas.add(
+        url,
+        create_engine(url, connect_args={"check_same_thread": False}),
+        create_async_engine(async_database_url(url), poolclass=NullPool),
+    )
+
+
+@pytest.fixture
+def replicas():
+    replicas = ReplicaSet()
+    replica = _sqlite_replica(replicas, os.path.join(tempfile.mkdtemp(), "replica.db"))
+    Base.metadata.create_all(bind=replica.engine)
+    with replica.engine.begin() as conn:
+        conn.execute(insert(Role), [{"name": "Replica Only Role"}])
+
+    def routed_db():
+        db = RoutingSession(bind=primary_engine, autoflush=False, replicas=replicas)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = routed_db
+    yield replicas
+    app.dependency_overrides[get_db] = override_get_db
+    replica.engine.dispose()
+
+
+def _role_names(client, token):
+    response = client.get("/api/v1/roles", headers=auth_header(token))
+    assert response.status_code == 200
+    return {role["name"] for role in response.json()["roles"]}
+
+
+class TestReadReplicas:
+    def test_reads_go_to_replica(self, client, superadmin_token, replicas):
+        assert _role_names(client, superadmin_token) == {"Replica Only Role"}
+
+    def test_writes_go_to_primary_and_writer_reads_own_writes(self, client, superadmin_token, viewer_token, replicas):
+        response = client.post("/api/v1/roles", json={"name": "Primary Role"}, headers=auth_header(superadmin_token))
+        assert response.status_code == 201
+
+        # The writer is pinned to the primary; other admins keep reading from the replica
+        assert _role_names(client, superadmin_token) == {"Primary Role"}
+        assert _role_names(client, viewer_token) == {"Replica Only Role"}
+
+        recent_writers.clear()
+        assert _role_names(client, superadmin_token) == {"Replica Only Role"}
+
+    def test_ejected_replica_falls_back_to_primary(self, client, superadmin_token, replicas):
+        replicas.eject(replicas.replicas[0], "test")
+        assert _role_names(client, superadmin_token) == set()
+
+        replicas.readmit(replicas.replicas[0])
+        assert _role_names(client, superadmin_token) == {"Replica Only Role"}
+
+    def test_round_robin_and_health_check(self):
+        replicas = ReplicaSet()
+        first = _sqlite_replica(replicas, os.path.join(tempfile.mkdtemp(), "first.db"))
+        second = _sqlite_replica(replicas, os.path.join(tempfile.mkdtemp(), "missing", "second.db"))
+        assert {replicas.choose(), replicas.choose()} == {first, second}
+
+        replicas.check()  # second's directory does not exist, so it cannot connect
+        assert replicas.stats()["replicas"][1]["healthy"] is False
+        assert {replicas.choose(), replicas.choose()} == {first}
+
+    def test_dml_and_written_sessions_use_primary(self, replicas):
+        db = RoutingSession(bind=primary_engine, replicas=replicas)
+        db.info["read_only"] = True
+        replica_engine = replicas.replicas[0].engine
+
+        assert not served_by_replica(db)
+        assert db.get_bind(clause=select(Role)) is replica_engine
+        assert served_by_replica(db)
+        assert db.get_bind(clause=insert(Role)) is primary_engine
+        db.info["wrote"] = True
+        assert db.get_bind(clause=select(Role)) is primary_engine
+        db.close()
+
+        unmarked = RoutingSession(bind=primary_engine, replicas=replicas)
+        assert unmarked.get_bind(clause=select(Role)) is primary_engine
+        assert not served_by_replica(unmarked)
+        unmarked.close()
+
+    def test_core_dml_commit_pins_writer(self, replicas):
+        token = current_admin_id.set(42)
+        try:
+            db = RoutingSession(bind=primary_engine, replicas=replicas)
+            db.execute(insert(Role), [{"name": "Core Insert Role"}])
+            db.commit()
+            db.close()
+            assert recent_writers.pinned(42)
+        finally:
+            current_admin_id.reset(token)
+
+    def test_bulk_endpoints_pin_writer(self, client, superadmin, superadmin_token, replicas):
+        role = client.post("/api/v1/roles", json={"name": "Bulk Role"}, headers=auth_header(superadmin_token)).json()
+
+        recent_writers.clear()
+        response = client.post("/api/v1/users/bulk", json={"users": [
+            {"name": "Bulk One", "email": "bulk-one@test.com", "category": "EMPLOYEE"},
+        ]}, headers=auth_header(superadmin_token))
+        assert response.status_code == 201
+        assert recent_writers.pinned(superadmin.id)
+        ulid = response.json()["created"][0]["ulid"]
+
+        recent_writers.clear()
+        response = client.post(f"/api/v1/roles/{role['id']}/assignments/bulk",
+                               json={"user_ids": [ulid]}, headers=auth_header(superadmin_token))
+        assert response.status_code == 200
+        assert response.json()["changed"] == 1
+        assert recent_writers.pinned(superadmin.id)
@@ -153,3 +153,109 @@ class TestRoleListing:
         response = client.get("/api/roles", headers=auth_header(viewer_token))
         assert response.status_code == 200
         assert response.json()["total"] >= 1
+
+
+class TestRoleConditionalGet:
+    def test_get_role_etag_follows_version(self, client, superadmin_token):
+        role_id = client.post("/api/v1/roles", json={"name": "Versioned"}, headers=auth_header(superadmin_token)).json()["id"]
+        res = client.get(f"/api/v1/roles/{role_id}", headers=auth_header(superadmin_token))
+        etag = res.headers["ETag"]
+        assert etag.startswith('"v1-')
+
+        conditional = {**auth_header(superadmin_token), "If-None-Match": etag}
+        assert client.get(f"/api/v1/roles/{role_id}", headers=conditional).status_code == 304
+
+        client.put(f"/api/v1/roles/{role_id}", json={"description": "Changed"}, headers=auth_header(superadmin_token))
+        res = client.get(f"/api/v1/roles/{role_id}", headers=conditional)
+        assert res.status_code == 200
+        assert res.headers["ETag"].startswith('"v2-')
+
+    def test_list_etag_changes_with_assignments(self, client, superadmin_token):
+        role_id = client.post("/api/v1/roles", json={"name": "Listed"}, headers=auth_header(superadmin_token)).json()["id"]
+        etag = client.get("/api/v1/roles", headers=auth_header(superadmin_token)).headers["ETag"]
+        conditional = {**auth_header(superadmin_token), "If-None-Match": etag}
+        assert client.get("/api/v1/roles", headers=conditional).status_code == 304
+
+        ulid = client.post("/api/v1/users", json={
+            "name": "Role Holder", "email": "holder@test.com", "category": "EMPLOYEE",
+        }, headers=auth_header(superadmin_token)).json()["ulid"]
+        client.post(f"/api/v1/users/{ulid}/roles?role_id={role_id}", headers=auth_header(superadmin_token))
+
+        res = client.get("/api/v1/roles", headers=conditional)
+        assert res.status_code == 200
+        assert res.json()["roles"][0]["assigned_users_count"] == 1
+
+
+class TestBulkRoleAssignment:
+    def _setup(self, client, token):
+        role_id = client.post("/api/v1/roles",
+            json={"name": "Rollout Role", "clearance_level": 2},
+            headers=auth_header(token),
+        ).json()["id"]
+        ulids = []
+        for i in range(3):
+            res = client.post("/api/v1/users", json={
+                "name": f"Bulk Role User {i}",
+                "email": f"bulkrole{i}@test.com",
+                "category": "INTERN" if i == 0 else "EMPLOYEE",
+                "end_date": "2099-01-01",
+            }, headers=auth_header(token))
+            ulids.append(res.json()["ulid"])
+        return role_id, ulids
+
+    def _role_names(self, client, token, ulid):
+        user = client.get(f"/api/v1/users/{ulid}", headers=auth_header(token)).json()
+        return user["roles"]
+
+    def test_assign_by_ids_skips_existing(self, client, superadmin_token):
+        role_id, ulids = self._setup(client, superadmin_token)
+        client.post(f"/api/v1/users/{ulids[0]}/roles?role_id={role_id}", headers=auth_header(superadmin_token))
+
+        response = client.post(f"/api/v1/roles/{role_id}/assignments/bulk",
+            json={"user_ids": ulids + ["01ARZ3NDEKTSV4RRFFQ69G5FAV"]},
+            headers=auth_header(superadmin_token),
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["matched"] == 3
+        assert data["changed"] == 2
+        assert data["skipped"] == 1
+        assert data["not_found"] == ["01ARZ3NDEKTSV4RRFFQ69G5FAV"]
+        for ulid in ulids:
+            assert self._role_names(client, superadmin_token, ulid) == ["Rollout Role"]
+
+    def test_assign_by_filters_then_remove_and_reassign(self, client, superadmin_token):
+        role_id, ulids = self._setup(client, superadmin_token)
+        url = f"/api/v1/roles/{role_id}/assignments/bulk"
+
+        response = client.post(url, json={"filters": {"category": "EMPLOYEE"}}, headers=auth_header(superadmin_token))
+        assert response.json()["changed"] == 2
+        assert self._role_names(client, superadmin_token, ulids[0]) == []
+
+        response = client.post(url, json={"action": "remove", "filters": {"role": "Rollout"}},
+            headers=auth_header(superadmin_token))
+        assert response.json()["changed"] == 2
+        assert self._role_names(client, superadmin_token, ulids[1]) == []
+
+        # Removed assignments are reactivated, not duplicated
+        response = client.post(url, json={"user_ids": ulids[1:]}, headers=auth_header(superadmin_token))
+        assert response.json()["changed"] == 2
+        assert self._role_names(client, superadmin_token, ulids[1]) == ["Rollout Role"]
+
+        audit = client.get("/api/v1/audit?action=ROLE_REMOVED", headers=auth_header(superadmin_token))
+        assert audit.json()["total"] == 2
+
+    def test_requires_exactly_one_target(self, client, superadmin_token):
+        role_id, ulids = self._setup(client, superadmin_token)
+        response = client.post(f"/api/v1/roles/{role_id}/assignments/bulk",
+            json={"user_ids": ulids, "filters": {"category": "INTERN"}},
+            headers=auth_header(superadmin_token),
+        )
+        assert response.status_code == 422
+
+    def test_viewer_cannot_bulk_assign(self, client, superadmin_token, viewer_token):
+        role_id, ulids = self._setup(client, superadmin_token)
+        response = client.post(f"/api/v1/roles/{role_id}/assignments/bulk",
+            json={"user_ids": ulids}, headers=auth_header(viewer_token),
+        )
+        assert response.status_code == 403
@@ -76,6 +76,54 @@ class TestCreateUser:
         assert res.status_code == 409
 
 
+class TestBulkCreateUsers:
+    """Test POST /users/bulk."""
+
+    def test_bulk_create_with_per_item_errors(self, client, superadmin_token):
+        role = client.post("/api/v1/roles", json={"name": "Cohort Role", "clearance_level": 1},
+                           headers=auth_header(superadmin_token)).json()
+        client.post("/api/v1/users", json={
+            "name": "Existing User",
+            "email": "existing@prismid.com",
+            "category": "EMPLOYEE",
+        }, headers=auth_header(superadmin_token))
+
+        res = client.post("/api/v1/users/bulk", json={"users": [
+            {"name": "Cohort One", "email": "one@prismid.com", "category": "INTERN",
+             "start_date": "2025-01-01", "end_date": "2025-06-30", "role_ids": [role["id"], 9999]},
+            {"name": "Cohort Two", "email": "two@prismid.com", "category": "EMPLOYEE"},
+            {"name": "Taken Email", "email": "existing@prismid.com", "category": "EMPLOYEE"},
+            {"name": "Repeat Email", "email": "two@prismid.com", "category": "EMPLOYEE"},
+            {"name": "No End Date", "email": "noend@prismid.com", "category": "INTERN"},
+            {"name": "No Domain", "email": "nodomain@prismid.com", "category": "EMPLOYEE", "domain_id": 9999},
+            {"name": "No Division", "email": "nodivision@prismid.com", "category": "EMPLOYEE", "division_id": 9999},
+        ]}, headers=auth_header(superadmin_token))
+
+        assert res.status_code == 201
+        data = res.json()
+        assert [c["index"] for c in data["created"]] == [0, 1]
+        assert data["created"][0]["display_id"].startswith("INT-")
+        assert {e["index"]: e["detail"] for e in data["errors"]} == {
+            2: "Email already registered",
+            3: "Duplicate email in batch",
+            4: "Interns require an end_date",
+            5: "Domain not found",
+            6: "Division not found",
+        }
+
+        intern = client.get(f"/api/v1/users/{data['created'][0]['ulid']}",
+                            headers=auth_header(superadmin_token)).json()
+        assert intern["roles"] == ["Cohort Role"]
+        assert intern["start_date"] == "2025-01-01"
+        assert intern["end_date"] == "2025-06-30"
+
+    def test_bulk_create_requires_superadmin(self, client, viewer_token):
+        res = client.post("/api/v1/users/bulk", json={"users": [
+            {"name": "Blocked", "email": "blocked@prismid.com", "category": "EMPLOYEE"},
+        ]}, headers=auth_header(viewer_token))
+        assert res.status_code == 403
+
+
 class TestSearchUsers:
     """Test user search with ULID and display ID."""
 
@@ -94,6 +142,35 @@ class TestSearchUsers:
         assert data["total"] >= 1
         assert any(u["name"] == "Searchable User" for u in data["users"])
 
+    def test_search_ranks_closer_match_first(self, client, superadmin_token):
+        for name, email in [
+            ("Marianne Holloway", "mh@prismid.com"),
+            ("Mari Tanaka", "mari@prismid.com"),
+            ("Unrelated Person", "nobody@prismid.com"),
+        ]:
+            client.post("/api/v1/users", json={
+                "name": name,
+                "email": email,
+                "category": "EMPLOYEE",
+            }, headers=auth_header(superadmin_token))
+
+        res = client.get("/api/v1/users?q=mari", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        data = res.json()
+        assert data["total"] == 2
+        assert data["users"][0]["name"] == "Mari Tanaka"
+
+    def test_search_short_query_falls_back(self, client, superadmin_token):
+        client.post("/api/v1/users", json={
+            "name": "Jo Smith",
+            "email": "jo@prismid.com",
+            "category": "EMPLOYEE",
+        }, headers=auth_header(superadmin_token))
+
+        res = client.get("/api/v1/users?q=jo", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        assert res.json()["total"] == 1
+
     def test_search_response_contains_ulid_and_display_id(self, client, superadmin_token, viewer_token):
         create_res = client.post("/api/users", json={
             "name": "ULID Check User",
@@ -112,6 +189,196 @@ class TestSearchUsers:
         assert user["display_id"].startswith("EMP-")
 
 
+class TestCursorPagination:
+    """Test keyset pagination on GET /users."""
+
+    def _create_users(self, client, token, count):
+        for i in range(count):
+            res = client.post("/api/v1/users", json={
+                "name": f"Cursor User {i}",
+                "email": f"cursor{i}@prismid.com",
+                "category": "EMPLOYEE",
+            }, headers=auth_header(token))
+            assert res.status_code == 201
+
+    def test_walks_all_pages_without_duplicates(self, client, superadmin_token):
+        self._create_users(client, superadmin_token, 5)
+
+        seen = []
+        res = client.get("/api/v1/users?pagination=cursor&per_page=2", headers=auth_header(superadmin_token))
+        while True:
+            assert res.status_code == 200
+            data = res.json()
+            seen.extend(u["ulid"] for u in data["users"])
+            if not data["next_cursor"]:
+                break
+            res = client.get(
+                f"/api/v1/users?per_page=2&cursor={data['next_cursor']}",
+                headers=auth_header(superadmin_token),
+            )
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    def test_with_total_false_skips_count(self, client, superadmin_token):
+        self._create_users(client, superadmin_token, 1)
+
+        res = client.get("/api/v1/users?pagination=cursor&with_total=false", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        data = res.json()
+        assert data["total"] is None
+        assert data["next_cursor"] is None
+        assert len(data["users"]) == 1
+
+    def test_invalid_cursor_rejected(self, client, superadmin_token):
+        res = client.get("/api/v1/users?cursor=not-a-cursor", headers=auth_header(superadmin_token))
+        assert res.status_code == 400
+
+
+class TestLeanListing:
+    """Test the sparse-fieldset / Core projection listing path."""
+
+    def test_lean_rows_match_orm_rows(self, client, superadmin_token):
+        role = client.post("/api/v1/roles", json={"name": "Lean Role", "clearance_level": 2},
+                           headers=auth_header(superadmin_token)).json()
+        client.post("/api/v1/users", json={
+            "name": "Lean Intern",
+            "email": "lean@prismid.com",
+            "category": "INTERN",
+            "end_date": "2099-01-01",
+            "role_ids": [role["id"]],
+        }, headers=auth_header(superadmin_token))
+
+        full = client.get("/api/v1/users", headers=auth_header(superadmin_token)).json()
+        lean = client.get("/api/v1/users?fields=*", headers=auth_header(superadmin_token)).json()
+        assert lean["users"] == full["users"]
+        assert lean["users"][0]["roles"] == ["Lean Role"]
+
+    def test_sparse_fieldset(self, client, superadmin_token):
+        client.post("/api/v1/users", json={
+            "name": "Sparse User",
+            "email": "sparse@prismid.com",
+            "category": "EMPLOYEE",
+        }, headers=auth_header(superadmin_token))
+
+        res = client.get("/api/v1/users?fields=ulid,name", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        data = res.json()
+        assert data["total"] == 1
+        assert set(data["users"][0]) == {"ulid", "name"}
+
+    def test_unknown_field_rejected(self, client, superadmin_token):
+        res = client.get("/api/v1/users?fields=ulid,password", headers=auth_header(superadmin_token))
+        assert res.status_code == 400
+
+
+class TestExportUsers:
+    """Test the streaming directory export."""
+
+    def _seed(self, client, token):
+        for i in range(3):
+            client.post("/api/v1/users", json={
+                "name": f"Export User {i}",
+                "email": f"export{i}@prismid.com",
+                "category": "INTERN" if i == 0 else "EMPLOYEE",
+                "end_date": "2099-01-01",
+            }, headers=auth_header(token))
+
+    def test_ndjson_export_honours_filters(self, client, superadmin_token):
+        import json
+        self._seed(client, superadmin_token)
+
+        res = client.get("/api/v1/users/export?category=EMPLOYEE", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in res.text.splitlines()]
+        assert len(rows) == 2
+        assert all(r["category"] == "EMPLOYEE" for r in rows)
+
+    def test_csv_export_with_fields(self, client, superadmin_token):
+        self._seed(client, superadmin_token)
+
+        res = client.get("/api/v1/users/export?format=csv&fields=ulid,name", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        lines = res.text.strip().splitlines()
+        assert lines[0].strip() == "ulid,name"
+        assert len(lines) == 4
+
+    def test_gzip_export(self, client, superadmin_token):
+        import gzip
+        self._seed(client, superadmin_token)
+
+        # Ask for the raw body so the client does not transparently decompress it
+        with client.stream("GET", "/api/v1/users/export",
+                           headers={**auth_header(superadmin_token), "Accept-Encoding": "gzip"}) as res:
+            assert res.headers["content-encoding"] == "gzip"
+            body = b"".join(res.iter_raw())
+        assert len(gzip.decompress(body).splitlines()) == 3
+
+    def test_gzip_refused_with_zero_quality(self, client, superadmin_token):
+        self._seed(client, superadmin_token)
+
+        for accept in ("gzip;q=0", "gzip; q=0.0, identity", "*;q=1, gzip;q=0"):
+            with client.stream("GET", "/api/v1/users/export",
+                               headers={**auth_header(superadmin_token), "Accept-Encoding": accept}) as res:
+                assert "content-encoding" not in res.headers
+                assert len(b"".join(res.iter_raw()).splitlines()) == 3
+
+    def test_accepts_gzip(self):
+        from app.api.users import _accepts_gzip
+
+        assert _accepts_gzip("gzip, deflate, br")
+        assert _accepts_gzip("br;q=1.0, gzip;q=0.5")
+        assert _accepts_gzip("*")
+        assert not _accepts_gzip("")
+        assert not _accepts_gzip("identity")
+        assert not _accepts_gzip("GZIP;Q=0")
+        assert not _accepts_gzip("gzip;q=0, *")
+
+
+class TestSearchTotals:
+    """Test cached search totals and their invalidation."""
+
+    def test_cached_total_is_used(self, client, superadmin_token, monkeypatch):
+        from app.api import users as users_api
+
+        monkeypatch.setattr(users_api, "get_cached_listing", lambda fingerprint: (42, '"cached"', "0"))
+
+        res = client.get("/api/v1/users", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        assert res.json()["total"] == 42
+        assert res.json()["total_estimated"] is False
+
+    def test_refill_is_guarded_by_generation(self, client, superadmin_token, monkeypatch):
+        from app.api import users as users_api
+        stored = []
+        monkeypatch.setattr(users_api, "get_cached_listing", lambda fingerprint: (None, None, "7"))
+        monkeypatch.setattr(users_api, "set_cached_listing",
+                            lambda fingerprint, total, etag, generation: stored.append(generation))
+
+        res = client.get("/api/v1/users", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        # Stored only if no invalidation bumped the generation read before the query
+        assert stored == ["7"]
+
+    def test_user_write_invalidates_cache(self, client, superadmin_token, monkeypatch):
+        from app.core import counts
+        calls = []
+        monkeypatch.setattr(counts, "invalidate_user_counts", lambda: calls.append(True))
+
+        client.post("/api/v1/users", json={
+            "name": "Invalidating User",
+            "email": "invalidate@prismid.com",
+            "category": "EMPLOYEE",
+        }, headers=auth_header(superadmin_token))
+        assert calls
+
+    def test_estimate_falls_back_to_exact_on_sqlite(self, client, superadmin_token):
+        res = client.get("/api/v1/users?estimate=true", headers=auth_header(superadmin_token))
+        assert res.status_code == 200
+        assert res.json()["total_estimated"] is False
+
+
 class TestGetUser:
     """Test user retrieval by ULID."""
 
@@ -130,11 +397,109 @@ class TestGetUser:
         assert data["name"] == "Get Me User"
         assert data["display_id"].startswith("EMP-")
 
+    def test_get_by_display_id(self, client, superadmin_token, viewer_token):
+        create_res = client.post("/api/v1/users", json={
+            "name": "Display Id User",
+            "email": "displayid@prismid.com",
+            "category": "INTERN",
+            "end_date": "2099-01-01",
+        }, headers=auth_header(superadmin_token))
+        created = create_res.json()
+
+        res = client.get(f"/api/v1/users/{created['display_id']}", headers=auth_header(viewer_token))
+        assert res.status_code == 200
+        assert res.json()["ulid"] == created["ulid"]
+
+        res = client.get(f"/api/v1/users?q={created['display_id']}", headers=auth_header(viewer_token))
+        assert res.json()["total"] == 1
+
     def test_get_nonexistent(self, client, viewer_token):
         res = client.get("/api/users/01NONEXISTENT00000000000000", headers=auth_header(viewer_token))
         assert res.status_code == 404
 
 
+class TestConditionalGet:
+    """Test ETag / If-None-Match on user reads."""
+
+    def _create(self, client, token, email="etag@prismid.com"):
+        return client.post("/api/v1/users", json={
+            "name": "Etag User",
+            "email": email,
+            "category": "EMPLOYEE",
+        }, headers=auth_header(token)).json()
+
+    def test_get_user_not_modified(self, client, superadmin_token):
+        ulid = self._create(client, superadmin_token)["ulid"]
+
+        res = client.get(f"/api/v1/users/{ulid}", headers=auth_header(superadmin_token))
+        etag = res.headers["ETag"]
+        assert etag.startswith('"v1-')
+
+        res = client.get(f"/api/v1/users/{ulid}", headers={**auth_header(superadmin_token), "If-None-Match": etag})
+        assert res.status_code == 304
+        assert res.content == b""
+        assert res.headers["ETag"] == etag
+
+    def test_user_etag_changes_with_roles(self, client, superadmin_token):
+        ulid = self._create(client, superadmin_token)["ulid"]
+        etag = client.get(f"/api/v1/users/{ulid}", headers=auth_header(superadmin_token)).headers["ETag"]
+
+        role_id = client.post("/api/v1/roles", json={"name": "Etag Role"}, headers=auth_header(superadmin_token)).json()["id"]
+        client.post(f"/api/v1/users/{ulid}/roles?role_id={role_id}", headers=auth_header(superadmin_token))
+
+        res = client.get(f"/api/v1/users/{ulid}", headers={**auth_header(superadmin_token), "If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.json()["roles"] == ["Etag Role"]
+        assert res.headers["ETag"] != etag
+
+    def test_listing_not_modified_until_write(self, client, superadmin_token):
+        self._create(client, superadmin_token)
+        etag = client.get("/api/v1/users", headers=auth_header(superadmin_token)).headers["ETag"]
+
+        conditional = {**auth_header(superadmin_token), "If-None-Match": etag}
+        assert client.get("/api/v1/users", headers=conditional).status_code == 304
+        # Each page has its own ETag
+        assert client.get("/api/v1/users?per_page=5", headers=conditional).status_code == 200
+
+        self._create(client, superadmin_token, email="etag2@prismid.com")
+        res = client.get("/api/v1/users", headers=conditional)
+        assert res.status_code == 200
+        assert res.json()["total"] == 2
+
+    def test_listing_without_total_has_no_etag(self, client, superadmin_token):
+        res = client.get("/api/v1/users?with_total=false", headers=auth_header(superadmin_token))
+        assert "ETag" not in res.headers
+
+
+class TestBatchGetUsers:
+    """Test POST /users/batch-get."""
+
+    def test_mixed_ids_with_not_found(self, client, superadmin_token, viewer_token):
+        created = []
+        for i in range(2):
+            res = client.post("/api/v1/users", json={
+                "name": f"Batch User {i}",
+                "email": f"batch{i}@prismid.com",
+                "category": "EMPLOYEE",
+            }, headers=auth_header(superadmin_token))
+            created.append(res.json())
+
+        missing = "01ARZ3NDEKTSV4RRFFQ69G5FAV"
+        ids = [created[0]["ulid"], created[1]["display_id"], missing, "ZZZZ-ZZZZ-ZZ"]
+        res = client.post("/api/v1/users/batch-get", json={"ids": ids}, headers=auth_header(viewer_token))
+        assert res.status_code == 200
+        data = res.json()
+
+        assert data["results"][created[0]["ulid"]]["name"] == "Batch User 0"
+        assert data["results"][created[1]["display_id"]]["ulid"] == created[1]["ulid"]
+        assert data["results"][missing] is None
+        assert sorted(data["not_found"]) == sorted([missing, "ZZZZ-ZZZZ-ZZ"])
+
+    def test_batch_size_limit(self, client, viewer_token):
+        res = client.post("/api/v1/users/batch-get", json={"ids": ["X"] * 1001}, headers=auth_header(viewer_token))
+        assert res.status_code == 422
+
+
 class TestUpdateUser:
     """Test user update by ULID."""
 